@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark: cold-start wall clock of one statusline refresh.
+
+Spawns the packaged ``claude-statusline`` and the standalone
+``scripts/statusline.py`` as subprocesses, exactly as Claude Code does, and
+feeds them the ``tests/fixtures/json/*.json`` payloads in rotation. Every
+implementation runs in four scenarios:
+
+  plain         project directory is not a git repo, no state yet
+  plain+state   not a git repo, state files already hold --state-rows rows
+  git           project directory is a git repo with one commit, no state
+  git+state     git repo and existing state
+
+"No state" scenarios delete the state directory before each run (untimed), so
+every refresh creates it and writes a first row. With existing state the
+payload repeats, so most refreshes read the last row and skip the write —
+the common case for a live session. Each run gets a throwaway HOME, so the
+user's own config and state are never touched.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs N] [--impl packaged script]
+                                          [--scenario plain git ...] [--json PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import time
+from pathlib import Path
+
+from claude_statusline.core.trace import percentile
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = ROOT / "tests" / "fixtures" / "json"
+SCRIPT = ROOT / "scripts" / "statusline.py"
+
+SCENARIOS = ("plain", "plain+state", "git", "git+state")
+WARMUP_RUNS = 5
+
+
+def impl_commands() -> dict[str, list[str]]:
+    """Command line for each implementation.
+
+    The console script is looked up next to this interpreter before PATH:
+    version-manager shims on PATH (pyenv, asdf) are shell scripts that would
+    add their own startup to every sample.
+    """
+    packaged = shutil.which("claude-statusline", path=sysconfig.get_path("scripts"))
+    packaged = packaged or shutil.which("claude-statusline")
+    return {
+        "packaged": [packaged]
+        if packaged
+        else [sys.executable, "-c", "from claude_statusline.cli.statusline import main; main()"],
+        "script": [sys.executable, str(SCRIPT)],
+    }
+
+
+def load_payloads(project_dir: Path) -> list[bytes]:
+    """Fixture payloads, pointed at ``project_dir``."""
+    payloads = []
+    for path in sorted(FIXTURES.glob("*.json")):
+        data = json.loads(path.read_text())
+        data["workspace"] = {"current_dir": str(project_dir), "project_dir": str(project_dir)}
+        payloads.append(json.dumps(data).encode())
+    return payloads
+
+
+def make_project(root: Path, git: bool) -> Path:
+    """Create the project directory, optionally as a git repo with one commit."""
+    project = root / "project"
+    project.mkdir()
+    (project / "README.md").write_text("bench\n")
+    if git:
+        cmd = ["git", "-C", str(project), "-c", "user.name=bench", "-c", "user.email=b@b"]
+        subprocess.run([*cmd, "init", "-q"], check=True)
+        subprocess.run([*cmd, "add", "README.md"], check=True)
+        subprocess.run([*cmd, "commit", "-q", "-m", "init"], check=True)
+    return project
+
+
+def seed_state(state_dir: Path, payloads: list[bytes], rows: int) -> None:
+    """Give every fixture session ``rows`` rows of history."""
+    state_dir.mkdir(parents=True, exist_ok=True)
+    for payload in payloads:
+        session_id = json.loads(payload).get("session_id")
+        if not session_id:
+            continue
+        base = int(time.time()) - rows * 30
+        lines = [
+            f"{base + i * 30},{50000 + i * 900},{4000 + i * 70},{120 + i % 500},"
+            f"{800 + i % 300},{i % 7 * 1500},{40000 + i * 850},{0.012 * i:.4f},{i // 3},{i // 7},"
+            f"{session_id},claude-opus-4-5,/home/user/project,200000\n"
+            for i in range(rows)
+        ]
+        (state_dir / f"statusline.{session_id}.state").write_text("".join(lines))
+
+
+def run_scenario(command: list[str], scenario: str, runs: int, state_rows: int) -> list[float]:
+    """Time ``runs`` refreshes of ``command`` in ``scenario``.
+
+    Returns:
+        Wall-clock milliseconds per run.
+    """
+    with tempfile.TemporaryDirectory(prefix="statusline-bench-") as tmp:
+        root = Path(tmp)
+        home = root / "home"
+        (home / ".claude").mkdir(parents=True)
+        state_dir = home / ".claude" / "statusline"
+        project = make_project(root, git=scenario.startswith("git"))
+        payloads = load_payloads(project)
+        keep_state = scenario.endswith("+state")
+        if keep_state:
+            seed_state(state_dir, payloads, state_rows)
+
+        env = {k: v for k, v in os.environ.items() if not k.startswith("CLAUDE_STATUSLINE")}
+        env.update(HOME=str(home), USERPROFILE=str(home))
+
+        samples = []
+        for i in range(WARMUP_RUNS + runs):
+            if not keep_state:
+                shutil.rmtree(state_dir, ignore_errors=True)
+            payload = payloads[i % len(payloads)]
+            start = time.perf_counter()
+            subprocess.run(
+                command,
+                input=payload,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                cwd=project,
+                env=env,
+                check=False,
+            )
+            elapsed = (time.perf_counter() - start) * 1000
+            if i >= WARMUP_RUNS:
+                samples.append(elapsed)
+        return samples
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """p50/p95/p99/mean/max of one scenario's samples."""
+    values = sorted(samples)
+    return {
+        "runs": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": statistics.fmean(values),
+        "max": values[-1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200, help="timed runs per scenario")
+    parser.add_argument(
+        "--impl", nargs="+", choices=("packaged", "script"), default=["packaged", "script"]
+    )
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument(
+        "--state-rows", type=int, default=1000, help="rows per session in +state scenarios"
+    )
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    scenarios = args.scenario
+    if shutil.which("git") is None:
+        skipped = [s for s in scenarios if s.startswith("git")]
+        if skipped:
+            print(f"git not found, skipping: {', '.join(skipped)}")
+        scenarios = [s for s in scenarios if not s.startswith("git")]
+
+    commands = impl_commands()
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    print(f"{args.runs} runs per scenario, {len(list(FIXTURES.glob('*.json')))} payloads, ms")
+    print(f"  {'impl':<9} {'scenario':<12} {'p50':>8} {'p95':>8} {'p99':>8} {'mean':>8} {'max':>8}")
+    for scenario in scenarios:
+        for impl in args.impl:
+            stats = summarize(run_scenario(commands[impl], scenario, args.runs, args.state_rows))
+            results.setdefault(impl, {})[scenario] = stats
+            print(
+                f"  {impl:<9} {scenario:<12} {stats['p50']:8.1f} {stats['p95']:8.1f} "
+                f"{stats['p99']:8.1f} {stats['mean']:8.1f} {stats['max']:8.1f}"
+            )
+
+    if {"packaged", "script"} <= set(results):
+        print("\npackaged / script, p50:")
+        for scenario in scenarios:
+            ratio = results["packaged"][scenario]["p50"] / results["script"][scenario]["p50"]
+            print(f"  {scenario:<12} {ratio:5.2f}x")
+
+    if args.json:
+        args.json.write_text(json.dumps({"runs": args.runs, "results": results}, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
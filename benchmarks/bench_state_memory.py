@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Microbenchmark: memory held by a parsed session history.
+
+Parses a synthetic state file buffer with StateEntry.parse_many and reports
+the bytes still allocated (tracemalloc) per entry, plus the size of a single
+instance.
+
+Usage:
+    python benchmarks/bench_state_memory.py [--lines N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+from bench_state_parse import make_buffer
+
+from claude_statusline.core.state import StateEntry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=10_000, help="rows per buffer")
+    args = parser.parse_args()
+
+    data = make_buffer(args.lines)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entries = StateEntry.parse_many(data)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    sample = entries[0]
+    instance = sys.getsizeof(sample)
+    if hasattr(sample, "__dict__"):
+        instance += sys.getsizeof(sample.__dict__)
+    distinct = len({id(e.session_id) for e in entries})
+
+    print(f"{len(entries):,} entries")
+    print(f"  retained      {held / len(entries):8.0f} bytes/entry")
+    print(f"  instance      {instance:8d} bytes")
+    print(f"  session_id    {distinct:8d} distinct string object(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Microbenchmark: per-line cost of parsing state file CSV rows.
+
+Compares four ways of turning a state file buffer into StateEntry objects:
+
+  legacy      the pre-parse_many from_csv_line (nested safe_int/safe_float
+              closures redefined per call, one ``len(parts) > k`` check per field)
+  per-line    the current from_csv_line, called once per line
+  csv.reader  the C ``csv`` module splitting rows straight from the file
+              object (QUOTE_NONE, so fields split exactly like ``str.split``)
+  parse_many  StateEntry.parse_many on the whole buffer
+
+csv.reader measured 15-45% slower than parse_many at both 10k and 100k
+lines (the per-row cost is converting fields, not splitting them), so
+parse_many remains the only loader.
+
+Usage:
+    python benchmarks/bench_state_parse.py [--lines N [N ...]] [--repeat R]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import sys
+import timeit
+
+from claude_statusline.core.state import StateEntry
+
+
+def legacy_from_csv_line(line: str) -> StateEntry | None:
+    """Verbatim copy of StateEntry.from_csv_line before parse_many existed."""
+    parts = line.strip().split(",")
+
+    if len(parts) < 2:
+        return None
+
+    try:
+        timestamp = int(parts[0])
+
+        if len(parts) == 2:
+            tokens = int(parts[1])
+            return StateEntry(
+                timestamp=timestamp,
+                total_input_tokens=tokens,
+                total_output_tokens=0,
+                current_input_tokens=0,
+                current_output_tokens=0,
+                cache_creation=0,
+                cache_read=0,
+                cost_usd=0.0,
+                lines_added=0,
+                lines_removed=0,
+                session_id="",
+                model_id="",
+                workspace_project_dir="",
+                context_window_size=0,
+            )
+
+        def safe_int(val: str, default: int = 0) -> int:
+            try:
+                return int(val) if val else default
+            except ValueError:
+                return default
+
+        def safe_float(val: str, default: float = 0.0) -> float:
+            try:
+                return float(val) if val else default
+            except ValueError:
+                return default
+
+        return StateEntry(
+            timestamp=timestamp,
+            total_input_tokens=safe_int(parts[1] if len(parts) > 1 else ""),
+            total_output_tokens=safe_int(parts[2] if len(parts) > 2 else ""),
+            current_input_tokens=safe_int(parts[3] if len(parts) > 3 else ""),
+            current_output_tokens=safe_int(parts[4] if len(parts) > 4 else ""),
+            cache_creation=safe_int(parts[5] if len(parts) > 5 else ""),
+            cache_read=safe_int(parts[6] if len(parts) > 6 else ""),
+            cost_usd=safe_float(parts[7] if len(parts) > 7 else ""),
+            lines_added=safe_int(parts[8] if len(parts) > 8 else ""),
+            lines_removed=safe_int(parts[9] if len(parts) > 9 else ""),
+            session_id=parts[10] if len(parts) > 10 else "",
+            model_id=parts[11] if len(parts) > 11 else "",
+            workspace_project_dir=parts[12] if len(parts) > 12 else "",
+            context_window_size=safe_int(parts[13] if len(parts) > 13 else ""),
+        )
+
+    except (ValueError, IndexError):
+        return None
+
+
+def csv_reader_load(f: io.TextIOBase) -> list[StateEntry]:
+    """Bulk loader built on csv.reader, mirroring parse_many's strict plan.
+
+    QUOTE_NONE keeps the comma-guard contract: writers replace commas in
+    workspace_project_dir, so a plain split on "," yields the 14 fields and
+    a quote character is data, not syntax. Rows that do not fit the plan
+    (legacy, compact or malformed) go through from_csv_line as in
+    parse_many.
+    """
+    entries: list[StateEntry] = []
+    append = entries.append
+    make = StateEntry
+    intern = sys.intern
+    for parts in csv.reader(f, quoting=csv.QUOTE_NONE):
+        if len(parts) == 14:
+            try:
+                append(
+                    make(
+                        int(parts[0]),
+                        int(parts[1]),
+                        int(parts[2]),
+                        int(parts[3]),
+                        int(parts[4]),
+                        int(parts[5]),
+                        int(parts[6]),
+                        float(parts[7]),
+                        int(parts[8]),
+                        int(parts[9]),
+                        intern(parts[10]),
+                        intern(parts[11]),
+                        intern(parts[12]),
+                        int(parts[13]),
+                    )
+                )
+                continue
+            except ValueError:
+                pass
+        entry = StateEntry.from_csv_line(",".join(parts))
+        if entry is not None:
+            append(entry)
+    return entries
+
+
+def make_buffer(n: int) -> bytes:
+    """Build a realistic state file buffer with n 14-field rows."""
+    rows = []
+    for i in range(n):
+        rows.append(
+            f"{1710288000 + i * 30},{50000 + i * 900},{4000 + i * 70},{120 + i % 500},"
+            f"{800 + i % 300},{i % 7 * 1500},{40000 + i * 850},{0.012 * i:.4f},{i // 3},{i // 7},"
+            "8f2c1b9e-3d4a-4c5b-9e6f-0a1b2c3d4e5f,claude-opus-4-6,"
+            f"/home/user/projects/my-project,200000"
+        )
+    return ("\n".join(rows) + "\n").encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--lines", type=int, nargs="+", default=[10_000, 100_000], help="rows per buffer"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions")
+    args = parser.parse_args()
+    for lines in args.lines:
+        run(lines, args.repeat)
+
+
+def run(lines: int, repeat: int) -> None:
+    """Time every loader on one buffer of ``lines`` rows."""
+    data = make_buffer(lines)
+    text = data.decode()
+
+    def legacy() -> list[StateEntry]:
+        return [e for e in map(legacy_from_csv_line, text.splitlines()) if e]
+
+    def per_line() -> list[StateEntry]:
+        return [e for e in map(StateEntry.from_csv_line, text.splitlines()) if e]
+
+    def csv_bulk() -> list[StateEntry]:
+        return csv_reader_load(io.TextIOWrapper(io.BytesIO(data), "utf-8", "replace", ""))
+
+    def bulk() -> list[StateEntry]:
+        return StateEntry.parse_many(data)
+
+    assert legacy() == per_line() == csv_bulk() == bulk()
+
+    print(f"{lines:,} lines, best of {repeat}")
+    baseline = None
+    variants = (
+        ("legacy", legacy),
+        ("per-line", per_line),
+        ("csv.reader", csv_bulk),
+        ("parse_many", bulk),
+    )
+    for name, fn in variants:
+        best = min(timeit.repeat(fn, number=1, repeat=repeat))
+        ns_per_line = best / lines * 1e9
+        baseline = baseline or ns_per_line
+        print(f"  {name:<11} {ns_per_line:8.0f} ns/line  ({baseline / ns_per_line:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
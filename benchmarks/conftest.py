@@ -0,0 +1,68 @@
+"""Fixtures for the pytest-benchmark suite.
+
+The suite lives outside ``testpaths`` so ``pytest`` alone never runs it::
+
+    pytest benchmarks --benchmark-only                 # everything
+    pytest benchmarks --benchmark-only -m "not large"  # skip 10k sessions / 100k lines
+
+State directories are generated once per run (the 10k-session directory and
+the 100k-line file take a few seconds to write) and swapped in per test by
+pointing StateFile at them.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from synthetic import ROWS_PER_SESSION, write_state_dir
+
+from claude_statusline.core.state import StateFile
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line("markers", "large: 10k-session or 100k-line case (slow to set up)")
+
+
+@pytest.fixture(scope="session")
+def _state_dirs() -> dict[tuple[str, int], Path]:
+    return {}
+
+
+def _use_state_dir(monkeypatch: pytest.MonkeyPatch, state_dir: Path) -> None:
+    monkeypatch.setattr(StateFile, "STATE_DIR", state_dir)
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", state_dir.parent)
+    monkeypatch.setattr(StateFile, "SPOOL_DIR", state_dir.parent / "spool")
+
+
+def _cached_dir(cache, tmp_path_factory, sessions: int, rows: int) -> Path:
+    key = (sessions, rows)
+    if key not in cache:
+        root = tmp_path_factory.mktemp(f"state-{sessions}x{rows}")
+        cache[key] = write_state_dir(root, sessions, rows)
+    return cache[key]
+
+
+@pytest.fixture
+def sessions_dir(request, _state_dirs, tmp_path_factory, monkeypatch) -> Path:
+    """State directory of ``request.param`` sessions, made current."""
+    state_dir = _cached_dir(_state_dirs, tmp_path_factory, request.param, ROWS_PER_SESSION)
+    _use_state_dir(monkeypatch, state_dir)
+    return state_dir
+
+
+@pytest.fixture
+def lines_dir(request, _state_dirs, tmp_path_factory, monkeypatch) -> Path:
+    """State directory holding one SESSION_ID session of ``request.param`` rows."""
+    state_dir = _cached_dir(_state_dirs, tmp_path_factory, 1, request.param)
+    _use_state_dir(monkeypatch, state_dir)
+    return state_dir
+
+
+@pytest.fixture
+def empty_state_dir(tmp_path, monkeypatch) -> Path:
+    """Fresh, empty state directory made current."""
+    state_dir = tmp_path / ".claude" / "statusline"
+    state_dir.mkdir(parents=True)
+    _use_state_dir(monkeypatch, state_dir)
+    return state_dir
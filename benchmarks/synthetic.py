@@ -0,0 +1,70 @@
+"""Synthetic state data shared by the benchmark suite.
+
+Built on ``context-stats dev gen-history`` (``claude_statusline.cli.dev``) with
+a fixed seed and end time, so every run benchmarks byte-identical files.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from claude_statusline.cli.dev import HistorySpec, generate_session, write_history
+from claude_statusline.core.state import StateEntry
+
+SESSION_COUNTS = (1, 100, 10_000)
+LINE_COUNTS = (10, 10_000, 100_000)
+
+# Rows per session in the multi-session directories
+ROWS_PER_SESSION = 20
+
+# Rounds for cases that take a noticeable fraction of a second each
+LARGE_ROUNDS = 5
+
+SEED = 0
+END_TS = 1710288000
+
+# The session of the single-session (line count) directories
+SESSION_ID = f"synthetic-{SEED}-000000"
+
+
+def sized(values: tuple[int, ...], threshold: int) -> list[Any]:
+    """Parametrize ``values``, marking those >= ``threshold`` as large."""
+    return [
+        pytest.param(v, marks=pytest.mark.large, id=str(v)) if v >= threshold else v for v in values
+    ]
+
+
+def history_spec(sessions: int, rows: int) -> HistorySpec:
+    """The benchmark history shape for ``sessions`` sessions of ``rows`` rows."""
+    return HistorySpec(sessions=sessions, lines=rows, projects=25, seed=SEED, end=END_TS)
+
+
+def make_entries(n: int) -> list[StateEntry]:
+    """Return the ``n`` rows of the SESSION_ID session."""
+    return list(generate_session(history_spec(1, n), 0))
+
+
+def make_lines(n: int) -> str:
+    """Render the ``n`` rows of the SESSION_ID session as state file text."""
+    return "".join(f"{entry.to_csv_line()}\n" for entry in make_entries(n))
+
+
+def write_state_dir(root: Path, sessions: int, rows: int) -> Path:
+    """Write ``sessions`` session files of ``rows`` rows each under ``root``.
+
+    Returns:
+        The new state directory (``root/.claude/statusline``).
+    """
+    state_dir = root / ".claude" / "statusline"
+    write_history(history_spec(sessions, rows), state_dir)
+    return state_dir
+
+
+def run(benchmark: Any, fn: Callable[..., Any], *args: Any, large: bool = False) -> Any:
+    """Benchmark ``fn(*args)``, capping the rounds for slow cases."""
+    if large:
+        return benchmark.pedantic(fn, args=args, rounds=LARGE_ROUNDS, iterations=1)
+    return benchmark(fn, *args)
@@ -0,0 +1,166 @@
+"""pytest-benchmark cases for the state, rendering and analytics hot paths.
+
+Run and compare against a saved baseline::
+
+    pytest benchmarks --benchmark-only --benchmark-autosave
+    pytest benchmarks --benchmark-only --benchmark-compare --benchmark-compare-fail=median:25%
+"""
+
+from __future__ import annotations
+
+import itertools
+
+import pytest
+from synthetic import (
+    LINE_COUNTS,
+    SESSION_COUNTS,
+    SESSION_ID,
+    make_entries,
+    make_lines,
+    run,
+    sized,
+)
+
+from claude_statusline.analytics import load_all_projects
+from claude_statusline.cli.context_stats import render_once
+from claude_statusline.cli.export import _generate_markdown
+from claude_statusline.cli.report import generate_report
+from claude_statusline.core.colors import ColorManager
+from claude_statusline.core.config import Config
+from claude_statusline.core.state import StateEntry, StateFile
+from claude_statusline.graphs.renderer import GraphDimensions, GraphRenderer
+
+LARGE_LINES = 100_000
+LARGE_SESSIONS = 10_000
+
+lines_param = pytest.mark.parametrize("n", sized(LINE_COUNTS, LARGE_LINES))
+lines_dir_param = pytest.mark.parametrize(
+    "lines_dir", sized(LINE_COUNTS, LARGE_LINES), indirect=True
+)
+sessions_dir_param = pytest.mark.parametrize(
+    "sessions_dir", sized(SESSION_COUNTS, LARGE_SESSIONS), indirect=True
+)
+
+
+def _renderer() -> GraphRenderer:
+    # Fixed 80x24 terminal so results do not depend on the runner's tty
+    dims = GraphDimensions(term_width=80, term_height=24, graph_width=65, graph_height=8)
+    return GraphRenderer(colors=ColorManager(enabled=False), dimensions=dims)
+
+
+# ---------------------------------------------------------------------------
+# State file
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.benchmark(group="from_csv_line")
+@lines_param
+def test_from_csv_line(benchmark, n):
+    lines = make_lines(n).splitlines()
+
+    def parse_all():
+        return [StateEntry.from_csv_line(line) for line in lines]
+
+    assert len(run(benchmark, parse_all, large=n >= LARGE_LINES)) == n
+
+
+@pytest.mark.benchmark(group="read_history")
+@lines_dir_param
+def test_read_history(benchmark, lines_dir, request):
+    n = request.node.callspec.params["lines_dir"]
+    entries = run(benchmark, StateFile(SESSION_ID).read_history, large=n >= LARGE_LINES)
+    assert len(entries) == n
+
+
+@pytest.mark.benchmark(group="read_last_entry")
+@lines_dir_param
+def test_read_last_entry(benchmark, lines_dir):
+    entry = benchmark(StateFile(SESSION_ID).read_last_entry)
+    assert entry is not None and entry.session_id == SESSION_ID
+
+
+@pytest.mark.benchmark(group="append_entry")
+@pytest.mark.parametrize("compact", [False, True], ids=["full", "compact"])
+def test_append_entry_with_rotation(benchmark, empty_state_dir, monkeypatch, compact):
+    # ~100 full rows per segment, so every benchmark round seals a few
+    monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", 16 * 1024)
+    state_file = StateFile(SESSION_ID, keep_segments=3, compact=compact)
+    entries = itertools.cycle(make_entries(1000))
+
+    def append():
+        state_file.append_entry(next(entries))
+
+    benchmark(append)
+    assert len(state_file.segment_paths()) <= 3
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.benchmark(group="build_grid")
+@lines_param
+def test_build_grid(benchmark, n):
+    renderer = _renderer()
+    data = [e.current_used_tokens for e in make_entries(n)]
+    lo, hi = min(data), max(data)
+    dims = renderer.dimensions
+    grid = run(
+        benchmark,
+        renderer._build_grid,
+        data,
+        lo,
+        hi,
+        hi - lo,
+        dims.graph_width,
+        dims.graph_height,
+        large=n >= LARGE_LINES,
+    )
+    assert len(grid) == dims.graph_height
+
+
+@pytest.mark.benchmark(group="render_once")
+@lines_dir_param
+def test_render_once(benchmark, lines_dir, request):
+    n = request.node.callspec.params["lines_dir"]
+    state_file = StateFile(SESSION_ID)
+    colors = ColorManager(enabled=False)
+    config = Config()
+
+    def render():
+        return render_once(state_file, "all", _renderer(), colors, True, config)
+
+    assert "Context Stats" in run(benchmark, render, large=n >= LARGE_LINES)
+
+
+# ---------------------------------------------------------------------------
+# Analytics and reports
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.benchmark(group="load_all_projects")
+@sessions_dir_param
+def test_load_all_projects(benchmark, sessions_dir, request):
+    n = request.node.callspec.params["sessions_dir"]
+    projects = run(benchmark, load_all_projects, None, False, large=n >= LARGE_SESSIONS)
+    assert sum(len(p.sessions) for p in projects) == n
+
+
+@pytest.mark.benchmark(group="generate_report")
+@sessions_dir_param
+def test_generate_report(benchmark, sessions_dir, request):
+    n = request.node.callspec.params["sessions_dir"]
+    projects = load_all_projects(use_index=False)
+    report = run(benchmark, generate_report, projects, large=n >= LARGE_SESSIONS)
+    assert report.startswith("#")
+
+
+@pytest.mark.benchmark(group="generate_markdown")
+@lines_param
+def test_generate_markdown(benchmark, n):
+    entries = make_entries(n)
+    markdown = run(
+        benchmark, _generate_markdown, entries, SESSION_ID, Config(), large=n >= LARGE_LINES
+    )
+    assert SESSION_ID in markdown
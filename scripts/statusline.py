@@ -35,8 +35,16 @@ import subprocess
 import sys
 import tempfile
 
-ROTATION_THRESHOLD = 10_000
+try:
+    import fcntl
+except ImportError:  # Windows: appends stay atomic via O_APPEND, rotation is unguarded
+    fcntl = None
+
+SEGMENT_MAX_BYTES = 1_500_000  # ~10,000 entries
+SEGMENT_KEEP = 10
+ROTATION_THRESHOLD = 10_000  # sessionless statusline.state only
 ROTATION_KEEP = 5_000
+MIGRATION_MARKER = ".migrated-v1"  # same marker as StateFile.MIGRATION_MARKER
 
 # Model Intelligence color thresholds
 MI_GREEN_THRESHOLD = 0.90
@@ -209,22 +217,130 @@ def _zone_ansi_color(color_name):
     return RESET
 
 
-def maybe_rotate_state_file(state_file):
-    """Rotate a state file if it exceeds ROTATION_THRESHOLD lines.
+def open_locked(path, flags, operation):
+    """Open a state file and flock the inode currently linked at path.
 
-    Keeps the most recent ROTATION_KEEP lines via atomic temp-file + rename.
+    Same protocol as the package's StateFile: if a rotation replaced the file
+    while we waited for the lock, retry against the new file.
     """
+    while True:
+        fd = os.open(path, flags | getattr(os, "O_BINARY", 0), 0o666)
+        if fcntl is None:
+            return fd
+        try:
+            fcntl.flock(fd, operation)
+            held = os.fstat(fd)
+            current = os.stat(path)
+            if (held.st_dev, held.st_ino) == (current.st_dev, current.st_ino):
+                return fd
+        except FileNotFoundError:
+            if not flags & os.O_CREAT:
+                os.close(fd)
+                raise
+        except BaseException:
+            os.close(fd)
+            raise
+        os.close(fd)
+
+
+def append_state_line(state_file, line):
+    """Append one record with a single write() on an O_APPEND descriptor."""
+    fd = open_locked(
+        state_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, fcntl.LOCK_SH if fcntl else 0
+    )
+    try:
+        data = memoryview(f"{line}\n".encode())
+        while data:
+            data = data[os.write(fd, data) :]
+    finally:
+        os.close(fd)
+
+
+def state_segments(state_file):
+    """Return (n, path) for the sealed segments of a state file, oldest first.
+
+    statusline.<sid>.state seals into statusline.<sid>.<n>.state, which
+    `context-stats archive` may compress to .state.gz / .state.xz.
+    """
+    import glob
+
+    base = state_file[: -len(".state")]
+    segments = {}
+    for path in glob.glob(glob.escape(base) + ".*.state*"):
+        name = path[:-3] if path.endswith((".state.gz", ".state.xz")) else path
+        n = name[len(base) + 1 : -len(".state")]
+        if name.endswith(".state") and n.isascii() and n.isdigit():
+            # Mid-archive both copies exist; prefer the uncompressed one
+            if int(n) not in segments or name == path:
+                segments[int(n)] = path
+    return sorted(segments.items())
+
+
+def maybe_rotate_state_file(state_file, keep_segments=SEGMENT_KEEP):
+    """Seal a full state file into the next segment, like StateFile._maybe_rotate.
+
+    The live file is renamed to statusline.<sid>.<n>.state once it reaches
+    SEGMENT_MAX_BYTES, under an exclusive flock; segments beyond
+    keep_segments (0 = keep all) are deleted oldest first.
+    """
+    if os.path.basename(state_file) == "statusline.state":
+        truncate_sessionless_state_file(state_file)
+        return
     try:
-        if not os.path.exists(state_file):
+        if os.stat(state_file).st_size < SEGMENT_MAX_BYTES:
             return
-        with open(state_file) as f:
+    except OSError:
+        return
+    lock_fd = None
+    try:
+        if fcntl is not None:
+            try:
+                lock_fd = open_locked(state_file, os.O_RDONLY, fcntl.LOCK_EX)
+            except FileNotFoundError:
+                return
+            if os.fstat(lock_fd).st_size < SEGMENT_MAX_BYTES:
+                return
+        segments = state_segments(state_file)
+        last = segments[-1][0] if segments else 0
+        sealed = f"{state_file[: -len('.state')]}.{last + 1}.state"
+        os.rename(state_file, sealed)
+        segments.append((last + 1, sealed))
+        if keep_segments > 0:
+            for _, old in segments[:-keep_segments]:
+                try:
+                    os.unlink(old)
+                except FileNotFoundError:
+                    pass
+    except OSError as e:
+        sys.stderr.write(f"[statusline] warning: failed to rotate state file: {e}\n")
+    finally:
+        if lock_fd is not None:
+            os.close(lock_fd)
+
+
+def truncate_sessionless_state_file(state_file):
+    """Truncate statusline.state if it exceeds ROTATION_THRESHOLD lines.
+
+    Keeps the most recent ROTATION_KEEP lines via atomic temp-file + rename,
+    holding an exclusive flock so concurrent appends are not lost.
+    """
+    lock_fd = None
+    try:
+        if fcntl is not None:
+            try:
+                lock_fd = open_locked(state_file, os.O_RDONLY, fcntl.LOCK_EX)
+            except FileNotFoundError:
+                return
+        elif not os.path.exists(state_file):
+            return
+        with open(state_file, "rb") as f:
             lines = f.readlines()
         if len(lines) <= ROTATION_THRESHOLD:
             return
         keep = lines[-ROTATION_KEEP:]
         fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(state_file), suffix=".tmp")
         try:
-            with os.fdopen(fd, "w") as tmp_f:
+            with os.fdopen(fd, "wb") as tmp_f:
                 tmp_f.writelines(keep)
             os.replace(tmp_path, state_file)
         except BaseException:
@@ -235,6 +351,9 @@ def maybe_rotate_state_file(state_file):
             raise
     except OSError as e:
         sys.stderr.write(f"[statusline] warning: failed to rotate state file: {e}\n")
+    finally:
+        if lock_fd is not None:
+            os.close(lock_fd)
 
 
 # ANSI Colors (defaults, overridable via config)
@@ -419,6 +538,7 @@ def read_config():
         "reduced_motion": False,
         "show_mi": False,
         "mi_curve_beta": 0.0,
+        "state_keep_segments": SEGMENT_KEEP,
         "colors": {},
         "zone_config": {},
         "compaction_drop_threshold": COMPACTION_DROP_THRESHOLD,
@@ -674,6 +794,12 @@ color_separator=dim
                         config["mi_curve_beta"] = float(raw_value)
                     except ValueError:
                         pass
+                elif key == "state_keep_segments":
+                    try:
+                        if int(raw_value) >= 0:
+                            config["state_keep_segments"] = int(raw_value)
+                    except ValueError:
+                        pass
                 elif key in _COLOR_KEYS:
                     ansi = _parse_color(raw_value)
                     if ansi:
@@ -842,14 +968,22 @@ def main():
             state_dir = os.path.expanduser("~/.claude/statusline")
             os.makedirs(state_dir, exist_ok=True)
 
-            old_state_dir = os.path.expanduser("~/.claude")
-            for old_file in glob.glob(os.path.join(old_state_dir, "statusline*.state")):
-                if os.path.isfile(old_file):
-                    new_file = os.path.join(state_dir, os.path.basename(old_file))
-                    if not os.path.exists(new_file):
-                        shutil.move(old_file, new_file)
-                    else:
-                        os.remove(old_file)
+            # One-time move of state files from ~/.claude/, recorded by a
+            # marker shared with the package so later runs skip the glob
+            migration_marker = os.path.join(state_dir, MIGRATION_MARKER)
+            if not os.path.exists(migration_marker):
+                old_state_dir = os.path.expanduser("~/.claude")
+                for old_file in glob.glob(os.path.join(old_state_dir, "statusline*.state")):
+                    if os.path.isfile(old_file):
+                        new_file = os.path.join(state_dir, os.path.basename(old_file))
+                        if not os.path.exists(new_file):
+                            shutil.move(old_file, new_file)
+                        else:
+                            os.remove(old_file)
+                try:
+                    open(migration_marker, "a").close()
+                except OSError:
+                    pass
 
             if session_id:
                 state_file = os.path.join(state_dir, f"statusline.{session_id}.state")
@@ -857,14 +991,33 @@ def main():
                 state_file = os.path.join(state_dir, "statusline.state")
             has_prev = False
             prev_tokens = 0
+            prev_file = state_file
+            if session_id and not os.path.exists(state_file):
+                # Just sealed: the newest segment holds the previous entry
+                # (an archived one is skipped; the next refresh starts fresh)
+                segments = state_segments(state_file)
+                if segments and segments[-1][1].endswith(".state"):
+                    prev_file = segments[-1][1]
             try:
-                if os.path.exists(state_file):
+                if os.path.exists(prev_file):
                     has_prev = True
                     # Read last line to get previous state
-                    with open(state_file) as f:
+                    with open(prev_file) as f:
                         file_lines = f.readlines()
                         if file_lines:
                             last_line = file_lines[-1].strip()
+                            delta_parts = None
+                            if last_line.startswith("~"):
+                                # Compact row: deltas from the block's full row
+                                delta_parts = last_line[1:].split(",")
+                                last_line = next(
+                                    (
+                                        line.strip()
+                                        for line in reversed(file_lines)
+                                        if line.strip() and not line.startswith("~")
+                                    ),
+                                    "",
+                                )
                             if "," in last_line:
                                 csv_parts = last_line.split(",")
                                 # Calculate previous context usage:
@@ -874,6 +1027,8 @@ def main():
                                 prev_cache_creation = int(csv_parts[5]) if len(csv_parts) > 5 else 0
                                 prev_cache_read = int(csv_parts[6]) if len(csv_parts) > 6 else 0
                                 prev_tokens = prev_cur_input + prev_cache_creation + prev_cache_read
+                                if delta_parts and len(delta_parts) > 6:
+                                    prev_tokens += sum(int(delta_parts[i] or 0) for i in (3, 5, 6))
                             else:
                                 # Old format - single value
                                 prev_tokens = int(last_line or 0)
@@ -924,9 +1079,8 @@ def main():
                             total_size,
                         ]
                     )
-                    with open(state_file, "a") as f:
-                        f.write(f"{state_data}\n")
-                    maybe_rotate_state_file(state_file)
+                    append_state_line(state_file, state_data)
+                    maybe_rotate_state_file(state_file, config["state_keep_segments"])
                 except OSError as e:
                     sys.stderr.write(f"[statusline] warning: failed to write state file: {e}\n")
 
@@ -4,15 +4,25 @@ This module provides utilities to:
 - Load session state files from ~/.claude/statusline/
 - Aggregate token usage by project
 - Filter sessions by date range
+
+When a SQLite index has been built (``context-stats index rebuild``), session
+summaries are read from it instead of re-parsing every state file.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
 from pathlib import Path
 
-from claude_statusline.core.state import StateEntry, StateFile
+from claude_statusline.core.index import StateIndex, open_existing_index
+from claude_statusline.core.state import (
+    MappedStateFile,
+    StateFile,
+    cutoff_timestamp,
+    discover_sessions,
+    read_first_entry,
+)
+from claude_statusline.graphs.statistics import CacheMissDetector, cache_miss_cost
 
 
 @dataclass
@@ -32,6 +42,8 @@ class SessionStats:
     entry_count: int = 0
     lines_added: int = 0
     lines_removed: int = 0
+    cache_misses: int = 0
+    cache_miss_tokens: int = 0
 
     def total_tokens(self) -> int:
         """Total tokens (input + output + cache)."""
@@ -49,6 +61,10 @@ class SessionStats:
             return 0.0
         return self.total_cache_read / total * 100
 
+    def cache_miss_cost(self) -> float:
+        """Estimated extra USD spent re-caching prompts after cache expiry."""
+        return cache_miss_cost(self.cache_miss_tokens, self.model_id)
+
     def model_family(self) -> str:
         """Derive model family (opus/sonnet/haiku/other) from model_id."""
         m = self.model_id.lower()
@@ -103,64 +119,63 @@ class ProjectStats:
         return self.project_dir.split("/")[-1] if "/" in self.project_dir else self.project_dir
 
 
-def _discover_state_files() -> list[Path]:
-    """Discover all state files in ~/.claude/statusline/.
-
-    Returns:
-        List of state file paths.
-    """
-    state_dir = StateFile.STATE_DIR
-    if not state_dir.exists():
-        return []
-
-    state_files = []
-    for file in state_dir.glob("statusline.*.state"):
-        if file.is_file():
-            state_files.append(file)
-    return sorted(state_files)
-
-
-def _load_session_stats(state_file_path: Path) -> SessionStats | None:
-    """Load statistics for a single session from a state file.
+def _load_session_stats(
+    session_id: str, paths: list[Path], since: int | None = None
+) -> SessionStats | None:
+    """Load statistics for a single session from its state files.
 
     Args:
-        state_file_path: Path to the state file.
+        session_id: Session ID the files belong to.
+        paths: The session's state files, oldest segment first.
+        since: Optional Unix timestamp. Sessions that started before it are
+            rejected after reading only their first line.
 
     Returns:
         SessionStats object or None if unable to load.
     """
-    entries = []
-    try:
-        with open(state_file_path) as f:
-            for line in f:
-                entry = StateEntry.from_csv_line(line)
-                if entry:
-                    entries.append(entry)
-    except (OSError, ValueError):
-        return None
-
-    if not entries:
+    if since is not None:
+        first = read_first_entry(paths[0])
+        if first is None or first.timestamp < since:
+            return None
+
+    # Only the first and last entries are parsed in full; the rest are
+    # counted, and scanned for cache misses, by decoding just the timestamp
+    # and cache fields from the mapped files
+    entry_count = 0
+    first_entry = final_entry = None
+    misses = CacheMissDetector()
+    feed = misses.feed
+    for path in paths:
+        try:
+            with MappedStateFile(path) as m:
+                count = 0
+                for row in m.rows(("timestamp", "cache_creation", "cache_read")):
+                    count += 1
+                    feed(*row)
+                if not count:
+                    continue
+                entry_count += count
+                first_entry = first_entry or m.first_entry()
+                final_entry = m.last_entry() or final_entry
+        except (OSError, ValueError):
+            continue
+    if first_entry is None or final_entry is None:
         return None
 
-    # Extract session ID from filename (statusline.<session_id>.state)
-    stem = state_file_path.stem
-    session_id = stem.removeprefix("statusline.")
-
     # Get project_dir from the first entry's workspace_project_dir field
-    project_dir = entries[0].workspace_project_dir or "Unknown"
+    project_dir = first_entry.workspace_project_dir or "Unknown"
 
     # Aggregate stats
     stats = SessionStats(
         session_id=session_id,
         project_dir=project_dir,
-        model_id=entries[-1].model_id,
-        start_time=entries[0].timestamp,
-        end_time=entries[-1].timestamp,
-        entry_count=len(entries),
+        model_id=final_entry.model_id,
+        start_time=first_entry.timestamp,
+        end_time=final_entry.timestamp,
+        entry_count=entry_count,
     )
 
     # Use the final cumulative values
-    final_entry = entries[-1]
     stats.total_input_tokens = final_entry.total_input_tokens
     stats.total_output_tokens = final_entry.total_output_tokens
     stats.total_cache_creation = final_entry.cache_creation
@@ -168,10 +183,48 @@ def _load_session_stats(state_file_path: Path) -> SessionStats | None:
     stats.cost_usd = final_entry.cost_usd
     stats.lines_added = final_entry.lines_added
     stats.lines_removed = final_entry.lines_removed
+    stats.cache_misses = misses.count
+    stats.cache_miss_tokens = misses.tokens
 
     return stats
 
 
+def _load_sessions_from_index(index: StateIndex, since: int | None = None) -> list[SessionStats]:
+    """Load per-session statistics from the SQLite index.
+
+    Args:
+        index: An up-to-date StateIndex.
+        since: Optional Unix timestamp; only sessions starting at or after it
+            are returned.
+
+    Returns:
+        List of SessionStats, equivalent to calling _load_session_stats on
+        every state file.
+    """
+    sessions = []
+    for row in index.sessions(since=since):
+        sessions.append(
+            SessionStats(
+                session_id=row["session_id"],
+                project_dir=row["project_dir"] or "Unknown",
+                model_id=row["model_id"],
+                total_input_tokens=row["total_input_tokens"],
+                total_output_tokens=row["total_output_tokens"],
+                total_cache_creation=row["cache_creation"],
+                total_cache_read=row["cache_read"],
+                cost_usd=row["cost_usd"],
+                start_time=row["start_time"],
+                end_time=row["end_time"],
+                entry_count=row["entry_count"],
+                lines_added=row["lines_added"],
+                lines_removed=row["lines_removed"],
+                cache_misses=row["cache_misses"],
+                cache_miss_tokens=row["cache_miss_tokens"],
+            )
+        )
+    return sessions
+
+
 def _group_sessions_by_project(
     sessions: list[SessionStats], since_days: int | None = None
 ) -> dict[str, ProjectStats]:
@@ -184,9 +237,7 @@ def _group_sessions_by_project(
     Returns:
         Dictionary mapping project_dir to ProjectStats.
     """
-    cutoff_time = None
-    if since_days is not None:
-        cutoff_time = int((datetime.now() - timedelta(days=since_days)).timestamp())
+    cutoff_time = cutoff_timestamp(since_days)
 
     projects: dict[str, ProjectStats] = {}
 
@@ -212,23 +263,39 @@ def _group_sessions_by_project(
     return projects
 
 
-def load_all_projects(since_days: int | None = None) -> list[ProjectStats]:
+def load_all_projects(
+    since_days: int | None = None, use_index: bool | None = None
+) -> list[ProjectStats]:
     """Load statistics for all projects.
 
     Args:
         since_days: Only include sessions from the last N days.
+        use_index: Read session summaries from the SQLite index. None (default)
+            uses the index only if it has already been built, True builds it
+            if needed, False always parses the state files.
 
     Returns:
         List of ProjectStats objects, sorted by total tokens (descending).
     """
-    state_files = _discover_state_files()
-
-    # Load all sessions from state files
-    sessions = []
-    for state_file in state_files:
-        session = _load_session_stats(state_file)
-        if session:
-            sessions.append(session)
+    # Entries held back by write-behind belong in the report too
+    StateFile.flush_all()
+
+    # Push the time filter down so a short window never parses old history
+    cutoff = cutoff_timestamp(since_days)
+    index = open_existing_index(create=bool(use_index)) if use_index is not False else None
+
+    if index is not None:
+        try:
+            sessions = _load_sessions_from_index(index, since=cutoff)
+        finally:
+            index.close()
+    else:
+        # Load all sessions from state files
+        sessions = []
+        for session_id, paths in discover_sessions(since=cutoff):
+            session = _load_session_stats(session_id, paths, since=cutoff)
+            if session:
+                sessions.append(session)
 
     # Group sessions by project and apply date filtering
     projects_dict = _group_sessions_by_project(sessions, since_days)
@@ -0,0 +1,130 @@
+"""Archive subcommand — compress state files of sessions that went cold.
+
+Usage:
+    context-stats [session_id] archive [--days N] [--format gzip|xz] [--dry-run]
+
+Every state file last written more than N days ago is compressed in place
+(``statusline.<sid>.<n>.state.gz``). Readers decompress archives on the fly,
+so graphs, exports, reports and the index keep working unchanged.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from claude_statusline.cli.index import _format_bytes
+from claude_statusline.core.state import (
+    ARCHIVE_FORMATS,
+    StateFile,
+    _validate_session_id,
+    discover_state_files,
+    is_archived,
+)
+
+DEFAULT_IDLE_DAYS = 7
+
+
+def _parse_archive_args(argv: list[str]) -> argparse.Namespace:
+    """Parse archive subcommand arguments.
+
+    Args:
+        argv: Remaining arguments after 'archive'.
+
+    Returns:
+        Parsed arguments namespace.
+    """
+    parser = argparse.ArgumentParser(
+        prog="context-stats archive",
+        description="Compress state files of sessions idle for more than N days",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=DEFAULT_IDLE_DAYS,
+        help=f"Archive files not written for this many days (default: {DEFAULT_IDLE_DAYS})",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(ARCHIVE_FORMATS),
+        default="gzip",
+        help="Compression format (default: gzip)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the files that would be archived without touching them",
+    )
+    parser.add_argument("--no-color", action="store_true", help="Disable color output")
+    return parser.parse_args(argv)
+
+
+def run_archive(session_id: str | None, argv: list[str], colors: object) -> None:
+    """Run the archive command.
+
+    Args:
+        session_id: Only archive this session, or None for every session.
+        argv: Remaining arguments after 'archive'.
+        colors: ColorManager for output.
+    """
+    c = colors
+    args = _parse_archive_args(argv)
+    if args.days < 0:
+        sys.stderr.write("Error: --days must be zero or positive.\n")
+        sys.exit(1)
+    if session_id is not None:
+        try:
+            _validate_session_id(session_id)
+        except ValueError as e:
+            sys.stderr.write(f"Error: {e}\n")
+            sys.exit(1)
+
+    StateFile.flush_all()
+    cutoff = time.time() - args.days * 86400
+    sessions = discover_state_files(StateFile.STATE_DIR)
+    if session_id is not None:
+        sessions = {session_id: sessions.get(session_id, [])}
+
+    before = after = files = touched = 0
+    for sid, paths in sorted(sessions.items()):
+        if args.dry_run:
+            idle = []
+            for path in paths:
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                if not is_archived(path) and st.st_size and st.st_mtime < cutoff:
+                    idle.append(path)
+                    before += st.st_size
+            for path in idle:
+                print(f"  {path.name}")
+            files += len(idle)
+            touched += bool(idle)
+            continue
+
+        try:
+            archived = StateFile(sid).archive(cutoff, args.format)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"Error: failed to archive session {sid}: {e}\n")
+            sys.exit(1)
+        before += sum(a.original_size for a in archived)
+        after += sum(a.archived_size for a in archived)
+        files += len(archived)
+        touched += bool(archived)
+
+    if not files:
+        print(f"{c.dim}No state files idle for more than {args.days} day(s).{c.reset}")
+        return
+    if args.dry_run:
+        print(
+            f"\n{c.yellow}Would archive {files} file(s) from {touched} session(s) "
+            f"({_format_bytes(before)}).{c.reset}"
+        )
+        return
+    saved = (1 - after / before) * 100 if before else 0.0
+    print(
+        f"{c.green}Archived {files} file(s) from {touched} session(s): "
+        f"{_format_bytes(before)} -> {_format_bytes(after)} ({saved:.0f}% smaller).{c.reset}"
+    )
@@ -1,35 +1,76 @@
 """Cache-warm subcommand for keeping Claude Code session cache alive.
 
-Manages a background heartbeat process that prevents the Claude prompt cache
+Manages a background heartbeat that prevents the Claude prompt cache
 (~5 minute TTL) from expiring during gaps between interactions.
 
+A single detached scheduler process serves every warm session. It keeps a
+timer heap of next-due heartbeats and sleeps until the earliest one, waking
+early when ``cache-warm on/off`` sends a session id to its datagram socket
+(``cache-warm.sock``). Heartbeats adapt to activity: a heartbeat is due one
+interval after the later of the session's last state entry and the last
+heartbeat, so none is sent while the session itself keeps the cache warm. The per-session ``cache-warm.<session_id>.json`` files
+keep their pid/expiry format; ``pid`` is the scheduler's pid, and the
+scheduler reads them as its registry. It exits once no session is warm.
+
+``cache-warm simulate`` replays recorded sessions to estimate what a
+heartbeat policy would have saved before turning it on.
+
 Usage:
     context-stats <session_id> cache-warm on [duration]
     context-stats <session_id> cache-warm off
+    context-stats cache-warm simulate [--interval 4m] [--duration 30m]
 """
 
 from __future__ import annotations
 
+import heapq
 import json
 import os
 import re
+import select
 import signal
+import socket
 import sys
 import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import IO
+
+from claude_statusline.graphs.statistics import (
+    CACHE_READ_MULTIPLIER,
+    CACHE_TTL_SECONDS,
+    CacheMissDetector,
+    model_price,
+)
 
 # Default heartbeat settings
 DEFAULT_DURATION = 30 * 60  # 30 minutes
 DEFAULT_INTERVAL = 4 * 60  # 4 minutes (under 5-min cache TTL)
 
+# Counters kept in the warm-state JSON by the scheduler
+_SENT_KEY = "heartbeats_sent"
+_SKIPPED_KEY = "heartbeats_skipped"
+
 # State file path template: ~/.claude/statusline/cache-warm.<session_id>.json
 _STATE_DIR = Path.home() / ".claude" / "statusline"
 
 
+# Shared scheduler files, next to the per-session state
+_SCHEDULER_PID = "cache-warm-scheduler.pid"
+_SCHEDULER_SOCKET = "cache-warm.sock"
+_SCHEDULER_LOCK = "cache-warm.lock"
+
+
 def _warm_state_path(session_id: str) -> Path:
     return _STATE_DIR / f"cache-warm.{session_id}.json"
 
 
+def _heartbeat_path(session_id: str) -> Path:
+    return _STATE_DIR / f"cache-warm.{session_id}.heartbeat"
+
+
 def _parse_duration(value: str) -> int:
     """Parse a human-readable duration like '30m', '1h', '90s' into seconds.
 
@@ -55,7 +96,9 @@ def load_warm_state(session_id: str) -> dict | None:
     """Load persisted cache-warm state for a session.
 
     Returns:
-        Dict with keys: pid, start_time, expiry_time, interval — or None if not found.
+        Dict with keys: pid, start_time, expiry_time, interval and, once the
+        scheduler has run, heartbeats_sent and heartbeats_skipped — or None
+        if not found.
     """
     path = _warm_state_path(session_id)
     if not path.exists():
@@ -114,39 +157,255 @@ def is_cache_warm_active(session_id: str) -> tuple[bool, int]:
     return True, remaining
 
 
-def _run_heartbeat_loop(session_id: str, expiry_time: int, interval: int) -> None:
-    """Heartbeat loop — runs in a forked background process.
+def _clear_heartbeat(session_id: str) -> None:
+    try:
+        _heartbeat_path(session_id).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+@contextmanager
+def _scheduler_lock() -> Iterator[IO[str]]:
+    """Serialize scheduler start-up, registration and shutdown.
+
+    Yields the open lock file so a forked child can close its inherited copy
+    (an flock is held until every descriptor sharing it is closed).
+    """
+    import fcntl
+
+    _STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(_STATE_DIR / _SCHEDULER_LOCK, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield lock
+
+
+def _scheduler_pid() -> int:
+    """Return the pid of the running scheduler, or 0 if none is running."""
+    try:
+        pid = int((_STATE_DIR / _SCHEDULER_PID).read_text().strip())
+    except (OSError, ValueError):
+        return 0
+    return pid if pid > 0 and _is_process_alive(pid) else 0
+
+
+def _notify_scheduler(session_id: str) -> None:
+    """Tell the scheduler to re-read a session's warm state.
 
-    Emits a tiny no-op write to the session state file every `interval` seconds
-    to signal cache activity without touching the main CSV data stream.
-    Exits automatically when expiry_time is reached.
+    Best effort: when no scheduler is listening, there is nothing to update.
     """
+    if not hasattr(socket, "AF_UNIX"):
+        return
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.sendto(session_id.encode(), str(_STATE_DIR / _SCHEDULER_SOCKET))
+    except OSError:
+        pass
+
+
+def _last_activity(session_id: str) -> int:
+    """Timestamp of the session's last recorded request, or 0 if unknown."""
+    from claude_statusline.core.state import StateFile
+
+    try:
+        entry = StateFile(session_id).read_last_entry()
+    except (OSError, ValueError):
+        return 0
+    return entry.timestamp if entry else 0
+
+
+class HeartbeatScheduler:
+    """Timer heap of heartbeats for every session registered to one process.
+
+    The session JSON files are the source of truth: a session belongs to this
+    scheduler while its file names our pid and has not expired. Heap entries
+    are ``(due, session_id)``; an entry is stale once ``_due`` holds a
+    different time for the session and is skipped when popped.
+
+    A popped session whose cache was refreshed by activity less than an
+    interval ago is deferred to one interval after that activity and counted
+    as skipped, so heartbeats only fire as the cache TTL deadline nears.
+    """
+
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        self._heap: list[tuple[int, str]] = []
+        self._due: dict[str, int] = {}
+        self._last_beat: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def _schedule(self, session_id: str, due: int) -> None:
+        self._due[session_id] = due
+        heapq.heappush(self._heap, (due, session_id))
+
+    def _owned_state(self, session_id: str) -> dict | None:
+        state = load_warm_state(session_id)
+        if state is None or state.get("pid") != self.pid:
+            return None
+        return state
+
+    def load(self, session_id: str, now: int) -> None:
+        """(Re)register a session from its state file; beat it right away."""
+        if self._owned_state(session_id) is None:
+            self._due.pop(session_id, None)
+            self._last_beat.pop(session_id, None)
+        else:
+            self._schedule(session_id, now)
+
+    def scan(self, now: int) -> None:
+        """Register every session whose state file names this scheduler."""
+        self._due.clear()
+        self._heap.clear()
+        for path in _STATE_DIR.glob("cache-warm.*.json"):
+            self.load(path.name[len("cache-warm.") : -len(".json")], now)
+
+    def next_due(self) -> int | None:
+        """Earliest live due time, dropping stale heap entries."""
+        while self._heap:
+            due, session_id = self._heap[0]
+            if self._due.get(session_id) == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def run_due(self, now: int) -> None:
+        """Send every heartbeat due at ``now`` and expire finished sessions."""
+        while True:
+            due = self.next_due()
+            if due is None or due > now:
+                return
+            _, session_id = heapq.heappop(self._heap)
+            del self._due[session_id]
+            self._beat(session_id, now)
+
+    def _beat(self, session_id: str, now: int) -> None:
+        state = self._owned_state(session_id)
+        if state is None:
+            return
+        expiry = state.get("expiry_time", 0)
+        if now >= expiry:
+            _clear_warm_state(session_id)
+            _clear_heartbeat(session_id)
+            self._last_beat.pop(session_id, None)
+            return
+        interval = state.get("interval") or DEFAULT_INTERVAL
+        last = max(_last_activity(session_id), self._last_beat.get(session_id, 0))
+        if now < last + interval:
+            self._count(session_id, state, _SKIPPED_KEY)
+            self._schedule(session_id, min(last + interval, expiry))
+            return
+        try:
+            _heartbeat_path(session_id).write_text(str(now))
+        except OSError:
+            pass
+        self._last_beat[session_id] = now
+        self._count(session_id, state, _SENT_KEY)
+        self._schedule(session_id, min(now + interval, expiry))
+
+    def _count(self, session_id: str, state: dict, key: str) -> None:
+        """Increment a heartbeat counter unless ``on``/``off`` rewrote the state."""
+        with _scheduler_lock():
+            current = self._owned_state(session_id)
+            if current is None or current.get("start_time") != state.get("start_time"):
+                return
+            current.setdefault(_SENT_KEY, 0)
+            current.setdefault(_SKIPPED_KEY, 0)
+            current[key] += 1
+            _save_warm_state(session_id, current)
+
+    def serve(self, sock: socket.socket) -> None:
+        """Sleep until the next heartbeat or registration; return when idle.
+
+        Args:
+            sock: Bound datagram socket receiving session ids.
+        """
+        sock.setblocking(False)
+        self.scan(int(time.time()))
+        while True:
+            self.run_due(int(time.time()))
+            due = self.next_due()
+            if due is None and self._shutdown():
+                return
+            timeout = None if due is None else max(0.0, due - time.time())
+            readable, _, _ = select.select([sock], [], [], timeout)
+            if readable:
+                now = int(time.time())
+                for session_id in self._drain(sock):
+                    self.load(session_id, now)
+
+    @staticmethod
+    def _drain(sock: socket.socket) -> set[str]:
+        session_ids = set()
+        while True:
+            try:
+                data = sock.recv(1024)
+            except OSError:
+                return session_ids
+            session_ids.add(data.decode(errors="replace"))
+
+    def _shutdown(self) -> bool:
+        """Release the scheduler files unless a session registered meanwhile."""
+        with _scheduler_lock():
+            self.scan(int(time.time()))
+            if self._due:
+                return False
+            for name in (_SCHEDULER_PID, _SCHEDULER_SOCKET):
+                try:
+                    (_STATE_DIR / name).unlink(missing_ok=True)
+                except OSError:
+                    pass
+            return True
+
+
+def _run_scheduler() -> None:
+    """Scheduler main — runs in a forked background process."""
     # Detach from parent: new session, close stdio
     os.setsid()
     sys.stdin.close()
     sys.stdout.close()
     sys.stderr.close()
 
-    heartbeat_file = _STATE_DIR / f"cache-warm.{session_id}.heartbeat"
+    sock_path = _STATE_DIR / _SCHEDULER_SOCKET
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        # Left over by a scheduler that died; the lock and pid file rule out a live one
+        sock_path.unlink(missing_ok=True)
+        # Bind before scanning so no registration falls between the two
+        sock.bind(str(sock_path))
+        HeartbeatScheduler(os.getpid()).serve(sock)
 
-    while True:
-        now = int(time.time())
-        if now >= expiry_time:
-            # Expired — clean up and exit
-            _clear_warm_state(session_id)
-            try:
-                heartbeat_file.unlink(missing_ok=True)
-            except OSError:
-                pass
-            break
 
-        # Write heartbeat timestamp
+def _start_scheduler(lock: IO[str]) -> int:
+    """Fork the shared scheduler and record its pid. Call under the lock.
+
+    Exits with an error if fork fails.
+    """
+    # Set SIGCHLD to SIG_IGN before fork so the kernel auto-reaps the child (no zombie).
+    # Restore the original handler in the parent afterwards to avoid breaking subprocess calls.
+    # signal.SIGCHLD only exists on Unix; guard for portability in test environments.
+    _has_sigchld = hasattr(signal, "SIGCHLD")
+    old_sigchld = signal.signal(signal.SIGCHLD, signal.SIG_IGN) if _has_sigchld else None
+    try:
+        pid = os.fork()
+    except OSError as e:
+        if _has_sigchld:
+            signal.signal(signal.SIGCHLD, old_sigchld)
+        sys.stderr.write(f"Error: fork failed: {e}\n")
+        sys.exit(1)
+
+    if pid == 0:
+        # Child process — run the scheduler and exit
         try:
-            heartbeat_file.write_text(str(now))
-        except OSError:
+            lock.close()
+            _run_scheduler()
+        except Exception:
             pass
+        os._exit(0)
 
-        time.sleep(interval)
+    if _has_sigchld:
+        signal.signal(signal.SIGCHLD, old_sigchld)
+    (_STATE_DIR / _SCHEDULER_PID).write_text(str(pid))
+    return pid
 
 
 def cmd_cache_warm_on(session_id: str, duration_str: str | None, colors: object) -> None:
@@ -179,38 +438,25 @@ def cmd_cache_warm_on(session_id: str, duration_str: str | None, colors: object)
             f"({mins}m {secs}s remaining). Refreshing duration.{c.reset}"
         )
 
-    now = int(time.time())
-    expiry = now + duration
-
-    # Fork a background process for the heartbeat loop
     if not hasattr(os, "fork"):
         sys.stderr.write("Error: cache-warm requires a Unix-like OS (fork not available).\n")
         sys.exit(1)
 
-    # Set SIGCHLD to SIG_IGN before fork so the kernel auto-reaps the child (no zombie).
-    # Restore the original handler in the parent afterwards to avoid breaking subprocess calls.
-    # signal.SIGCHLD only exists on Unix; guard for portability in test environments.
-    _has_sigchld = hasattr(signal, "SIGCHLD")
-    old_sigchld = signal.signal(signal.SIGCHLD, signal.SIG_IGN) if _has_sigchld else None
-    try:
-        pid = os.fork()
-    except OSError as e:
-        if _has_sigchld:
-            signal.signal(signal.SIGCHLD, old_sigchld)
-        sys.stderr.write(f"Error: fork failed: {e}\n")
-        sys.exit(1)
+    # Stop a per-session heartbeat process left by an older version
+    if old_state:
+        old_pid = old_state.get("pid", 0)
+        if old_pid and old_pid != _scheduler_pid() and _is_process_alive(old_pid):
+            try:
+                os.kill(old_pid, signal.SIGTERM)
+            except OSError:
+                pass
+            _clear_heartbeat(session_id)
 
-    if pid == 0:
-        # Child process — run heartbeat loop and exit
-        try:
-            _run_heartbeat_loop(session_id, expiry, DEFAULT_INTERVAL)
-        except Exception:
-            pass
-        os._exit(0)
-    else:
-        # Parent process — restore SIGCHLD handler, persist state, stop old process
-        if _has_sigchld:
-            signal.signal(signal.SIGCHLD, old_sigchld)
+    now = int(time.time())
+    expiry = now + duration
+
+    with _scheduler_lock() as lock:
+        pid = _scheduler_pid() or _start_scheduler(lock)
         # Persist state first (avoids race window when refreshing)
         _save_warm_state(
             session_id,
@@ -219,28 +465,19 @@ def cmd_cache_warm_on(session_id: str, duration_str: str | None, colors: object)
                 "start_time": now,
                 "expiry_time": expiry,
                 "interval": DEFAULT_INTERVAL,
+                _SENT_KEY: (old_state or {}).get(_SENT_KEY, 0),
+                _SKIPPED_KEY: (old_state or {}).get(_SKIPPED_KEY, 0),
             },
         )
-        # Terminate old process only after new state is persisted
-        if old_state:
-            old_pid = old_state.get("pid", 0)
-            if old_pid and _is_process_alive(old_pid):
-                try:
-                    os.kill(old_pid, signal.SIGTERM)
-                except OSError:
-                    pass
-            heartbeat_file = _STATE_DIR / f"cache-warm.{session_id}.heartbeat"
-            try:
-                heartbeat_file.unlink(missing_ok=True)
-            except OSError:
-                pass
-        mins = duration // 60
-        remaining_fmt = f"{mins}m" if duration % 60 == 0 else f"{mins}m {duration % 60}s"
-        print(
-            f"{c.green}Cache-warm activated for session {session_id}.{c.reset}\n"
-            f"{c.dim}Heartbeat every {DEFAULT_INTERVAL // 60} minutes, "
-            f"auto-stops in {remaining_fmt}.{c.reset}"
-        )
+        _notify_scheduler(session_id)
+
+    mins = duration // 60
+    remaining_fmt = f"{mins}m" if duration % 60 == 0 else f"{mins}m {duration % 60}s"
+    print(
+        f"{c.green}Cache-warm activated for session {session_id}.{c.reset}\n"
+        f"{c.dim}Heartbeat {DEFAULT_INTERVAL // 60} minutes after the last activity, "
+        f"auto-stops in {remaining_fmt}.{c.reset}"
+    )
 
 
 def cmd_cache_warm_off(session_id: str, colors: object, silent: bool = False) -> None:
@@ -259,31 +496,226 @@ def cmd_cache_warm_off(session_id: str, colors: object, silent: bool = False) ->
             print(f"{c.dim}No active cache-warm for session {session_id}.{c.reset}")
         return
 
+    # The shared scheduler keeps running for other sessions; only a
+    # per-session process from an older version is terminated
     pid = state.get("pid", 0)
-    if pid and _is_process_alive(pid):
+    if pid and pid != _scheduler_pid() and _is_process_alive(pid):
         try:
             os.kill(pid, signal.SIGTERM)
         except OSError:
             pass
 
     _clear_warm_state(session_id)
-
-    # Remove heartbeat file too
-    heartbeat_file = _STATE_DIR / f"cache-warm.{session_id}.heartbeat"
-    try:
-        heartbeat_file.unlink(missing_ok=True)
-    except OSError:
-        pass
+    _clear_heartbeat(session_id)
+    _notify_scheduler(session_id)
 
     if not silent:
         print(f"{c.green}Cache-warm stopped for session {session_id}.{c.reset}")
+        if _SENT_KEY in state:
+            print(
+                f"{c.dim}{state[_SENT_KEY]} heartbeats sent, "
+                f"{state.get(_SKIPPED_KEY, 0)} skipped while the session was active.{c.reset}"
+            )
+
+
+def _format_seconds(seconds: int) -> str:
+    """Format a duration as e.g. '4m', '4m 30s' or '45s'."""
+    mins, secs = divmod(seconds, 60)
+    if not mins:
+        return f"{secs}s"
+    return f"{mins}m" if not secs else f"{mins}m {secs}s"
+
+
+@dataclass
+class SimulationResult:
+    """Totals from replaying recorded sessions under a heartbeat policy."""
+
+    interval: int
+    duration: int
+    sessions: int = 0
+    requests: int = 0
+    idle_gaps: int = 0
+    misses: int = 0
+    miss_cost: float = 0.0
+    misses_avoided: int = 0
+    avoided_cost: float = 0.0
+    heartbeats: int = 0
+    heartbeat_cost: float = 0.0
+
+    @property
+    def net_savings(self) -> float:
+        """Re-spend avoided minus what the heartbeats themselves cost."""
+        return self.avoided_cost - self.heartbeat_cost
+
+
+def simulate_session(
+    rows: Iterable[tuple[int, int, int]],
+    model_id: str,
+    result: SimulationResult,
+    ttl: int = CACHE_TTL_SECONDS,
+) -> None:
+    """Replay one session's requests under ``result``'s heartbeat policy.
+
+    Heartbeats fire every ``interval`` after a request until the next request
+    or until ``duration`` of idle time has passed. A gap stays warm when the
+    last heartbeat (or request) before it is within the TTL. Each heartbeat
+    is priced as a cache read of everything the previous request had cached;
+    each cache miss it prevents saves that miss's write-vs-read difference.
+
+    Args:
+        rows: (timestamp, cache_creation, cache_read) per request, in order.
+        model_id: Model the session ran on, for pricing.
+        result: Totals to add this session to; also holds the policy.
+        ttl: Prompt-cache TTL in seconds.
+    """
+    interval, duration = result.interval, result.duration
+    max_beats = duration // interval
+    beat_price = model_price(model_id)[0] * CACHE_READ_MULTIPLIER / 1_000_000
+    feed = CacheMissDetector(model_id, ttl).feed
+    prev_ts = None
+    cached = 0
+    for ts, creation, read in rows:
+        result.requests += 1
+        miss = feed(ts, creation, read)
+        if prev_ts is not None:
+            gap = ts - prev_ts
+            beats = min((gap - 1) // interval, max_beats) if gap > interval else 0
+            if beats:
+                result.heartbeats += beats
+                result.heartbeat_cost += beats * cached * beat_price
+            if gap > ttl:
+                result.idle_gaps += 1
+            if miss is not None:
+                result.misses += 1
+                result.miss_cost += miss.extra_cost
+                if gap - beats * interval <= ttl:
+                    result.misses_avoided += 1
+                    result.avoided_cost += miss.extra_cost
+        prev_ts = ts
+        cached = creation + read
+    result.sessions += 1
+
+
+def simulate_policy(interval: int, duration: int, since: int | None = None) -> SimulationResult:
+    """Replay every recorded session under a heartbeat policy.
+
+    Sessions are streamed one state file at a time, decoding only the
+    timestamp and cache columns, so memory stays flat across months of
+    history.
+
+    Args:
+        interval: Seconds between heartbeats; must be under the cache TTL.
+        duration: Longest idle stretch, in seconds, kept warm after a request.
+        since: Optional Unix timestamp; earlier requests are ignored.
+
+    Returns:
+        SimulationResult with the totals over all sessions.
+    """
+    from claude_statusline.core.state import MappedStateFile, StateFile, discover_sessions
+
+    StateFile.flush_all()
+    result = SimulationResult(interval=interval, duration=duration)
+    fields = ("timestamp", "cache_creation", "cache_read")
 
+    for _session_id, paths in discover_sessions(since=since):
+        try:
+            with MappedStateFile(paths[-1]) as m:
+                last = m.last_entry()
+        except (OSError, ValueError):
+            continue
+        if last is None:
+            continue
+
+        def rows(paths: list[Path] = paths) -> Iterator[tuple[int, int, int]]:
+            for path in paths:
+                try:
+                    with MappedStateFile(path) as m:
+                        for row in m.rows(fields):
+                            if since is None or row[0] >= since:
+                                yield row
+                except (OSError, ValueError):
+                    continue
+
+        simulate_session(rows(), last.model_id, result)
+    return result
+
+
+def cmd_cache_warm_simulate(argv: list[str], colors: object) -> None:
+    """Handle 'cache-warm simulate [--interval 4m] [--duration 30m]'.
+
+    Args:
+        argv: Arguments after 'simulate'.
+        colors: ColorManager instance for output.
+    """
+    import argparse
 
-def run_cache_warm(session_id: str, argv: list[str], colors: object) -> None:
+    c = colors
+    parser = argparse.ArgumentParser(
+        prog="context-stats cache-warm simulate",
+        description=(
+            "Replay recorded sessions and estimate what a heartbeat policy "
+            "would have saved in cache re-writes versus its own cost."
+        ),
+    )
+    parser.add_argument("--interval", default="4m", help="Time between heartbeats (default: 4m)")
+    parser.add_argument(
+        "--duration", default="30m", help="Idle time kept warm after a request (default: 30m)"
+    )
+    parser.add_argument("--since-days", type=int, default=None, help="Only replay the last N days")
+    parser.add_argument("--json", action="store_true", help="Print the totals as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        interval = _parse_duration(args.interval)
+        duration = _parse_duration(args.duration)
+    except ValueError as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(1)
+    if not 0 < interval < CACHE_TTL_SECONDS:
+        sys.stderr.write(
+            f"Error: --interval must be between 1s and the {CACHE_TTL_SECONDS // 60}m cache TTL.\n"
+        )
+        sys.exit(1)
+
+    from claude_statusline.core.state import cutoff_timestamp
+
+    result = simulate_policy(interval, duration, since=cutoff_timestamp(args.since_days))
+
+    if args.json:
+        data = asdict(result)
+        data["net_savings"] = result.net_savings
+        print(json.dumps(data, indent=2))
+        return
+
+    print(
+        f"\n{c.bold}{c.magenta}Cache-Warm Simulation{c.reset} "
+        f"{c.dim}(heartbeat every {_format_seconds(interval)}, up to "
+        f"{_format_seconds(duration)} idle; {result.sessions} sessions, "
+        f"{result.requests:,} requests){c.reset}\n"
+    )
+    if not result.requests:
+        print(f"  {c.dim}No recorded sessions to replay.{c.reset}\n")
+        return
+
+    net = result.net_savings
+    net_color = c.green if net >= 0 else c.red
+    rows = [
+        (f"Idle gaps > {CACHE_TTL_SECONDS // 60}m", f"{result.idle_gaps:,}", ""),
+        ("Cache misses", f"{result.misses:,}", f"${result.miss_cost:,.2f} re-spend"),
+        ("Avoided by policy", f"{result.misses_avoided:,}", f"${result.avoided_cost:,.2f}"),
+        ("Heartbeats", f"{result.heartbeats:,}", f"${result.heartbeat_cost:,.2f}"),
+    ]
+    for label, count, cost in rows:
+        line = f"  {label:<20} {count:>10}"
+        print(f"{line}   {c.dim}{cost}{c.reset}" if cost else line)
+    print(f"  {'Net savings':<20} {'':>10}   {net_color}{c.bold}${net:,.2f}{c.reset}\n")
+
+
+def run_cache_warm(session_id: str | None, argv: list[str], colors: object) -> None:
     """Dispatch cache-warm subcommand.
 
     Args:
-        session_id: Session ID.
+        session_id: Session ID (unused by 'simulate').
         argv: Remaining arguments after 'cache-warm'.
         colors: ColorManager for output.
     """
@@ -295,11 +727,20 @@ def run_cache_warm(session_id: str, argv: list[str], colors: object) -> None:
             f"  context-stats <session_id> cache-warm on [duration]   "
             f"# e.g. 30m, 1h\n"
             f"  context-stats <session_id> cache-warm off\n"
+            f"  context-stats cache-warm simulate [--interval 4m] [--duration 30m]\n"
         )
         sys.exit(0)
 
     subcmd = argv[0]
 
+    if subcmd == "simulate":
+        cmd_cache_warm_simulate(argv[1:], c)
+        return
+
+    if session_id is None:
+        sys.stderr.write("Error: No session found to warm.\n")
+        sys.exit(1)
+
     if subcmd == "on":
         duration_str = argv[1] if len(argv) > 1 else None
         cmd_cache_warm_on(session_id, duration_str, c)
@@ -309,6 +750,6 @@ def run_cache_warm(session_id: str, argv: list[str], colors: object) -> None:
 
     else:
         sys.stderr.write(
-            f"Error: Unknown cache-warm subcommand '{subcmd}'. Use 'on [duration]' or 'off'.\n"
+            f"Error: Unknown cache-warm subcommand '{subcmd}'. Use 'on [duration]', 'off' or 'simulate'.\n"
         )
         sys.exit(1)
@@ -15,6 +15,9 @@ Actions:
     sessions    List recent sessions
     explain     Diagnostic dump of Claude Code's JSON context (pipe JSON to stdin)
     cache-warm  Keep session prompt cache alive via a background heartbeat
+    index       Manage the SQLite index used by report and sessions
+    archive     Compress state files of idle sessions
+    perf        Summarize statusline refresh timings (p50/p95/p99 per phase)
 
 Options:
     --type <cumulative|delta|io|both|all>  Graph type to display (default: delta)
@@ -35,7 +38,12 @@ from pathlib import Path
 from claude_statusline import __version__
 from claude_statusline.core.colors import ColorManager
 from claude_statusline.core.config import Config
-from claude_statusline.core.state import StateFile, _validate_session_id
+from claude_statusline.core.state import (
+    StateEntry,
+    StateFile,
+    _validate_session_id,
+    parse_state_filename,
+)
 from claude_statusline.graphs.renderer import GraphDimensions, GraphRenderer
 from claude_statusline.graphs.statistics import calculate_deltas, detect_compaction_events
 from claude_statusline.ui.icons import get_activity_tier, get_tier_label
@@ -71,6 +79,10 @@ ACTIONS:
     explain       Diagnostic dump of Claude Code's JSON context (pipe JSON to stdin)
     cache-warm    Keep session prompt cache alive via a background heartbeat
     report        Generate comprehensive token usage analytics across all projects
+    index         Manage the optional SQLite index used by report and sessions
+    archive       Compress state files not written for N days (gzip or xz)
+    perf          Summarize statusline refresh timings recorded with trace_metrics
+    dev           Developer tools (gen-history: synthetic state for load tests)
 
 SESSIONS OPTIONS:
     --minutes N    Show sessions from the last N minutes (default: 5)
@@ -79,6 +91,23 @@ CACHE-WARM OPTIONS:
     on [duration]  Start heartbeat for the given duration (e.g. 30m, 1h). Default: 30m
     off            Stop an active heartbeat immediately
 
+INDEX OPTIONS:
+    rebuild        Build (or rebuild) ~/.claude/statusline/index.db from all state files
+    status         Show index statistics (files, sessions, entries, size)
+
+ARCHIVE OPTIONS:
+    --days N       Archive files not written for N days (default: 7)
+    --format F     gzip (default) or xz
+    --dry-run      List the files that would be archived
+
+PERF OPTIONS:
+    --last N       Only use the newest N refreshes (default: 500)
+
+DEV OPTIONS:
+    gen-history --output DIR [--sessions N] [--lines N] [--projects N]
+                [--models M[:W],...] [--days N] [--compactions N] [--seed N]
+                   Write a synthetic history to DIR/.claude/statusline
+
 GRAPH OPTIONS:
     --type <type>  Graph type to display:
                    - delta: Context growth per interaction (default)
@@ -96,6 +125,9 @@ EXPORT OPTIONS:
 
 GLOBAL OPTIONS:
     --no-color     Disable color output
+    --profile[=cprofile|tracemalloc]
+                   Profile the action; writes a .pstats or .tracemalloc file to
+                   the current directory and prints the top hotspots to stderr
     --version, -V  Show version and exit
     --help         Show this help message
 
@@ -143,6 +175,9 @@ EXAMPLES:
     # Stop an active cache-warm heartbeat
     context-stats abc123def cache-warm off
 
+    # Estimate what a 4m heartbeat would have saved across past sessions
+    context-stats cache-warm simulate --interval 4m --duration 30m
+
     # Output to file (no colors, single run)
     context-stats abc123def graph --no-watch --no-color > output.txt
 
@@ -155,6 +190,22 @@ EXAMPLES:
     # Generate report for last 30 days
     context-stats report --since-days 30
 
+    # Build the SQLite index so report/sessions skip re-parsing every state file
+    context-stats index rebuild
+
+    # Compress state files of sessions idle for more than 30 days
+    context-stats archive --days 30
+
+    # Show where statusline time goes (needs trace_metrics=true)
+    context-stats perf
+
+    # Profile a slow report (writes context-stats-report-<time>.pstats)
+    context-stats --profile report
+
+    # 1,000 synthetic sessions of 5,000 rows, then report over them
+    context-stats dev gen-history --output /tmp/big --sessions 1000 --lines 5000
+    HOME=/tmp/big context-stats report
+
 DATA SOURCE:
     Reads token history from ~/.claude/statusline/statusline.<session_id>.state
 """
@@ -162,7 +213,18 @@ DATA SOURCE:
 
 
 # Known action names — used to distinguish actions from session IDs in argv
-_KNOWN_ACTIONS = {"graph", "export", "explain", "cache-warm", "report", "sessions"}
+_KNOWN_ACTIONS = {
+    "graph",
+    "export",
+    "explain",
+    "cache-warm",
+    "report",
+    "sessions",
+    "index",
+    "archive",
+    "perf",
+    "dev",
+}
 
 
 def _normalize_argv(argv: list[str]) -> tuple[str, str | None, list[str]]:
@@ -372,7 +434,8 @@ def render_once(
 
     # Get session name and project from entries
     file_path = state_file.find_latest_state_file()
-    session_name = file_path.stem.removeprefix("statusline.") if file_path else "unknown"
+    parsed = parse_state_filename(file_path.name) if file_path else None
+    session_name = parsed[0] if parsed else "unknown"
 
     # Get project name from the last entry (most recent)
     last_entry = entries[-1]
@@ -662,6 +725,51 @@ def show_waiting_message(
     print(_format_waiting_message(colors, session_id, message))
 
 
+def _recent_sessions_from_index(
+    cutoff: float,
+) -> list[tuple[float, str, StateEntry | None]] | None:
+    """Return recent sessions from the SQLite index, or None if it is not built.
+
+    Args:
+        cutoff: Only include state files modified at or after this Unix time.
+
+    Returns:
+        List of (mtime, session_id, last_entry) tuples, most recent first.
+    """
+    from claude_statusline.core.index import open_existing_index
+
+    index = open_existing_index()
+    if index is None:
+        return None
+    try:
+        rows = index.recent_files(cutoff)
+    finally:
+        index.close()
+
+    sessions: list[tuple[float, str, StateEntry | None]] = []
+    for row in rows:
+        last_entry = None
+        if row["end_time"] is not None:
+            last_entry = StateEntry(
+                timestamp=row["end_time"],
+                total_input_tokens=row["total_input_tokens"],
+                total_output_tokens=row["total_output_tokens"],
+                current_input_tokens=row["current_input_tokens"],
+                current_output_tokens=row["current_output_tokens"],
+                cache_creation=row["cache_creation"],
+                cache_read=row["cache_read"],
+                cost_usd=row["cost_usd"],
+                lines_added=row["lines_added"],
+                lines_removed=row["lines_removed"],
+                session_id=row["file_session_id"],
+                model_id=row["model_id"],
+                workspace_project_dir=row["project_dir"],
+                context_window_size=row["context_window_size"],
+            )
+        sessions.append((row["file_mtime"], row["file_session_id"], last_entry))
+    return sessions
+
+
 def run_sessions(minutes: int, colors: ColorManager) -> None:
     """List recent sessions within the given time window.
 
@@ -669,24 +777,19 @@ def run_sessions(minutes: int, colors: ColorManager) -> None:
         minutes: Show sessions active within the last N minutes
         colors: ColorManager instance
     """
-    state_file = StateFile(None)
+    StateFile.flush_all()
     cutoff = time.time() - (minutes * 60)
 
-    sessions: list[tuple[float, str, Path]] = []
-    for file_path in state_file.STATE_DIR.glob("statusline.*.state"):
-        try:
-            mtime = file_path.stat().st_mtime
-        except OSError:
-            continue
-        if mtime >= cutoff:
-            name = file_path.stem
-            if name.startswith("statusline."):
-                session_id = name.removeprefix("statusline.")
-                if session_id:
-                    sessions.append((mtime, session_id, file_path))
-
-    # Sort by most recent first
-    sessions.sort(key=lambda x: x[0], reverse=True)
+    # Prefer the SQLite index when it has been built: it already holds the last
+    # entry of every session, so no state file needs to be re-read.
+    indexed = _recent_sessions_from_index(cutoff)
+    if indexed is not None:
+        sessions = indexed
+    else:
+        sessions = [
+            (s.mtime, s.session_id, s.last_entry)
+            for s in StateFile.summarize_sessions(since=cutoff)
+        ]
 
     if not sessions:
         print(f"{colors.yellow}No sessions found in the last {minutes} minute(s).{colors.reset}")
@@ -699,11 +802,7 @@ def run_sessions(minutes: int, colors: ColorManager) -> None:
         f"{colors.dim}(last {minutes} min){colors.reset}\n"
     )
 
-    for mtime, session_id, _file_path in sessions:
-        # Read last entry for metadata
-        sf = StateFile(session_id)
-        last_entry = sf.read_last_entry()
-
+    for mtime, session_id, last_entry in sessions:
         # Format time ago
         ago = now - mtime
         if ago < 60:
@@ -757,8 +856,25 @@ def main() -> None:
     """Main entry point for context-stats CLI."""
     _ensure_utf8_stdout()
 
+    from claude_statusline.cli.profile import pop_profile_flag, run_profiled
+
+    # --profile is global: strip it before any action parser sees it
+    profile_mode, sys.argv[1:] = pop_profile_flag(sys.argv[1:])
+
     args = parse_args()
 
+    if profile_mode:
+        run_profiled(profile_mode, args.action, lambda: _run_action(args))
+    else:
+        _run_action(args)
+
+
+def _run_action(args: argparse.Namespace) -> None:
+    """Run the parsed action.
+
+    Args:
+        args: Namespace from parse_args.
+    """
     if args.action == "explain":
         import json
 
@@ -789,19 +905,24 @@ def main() -> None:
         from claude_statusline.cli.cache_warm import run_cache_warm
 
         session_id = args.session_id
-        if session_id is None:
+        cache_warm_argv = args.remaining
+        if cache_warm_argv[:1] == ["simulate"]:
+            # Replays every recorded session; no session to resolve
+            cache_warm_argv = [a for a in cache_warm_argv if a != "--no-color"]
+        elif session_id is None:
             # Resolve latest session for cache-warm (requires a real session_id)
             sf = StateFile(None)
             latest = sf.find_latest_state_file()
-            if latest:
-                session_id = latest.stem.removeprefix("statusline.")
+            parsed = parse_state_filename(latest.name) if latest else None
+            if parsed:
+                session_id = parsed[0]
             else:
                 sys.stderr.write("Error: No session data found. Cannot start cache-warm.\n")
                 sys.exit(1)
 
         color_enabled = "--no-color" not in sys.argv and sys.stdout.isatty()
         colors = ColorManager(enabled=color_enabled)
-        run_cache_warm(session_id, args.remaining, colors)
+        run_cache_warm(session_id, cache_warm_argv, colors)
         return
 
     if args.action == "sessions":
@@ -850,6 +971,38 @@ def main() -> None:
         run_report(args.remaining)
         return
 
+    if args.action == "index":
+        from claude_statusline.cli.index import run_index
+
+        color_enabled = "--no-color" not in sys.argv and sys.stdout.isatty()
+        colors = ColorManager(enabled=color_enabled)
+        run_index(args.remaining, colors)
+        return
+
+    if args.action == "archive":
+        from claude_statusline.cli.archive import run_archive
+
+        color_enabled = "--no-color" not in sys.argv and sys.stdout.isatty()
+        colors = ColorManager(enabled=color_enabled)
+        run_archive(args.session_id, args.remaining, colors)
+        return
+
+    if args.action == "perf":
+        from claude_statusline.cli.perf import run_perf
+
+        color_enabled = "--no-color" not in sys.argv and sys.stdout.isatty()
+        colors = ColorManager(enabled=color_enabled)
+        run_perf(args.remaining, colors)
+        return
+
+    if args.action == "dev":
+        from claude_statusline.cli.dev import run_dev
+
+        color_enabled = "--no-color" not in sys.argv and sys.stdout.isatty()
+        colors = ColorManager(enabled=color_enabled)
+        run_dev(args.remaining, colors)
+        return
+
     # Default action: graph
     # Load config for token_detail setting
     config = Config.load()
@@ -0,0 +1,292 @@
+"""Dev subcommand — developer tools for load and scaling tests.
+
+Usage:
+    context-stats dev gen-history --output DIR [--sessions N] [--lines N]
+        [--projects N] [--models SPEC] [--days N] [--compactions N]
+        [--idle-ratio R] [--seed N]
+
+``gen-history`` writes a synthetic state directory to ``DIR/.claude/statusline``
+in the 14-field CSV format, so any subcommand can be pointed at it with
+``HOME=DIR context-stats report`` without touching real history.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from claude_statusline.cli.index import _format_bytes
+from claude_statusline.core.state import StateEntry
+from claude_statusline.graphs.statistics import (
+    CACHE_READ_MULTIPLIER,
+    CACHE_TTL_SECONDS,
+    CACHE_WRITE_MULTIPLIER,
+    model_price,
+)
+
+DEFAULT_MODELS = {"claude-sonnet-4-5": 5.0, "claude-opus-4-6": 2.0, "claude-haiku-4-5": 1.0}
+
+CONTEXT_WINDOW = 200_000
+SYSTEM_PROMPT_TOKENS = 15_000
+
+
+@dataclass
+class HistorySpec:
+    """Shape of a synthetic history.
+
+    Attributes:
+        sessions: Number of sessions.
+        lines: Rows per session.
+        projects: Number of distinct project directories.
+        models: Model ID -> relative weight.
+        days: Sessions start within this many days before ``end``.
+        compactions: Compaction events per session (drops to ~25% context).
+        idle_ratio: Fraction of steps preceded by an idle gap longer than the
+            cache TTL, which re-creates the whole cache.
+        seed: Random seed; the same spec always produces the same files.
+        end: Newest possible timestamp (defaults to now).
+    """
+
+    sessions: int = 100
+    lines: int = 1000
+    projects: int = 10
+    models: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MODELS))
+    days: int = 30
+    compactions: int = 2
+    idle_ratio: float = 0.05
+    seed: int = 0
+    end: int = field(default_factory=lambda: int(time.time()))
+
+
+def generate_session(spec: HistorySpec, index: int) -> Iterator[StateEntry]:
+    """Yield the rows of session ``index``, oldest first.
+
+    Context grows by a few thousand tokens per request, compacts at
+    ``spec.compactions`` random points (and whenever it nears the window),
+    and is re-cached in full after idle gaps longer than the cache TTL.
+
+    Args:
+        spec: History shape.
+        index: Session number, 0-based.
+    """
+    rng = random.Random(f"{spec.seed}:{index}")
+    session_id = f"synthetic-{spec.seed}-{index:06d}"
+    models = list(spec.models)
+    model_id = rng.choices(models, weights=[spec.models[m] for m in models])[0]
+    project = f"/home/user/projects/project-{rng.randrange(max(1, spec.projects)):03d}"
+    price_in, price_out = model_price(model_id)
+
+    # Rough upper bound on a session's duration, to keep it before spec.end
+    span = spec.lines * (50 + spec.idle_ratio * 1000)
+    ts = spec.end - int(span) - rng.randrange(max(1, spec.days * 86400))
+    compaction_at = set(rng.sample(range(1, spec.lines), min(spec.compactions, spec.lines - 1)))
+
+    context = SYSTEM_PROMPT_TOKENS
+    total_in = total_out = lines_added = lines_removed = 0
+    cost = 0.0
+    for i in range(spec.lines):
+        idle = i > 0 and rng.random() < spec.idle_ratio
+        ts += rng.randint(CACHE_TTL_SECONDS + 60, 1800) if idle else rng.randint(5, 90)
+        compacted = i in compaction_at or context > CONTEXT_WINDOW * 0.9
+        if compacted:
+            context = SYSTEM_PROMPT_TOKENS + context // 4
+        growth = rng.randint(500, 6000)
+        context = min(context + growth, CONTEXT_WINDOW)
+        current_in = rng.randint(1, 400)
+        current_out = rng.randint(100, 3000)
+        if i == 0 or idle or compacted:
+            cache_creation, cache_read = context - current_in, 0
+        else:
+            cache_creation = growth
+            cache_read = context - growth - current_in
+        total_in += current_in + cache_creation + cache_read
+        total_out += current_out
+        cost += (
+            current_in * price_in
+            + cache_creation * price_in * CACHE_WRITE_MULTIPLIER
+            + cache_read * price_in * CACHE_READ_MULTIPLIER
+            + current_out * price_out
+        ) / 1_000_000
+        lines_added += rng.randint(0, 40)
+        lines_removed += rng.randint(0, 15)
+        yield StateEntry(
+            timestamp=ts,
+            total_input_tokens=total_in,
+            total_output_tokens=total_out,
+            current_input_tokens=current_in,
+            current_output_tokens=current_out,
+            cache_creation=cache_creation,
+            cache_read=cache_read,
+            cost_usd=round(cost, 4),
+            lines_added=lines_added,
+            lines_removed=lines_removed,
+            session_id=session_id,
+            model_id=model_id,
+            workspace_project_dir=project,
+            context_window_size=CONTEXT_WINDOW,
+        )
+
+
+def write_history(spec: HistorySpec, state_dir: Path) -> tuple[int, int]:
+    """Write every session of ``spec`` as ``statusline.<sid>.state`` files.
+
+    Each file's mtime is set to its last row's timestamp, so ``--since``
+    filters and ``archive`` treat it like real history.
+
+    Args:
+        spec: History shape.
+        state_dir: Directory to write into (created if missing).
+
+    Returns:
+        (rows written, bytes written).
+    """
+    state_dir.mkdir(parents=True, exist_ok=True)
+    rows = size = 0
+    for index in range(spec.sessions):
+        lines = []
+        last_ts = spec.end
+        for entry in generate_session(spec, index):
+            lines.append(f"{entry.to_csv_line()}\n")
+            last_ts = entry.timestamp
+        data = "".join(lines).encode()
+        path = state_dir / f"statusline.synthetic-{spec.seed}-{index:06d}.state"
+        path.write_bytes(data)
+        os.utime(path, (last_ts, last_ts))
+        rows += len(lines)
+        size += len(data)
+    return rows, size
+
+
+def _parse_models(value: str) -> dict[str, float]:
+    """Parse ``name[:weight],...`` into a model -> weight mapping."""
+    models: dict[str, float] = {}
+    for part in value.split(","):
+        name, _, weight = part.strip().partition(":")
+        if not name:
+            continue
+        try:
+            models[name] = float(weight) if weight else 1.0
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for {name}: '{weight}'") from None
+        if models[name] <= 0:
+            raise argparse.ArgumentTypeError(f"weight for {name} must be positive")
+    if not models:
+        raise argparse.ArgumentTypeError("no models given")
+    return models
+
+
+def _add_gen_history_args(parser: argparse.ArgumentParser) -> None:
+    """Add the 'dev gen-history' options to ``parser``."""
+    defaults = HistorySpec()
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Directory used as HOME; files go to OUTPUT/.claude/statusline",
+    )
+    parser.add_argument("--sessions", type=int, default=defaults.sessions)
+    parser.add_argument("--lines", type=int, default=defaults.lines, help="rows per session")
+    parser.add_argument("--projects", type=int, default=defaults.projects)
+    parser.add_argument(
+        "--models",
+        type=_parse_models,
+        default=defaults.models,
+        help="model[:weight],... (default: sonnet 5, opus 2, haiku 1)",
+    )
+    parser.add_argument("--days", type=int, default=defaults.days, help="time span of starts")
+    parser.add_argument("--compactions", type=int, default=defaults.compactions)
+    parser.add_argument(
+        "--idle-ratio",
+        type=float,
+        default=defaults.idle_ratio,
+        help="fraction of steps after an idle gap past the cache TTL",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--no-color", action="store_true", help="Disable color output")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the 'dev' parser with one subparser per subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="context-stats dev",
+        description="Developer tools for load and scaling tests",
+    )
+    parser.add_argument("--no-color", action="store_true", help="Disable color output")
+    subparsers = parser.add_subparsers(dest="subcommand", metavar="SUBCOMMAND")
+    _add_gen_history_args(
+        subparsers.add_parser(
+            "gen-history",
+            help="write a synthetic state directory",
+            description="Write a synthetic state directory for load and scaling tests",
+        )
+    )
+    return parser
+
+
+def cmd_gen_history(args: argparse.Namespace, colors: object) -> None:
+    """Handle 'dev gen-history'."""
+    c = colors
+    for name in ("sessions", "lines", "projects"):
+        if getattr(args, name) <= 0:
+            sys.stderr.write(f"Error: --{name} must be a positive integer.\n")
+            sys.exit(1)
+    if args.days < 0 or args.compactions < 0:
+        sys.stderr.write("Error: --days and --compactions must be zero or positive.\n")
+        sys.exit(1)
+    if not 0 <= args.idle_ratio <= 1:
+        sys.stderr.write("Error: --idle-ratio must be between 0 and 1.\n")
+        sys.exit(1)
+
+    state_dir = args.output / ".claude" / "statusline"
+    if state_dir.is_dir() and any(state_dir.glob("statusline*.state*")):
+        sys.stderr.write(
+            f"Error: {state_dir} already contains state files. Use an empty --output directory.\n"
+        )
+        sys.exit(1)
+
+    spec = HistorySpec(
+        sessions=args.sessions,
+        lines=args.lines,
+        projects=args.projects,
+        models=args.models,
+        days=args.days,
+        compactions=args.compactions,
+        idle_ratio=args.idle_ratio,
+        seed=args.seed,
+    )
+    start = time.monotonic()
+    rows, size = write_history(spec, state_dir)
+    elapsed = time.monotonic() - start
+    print(
+        f"{c.green}Wrote {spec.sessions} session(s), {rows} rows ({_format_bytes(size)}) "
+        f"in {elapsed:.2f}s.{c.reset}\n"
+        f"{c.dim}{state_dir}{c.reset}\n"
+        f"{c.dim}Try: HOME={args.output} context-stats report{c.reset}"
+    )
+
+
+def run_dev(argv: list[str], colors: object) -> None:
+    """Dispatch dev subcommand.
+
+    Args:
+        argv: Remaining arguments after 'dev'. Subcommand options follow the
+            subcommand name.
+        colors: ColorManager for output.
+    """
+    c = colors
+    args = _build_parser().parse_args(argv)
+    if args.subcommand is None:
+        print(
+            f"{c.bold}Usage:{c.reset}\n"
+            f"  context-stats dev gen-history --output DIR   # write a synthetic history\n"
+        )
+        sys.exit(0)
+
+    if args.subcommand == "gen-history":
+        cmd_gen_history(args, c)
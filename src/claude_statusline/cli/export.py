@@ -10,19 +10,25 @@ markdown file with per-interaction token usage, MI scores, and trends.
 from __future__ import annotations
 
 import argparse
+import os
 import sys
+import tempfile
 from collections import Counter
+from collections.abc import Iterator, Sequence
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
 from claude_statusline import __version__
 from claude_statusline.core.config import Config
-from claude_statusline.core.state import StateFile, _validate_session_id
+from claude_statusline.core.spill import SpilledHistory
+from claude_statusline.core.state import StateFile, _validate_session_id, parse_state_filename
 from claude_statusline.formatters.tokens import format_tokens
 from claude_statusline.graphs.intelligence import (
     calculate_intelligence,
     get_context_zone,
 )
+from claude_statusline.graphs.statistics import CacheMiss, detect_cache_misses
 
 
 def _parse_export_args(argv: list[str]) -> argparse.Namespace:
@@ -106,7 +112,7 @@ def _format_chart_timestamp(ts: int) -> str:
 
 
 def _sample_entries_by_window(
-    entries: list, window_minutes: int = 5, max_points: int = 12
+    entries: Sequence, window_minutes: int = 5, max_points: int = 12
 ) -> list[tuple[str, object]]:
     """Downsample entries so Mermaid charts stay readable on long sessions.
 
@@ -116,35 +122,28 @@ def _sample_entries_by_window(
     if not entries:
         return []
 
+    # Indices only, so a spilled history is decoded just for the kept points
     window_seconds = max(1, window_minutes) * 60
-    sampled: list[tuple[str, object]] = [
-        (_format_chart_timestamp(entries[0].timestamp), entries[0])
-    ]
+    kept = [0]
     last_kept_ts = entries[0].timestamp
 
-    for entry in entries[1:-1]:
+    for i, entry in enumerate(islice(entries, 1, len(entries) - 1), 1):
         if entry.timestamp - last_kept_ts >= window_seconds:
-            sampled.append((_format_chart_timestamp(entry.timestamp), entry))
+            kept.append(i)
             last_kept_ts = entry.timestamp
 
     if len(entries) > 1:
-        last_label = _format_chart_timestamp(entries[-1].timestamp)
-        if sampled[-1][1] is not entries[-1]:
-            sampled.append((last_label, entries[-1]))
+        kept.append(len(entries) - 1)
 
-    if len(sampled) <= max_points:
-        return sampled
+    if len(kept) > max_points:
+        step = (len(kept) - 1) / (max_points - 1)
+        kept = [kept[j] for j in sorted({round(i * step) for i in range(max_points)})]
 
-    step = (len(sampled) - 1) / (max_points - 1)
-    reduced: list[tuple[str, object]] = []
-    seen: set[int] = set()
-    for i in range(max_points):
-        index = round(i * step)
-        if index in seen:
-            continue
-        seen.add(index)
-        reduced.append(sampled[index])
-    return reduced
+    sampled: list[tuple[str, object]] = []
+    for i in kept:
+        entry = entries[i]
+        sampled.append((_format_chart_timestamp(entry.timestamp), entry))
+    return sampled
 
 
 def _nice_axis_max(value: int) -> int:
@@ -278,6 +277,7 @@ def _generate_key_takeaways(
     final_pct: float,
     zone_label: str,
     duration: int,
+    cache_misses: list[CacheMiss] | None = None,
 ) -> list[str]:
     """Generate a compact bullet list of the main insights from the session."""
     prev_used = 0
@@ -320,9 +320,44 @@ def _generate_key_takeaways(
                 "- **Cache pattern:** cache reads outweighed creation, so the session reused prior work heavily."
             )
 
+    if cache_misses:
+        tokens = sum(m.tokens for m in cache_misses)
+        cost = sum(m.extra_cost for m in cache_misses)
+        takeaways.append(
+            f"- **Cache misses:** {len(cache_misses)} idle gaps let the prompt cache expire, re-caching {format_tokens(tokens)} tokens for ~${cost:.4f} extra (`cache-warm` avoids this)."
+        )
+
     return takeaways
 
 
+def _generate_cache_miss_section(cache_misses: list[CacheMiss]) -> list[str]:
+    """Generate the table of likely cache expiries, or nothing if there were none."""
+    if not cache_misses:
+        return []
+    tokens = sum(m.tokens for m in cache_misses)
+    cost = sum(m.extra_cost for m in cache_misses)
+    lines = [
+        "## Cache Misses",
+        "",
+        "Requests made after an idle gap longer than the 5-minute cache TTL that re-wrote the cached prompt. "
+        "Extra cost is the cache-write price of the re-cached tokens minus what reading them would have cost.",
+        "",
+        "| # | Time | Idle gap | Re-cached | Extra cost |",
+        "|---|------|----------|-----------|------------|",
+    ]
+    for miss in cache_misses:
+        lines.append(
+            f"| {miss.index + 1} "
+            f"| {_format_time(miss.timestamp)} "
+            f"| {_format_duration(miss.gap_seconds)} "
+            f"| {format_tokens(miss.tokens)} "
+            f"| ${miss.extra_cost:.4f} |"
+        )
+    lines.append(f"| **Total** | | | **{format_tokens(tokens)}** | **${cost:.4f}** |")
+    lines.append("")
+    return lines
+
+
 def _generate_exec_snapshot(
     session_id: str,
     project_name: str,
@@ -370,19 +405,26 @@ def _generate_exec_snapshot(
     return lines
 
 
-def _generate_markdown(entries: list, session_id: str, config: Config) -> str:
+def _generate_markdown(entries: Sequence, session_id: str, config: Config) -> str:
     """Generate the markdown report content.
 
     Args:
-        entries: List of StateEntry objects.
+        entries: StateEntry objects, oldest first.
         session_id: Session identifier.
         config: Configuration object.
 
     Returns:
         Markdown string.
     """
-    lines: list[str] = []
+    return "\n".join(_iter_markdown(entries, session_id, config))
+
+
+def _iter_markdown(entries: Sequence, session_id: str, config: Config) -> Iterator[str]:
+    """Yield the markdown report line by line (see _generate_markdown).
 
+    The per-interaction tables grow with the session, so run_export writes
+    the lines as they come instead of joining them first.
+    """
     # --- Header ---
     first = entries[0]
     last = entries[-1]
@@ -396,8 +438,8 @@ def _generate_markdown(entries: list, session_id: str, config: Config) -> str:
     else:
         project_name = "Unknown"
 
-    lines.append("# Context Stats Report")
-    lines.append("")
+    yield "# Context Stats Report"
+    yield ""
 
     ctx_window = last.context_window_size
     final_used = last.current_used_tokens
@@ -406,12 +448,12 @@ def _generate_markdown(entries: list, session_id: str, config: Config) -> str:
     mi = calculate_intelligence(last, ctx_window, last.model_id, beta)
     zone = get_context_zone(final_used, ctx_window)
 
-    lines.append("## Generate")
-    lines.append("")
-    lines.append("```bash")
-    lines.append(f"context-stats export {session_id} --output report.md")
-    lines.append("```")
-    lines.append("")
+    yield "## Generate"
+    yield ""
+    yield "```bash"
+    yield f"context-stats export {session_id} --output report.md"
+    yield "```"
+    yield ""
 
     exec_snapshot = _generate_exec_snapshot(
         session_id,
@@ -427,59 +469,60 @@ def _generate_markdown(entries: list, session_id: str, config: Config) -> str:
         len(entries),
         zone_recommendation=zone.recommendation,
     )
-    lines.extend(exec_snapshot)
+    yield from exec_snapshot
 
     # --- Summary ---
-    lines.append("## Summary")
-    lines.append("")
+    yield "## Summary"
+    yield ""
 
-    lines.append("| Metric | Value |")
-    lines.append("|--------|-------|")
-    lines.append(f"| Context window | {format_tokens(ctx_window)} tokens |")
-    lines.append(f"| Final usage | {format_tokens(final_used)} ({final_pct:.1f}%) |")
-    lines.append(f"| Total input tokens | {format_tokens(last.total_input_tokens)} |")
-    lines.append(f"| Total output tokens | {format_tokens(last.total_output_tokens)} |")
+    yield "| Metric | Value |"
+    yield "|--------|-------|"
+    yield f"| Context window | {format_tokens(ctx_window)} tokens |"
+    yield f"| Final usage | {format_tokens(final_used)} ({final_pct:.1f}%) |"
+    yield f"| Total input tokens | {format_tokens(last.total_input_tokens)} |"
+    yield f"| Total output tokens | {format_tokens(last.total_output_tokens)} |"
 
     if last.cost_usd > 0:
-        lines.append(f"| Session cost | ${last.cost_usd:.4f} |")
+        yield f"| Session cost | ${last.cost_usd:.4f} |"
 
     if last.lines_added or last.lines_removed:
-        lines.append(f"| Lines changed | +{last.lines_added} / -{last.lines_removed} |")
+        yield f"| Lines changed | +{last.lines_added} / -{last.lines_removed} |"
 
-    lines.append(f"| Final MI score | {mi.mi:.3f} ({zone.label}) |")
-    lines.append("")
+    yield f"| Final MI score | {mi.mi:.3f} ({zone.label}) |"
+    yield ""
 
     # --- Usage bar ---
-    lines.append("### Context Usage")
-    lines.append("")
-    lines.append(f"**Context usage:** `{_usage_bar(final_pct)}` {final_pct:.1f}%")
-    lines.append("")
+    yield "### Context Usage"
+    yield ""
+    yield f"**Context usage:** `{_usage_bar(final_pct)}` {final_pct:.1f}%"
+    yield ""
 
     # --- Key Takeaways ---
-    lines.append("## Key Takeaways")
-    lines.append("")
-    lines.extend(
+    cache_misses = detect_cache_misses(entries)
+    yield "## Key Takeaways"
+    yield ""
+    yield from (
         _generate_key_takeaways(
-            entries, last, ctx_window, final_used, final_pct, zone.label, duration
+            entries, last, ctx_window, final_used, final_pct, zone.label, duration, cache_misses
         )
     )
-    lines.append("")
+    yield ""
 
     # --- Mermaid Visual Summary ---
-    lines.append("## Visual Summary")
-    lines.append("")
-    lines.extend(_generate_mermaid_trend_chart(entries, ctx_window))
-    lines.extend(_generate_mermaid_zone_chart(entries, ctx_window))
-    lines.extend(_generate_mermaid_composition_chart(last))
+    yield "## Visual Summary"
+    yield ""
+    yield from _generate_mermaid_trend_chart(entries, ctx_window)
+    yield from _generate_mermaid_zone_chart(entries, ctx_window)
+    yield from _generate_mermaid_composition_chart(last)
     cache_chart = _generate_mermaid_cache_chart(entries)
     if cache_chart:
-        lines.extend(cache_chart)
+        yield from cache_chart
 
     # --- Interaction Timeline ---
-    lines.append("## Interaction Timeline")
-    lines.append("")
-    lines.append("| # | Time | Input (req) | Output (req) | Context Used | Usage % | MI | Zone |")
-    lines.append("|---|------|-------------|--------------|--------------|---------|------|------|")
+    yield "## Interaction Timeline"
+    yield ""
+    yield "| # | Time | Input (req) | Output (req) | Context Used | Usage % | MI | Zone |"
+    yield "|---|------|-------------|--------------|--------------|---------|------|------|"
 
     for i, entry in enumerate(entries, 1):
         time_str = _format_time(entry.timestamp)
@@ -490,7 +533,7 @@ def _generate_markdown(entries: list, session_id: str, config: Config) -> str:
         mi_score = calculate_intelligence(entry, entry.context_window_size, entry.model_id, beta)
         zone_info = get_context_zone(ctx_used, entry.context_window_size)
 
-        lines.append(
+        yield (
             f"| {i} "
             f"| {time_str} "
             f"| {format_tokens(entry.current_input_tokens)} "
@@ -501,11 +544,11 @@ def _generate_markdown(entries: list, session_id: str, config: Config) -> str:
             f"| {zone_info.zone} |"
         )
 
-    lines.append("")
+    yield ""
 
     # --- Context Growth ---
-    lines.append("## Context Growth")
-    lines.append("")
+    yield "## Context Growth"
+    yield ""
 
     prev_used = 0
     max_delta = 0
@@ -518,42 +561,67 @@ def _generate_markdown(entries: list, session_id: str, config: Config) -> str:
             max_delta_idx = i
         prev_used = ctx_used
 
-    lines.append(f"- **Starting context:** {format_tokens(entries[0].current_used_tokens)} tokens")
-    lines.append(f"- **Final context:** {format_tokens(last.current_used_tokens)} tokens")
-    lines.append(
+    yield f"- **Starting context:** {format_tokens(entries[0].current_used_tokens)} tokens"
+    yield f"- **Final context:** {format_tokens(last.current_used_tokens)} tokens"
+    yield (
         f"- **Total growth:** {format_tokens(last.current_used_tokens - entries[0].current_used_tokens)} tokens"
     )
     if max_delta > 0 and max_delta_idx < len(entries):
-        lines.append(
+        yield (
             f"- **Largest single jump:** {format_tokens(max_delta)} tokens (interaction #{max_delta_idx + 1})"
         )
-    lines.append("")
+    yield ""
 
     # --- Token Breakdown ---
     if any(e.cache_creation > 0 or e.cache_read > 0 for e in entries):
-        lines.append("## Cache Statistics")
-        lines.append("")
-        lines.append("| # | Time | Cache Create | Cache Read |")
-        lines.append("|---|------|--------------|------------|")
+        yield "## Cache Statistics"
+        yield ""
+        yield "| # | Time | Cache Create | Cache Read |"
+        yield "|---|------|--------------|------------|"
         for i, entry in enumerate(entries, 1):
             if entry.cache_creation > 0 or entry.cache_read > 0:
                 time_str = _format_time(entry.timestamp)
-                lines.append(
+                yield (
                     f"| {i} "
                     f"| {time_str} "
                     f"| {format_tokens(entry.cache_creation)} "
                     f"| {format_tokens(entry.cache_read)} |"
                 )
-        lines.append("")
+        yield ""
+
+    yield from _generate_cache_miss_section(cache_misses)
 
     # --- Footer ---
-    lines.append("---")
-    lines.append(
+    yield "---"
+    yield (
         f"*Generated by [context-stats](https://github.com/luongnv89/cc-context-stats) v{__version__}*"
     )
-    lines.append("")
+    yield ""
 
-    return "\n".join(lines)
+
+def _write_replacing(path: Path, lines: Iterator[str]) -> None:
+    """Stream ``lines`` into ``path``, replacing it only once all are written.
+
+    The lines go to a temporary file in the same directory that is renamed
+    over ``path`` at the end, so a failed export leaves any previous file at
+    ``path`` intact.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for i, line in enumerate(lines):
+                f.write(f"\n{line}" if i else line)
+        # mkstemp creates the file 0600; give it the mode open() would have
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_name, 0o666 & ~umask)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
 
 
 def run_export(argv: list[str]) -> None:
@@ -590,8 +658,13 @@ def run_export(argv: list[str]) -> None:
             sys.stderr.write("  Run Claude Code to generate token usage data.\n")
         sys.exit(1)
 
-    # Read history
-    entries = state_file.read_history()
+    # Read history; past history_memory_cap entries it spills to a temp file
+    if config.history_memory_cap:
+        entries: Sequence = SpilledHistory.collect(
+            state_file.iter_history(), config.history_memory_cap
+        )
+    else:
+        entries = state_file.read_history()
     if not entries:
         sys.stderr.write("Error: State file is empty — no data to export.\n")
         sys.exit(1)
@@ -599,11 +672,8 @@ def run_export(argv: list[str]) -> None:
     # Determine session ID (might have been auto-detected)
     session_id = args.session_id
     if not session_id:
-        name = file_path.stem  # statusline.{session_id}
-        session_id = name.removeprefix("statusline.")
-
-    # Generate markdown
-    markdown = _generate_markdown(entries, session_id, config)
+        parsed = parse_state_filename(file_path.name)
+        session_id = parsed[0] if parsed else "unknown"
 
     # Determine output path
     if args.output:
@@ -613,9 +683,9 @@ def run_export(argv: list[str]) -> None:
         short_id = session_id[:8] if len(session_id) > 8 else session_id
         output_path = Path.cwd() / f"context-stats-{short_id}.md"
 
-    # Write file
+    # Generate markdown, streaming it to the file
     try:
-        output_path.write_text(markdown, encoding="utf-8")
+        _write_replacing(output_path, _iter_markdown(entries, session_id, config))
     except OSError as e:
         sys.stderr.write(f"Error: Failed to write {output_path}: {e}\n")
         sys.exit(1)
@@ -0,0 +1,122 @@
+"""Index subcommand — manage the SQLite index used for cross-session queries.
+
+Usage:
+    context-stats index rebuild
+    context-stats index status
+
+Once built, the index is updated incrementally whenever ``report`` or
+``sessions`` read from it. Deleting ``~/.claude/statusline/index.db`` turns
+the index off again.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from datetime import datetime
+
+from claude_statusline.core.index import StateIndex, index_available
+
+
+def _format_bytes(size: int) -> str:
+    """Format a byte count with a binary unit suffix."""
+    if size < 1024:
+        return f"{size} B"
+    value = size / 1024
+    for unit in ("KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+def _format_ts(ts: int | None) -> str:
+    if not ts:
+        return "-"
+    try:
+        return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+    except (ValueError, OSError, OverflowError):
+        return str(ts)
+
+
+def cmd_index_rebuild(colors: object) -> None:
+    """Handle 'index rebuild'."""
+    c = colors
+    start = time.monotonic()
+    with StateIndex() as index:
+        result = index.rebuild()
+    elapsed = time.monotonic() - start
+    print(
+        f"{c.green}Index rebuilt: {result.files_ingested} file(s), "
+        f"{result.entries_added} entries in {elapsed:.2f}s.{c.reset}\n"
+        f"{c.dim}{index.db_path}{c.reset}"
+    )
+
+
+def cmd_index_status(colors: object) -> None:
+    """Handle 'index status'."""
+    c = colors
+    index = StateIndex()
+    if not index.exists():
+        print(f"{c.dim}No index found. Build one with: context-stats index rebuild{c.reset}")
+        return
+
+    with index:
+        result = index.update()
+        status = index.status()
+
+    print(f"{c.bold}{c.magenta}State Index{c.reset} {c.dim}({status['path']}){c.reset}\n")
+    print(f"  {'Schema version:':<18} {status['schema_version']}")
+    print(f"  {'Files:':<18} {status['files']}")
+    print(f"  {'Sessions:':<18} {status['sessions']}")
+    print(f"  {'Entries:':<18} {status['entries']}")
+    print(f"  {'First entry:':<18} {_format_ts(status['first_timestamp'])}")
+    print(f"  {'Last entry:':<18} {_format_ts(status['last_timestamp'])}")
+    print(f"  {'CSV bytes indexed:':<18} {_format_bytes(status['bytes_indexed'])}")
+    print(f"  {'Database size:':<18} {_format_bytes(status['db_size'])}")
+    if result.files_ingested or result.files_removed:
+        print(
+            f"\n{c.dim}Updated {result.files_ingested} file(s) (+{result.entries_added} entries), "
+            f"removed {result.files_removed}.{c.reset}"
+        )
+
+
+def run_index(argv: list[str], colors: object) -> None:
+    """Dispatch index subcommand.
+
+    Args:
+        argv: Remaining arguments after 'index'.
+        colors: ColorManager for output.
+    """
+    c = colors
+
+    args = [a for a in argv if a != "--no-color"]
+    if not args:
+        print(
+            f"{c.bold}Usage:{c.reset}\n"
+            f"  context-stats index rebuild   # build or rebuild the SQLite index\n"
+            f"  context-stats index status    # show index statistics\n"
+        )
+        sys.exit(0)
+
+    if not index_available():
+        sys.stderr.write("Error: the index requires Python's sqlite3 module.\n")
+        sys.exit(1)
+
+    import sqlite3
+
+    subcmd = args[0]
+
+    try:
+        if subcmd == "rebuild":
+            cmd_index_rebuild(c)
+        elif subcmd == "status":
+            cmd_index_status(c)
+        else:
+            sys.stderr.write(
+                f"Error: Unknown index subcommand '{subcmd}'. Use 'rebuild' or 'status'.\n"
+            )
+            sys.exit(1)
+    except (sqlite3.Error, OSError) as e:
+        sys.stderr.write(f"Error: index operation failed: {e}\n")
+        sys.exit(1)
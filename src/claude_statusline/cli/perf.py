@@ -0,0 +1,81 @@
+"""Perf subcommand — summarize claude-statusline self-timing metrics.
+
+Usage:
+    context-stats perf [--last N] [--no-color]
+
+Reads ``~/.claude/statusline/metrics.jsonl`` (written when ``trace_metrics=true``
+or ``CLAUDE_STATUSLINE_TRACE=1``) and prints p50/p95/p99 per phase.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from claude_statusline.core.trace import TRACE_ENV, load_metrics, metrics_path, summarize_phases
+
+DEFAULT_LAST = 500
+
+
+def _parse_perf_args(argv: list[str]) -> argparse.Namespace:
+    """Parse perf subcommand arguments.
+
+    Args:
+        argv: Remaining arguments after 'perf'.
+
+    Returns:
+        Parsed arguments namespace.
+    """
+    parser = argparse.ArgumentParser(
+        prog="context-stats perf",
+        description="Summarize statusline refresh timings per phase",
+    )
+    parser.add_argument(
+        "--last",
+        type=int,
+        default=DEFAULT_LAST,
+        help=f"Only use the newest N refreshes (default: {DEFAULT_LAST})",
+    )
+    parser.add_argument("--no-color", action="store_true", help="Disable color output")
+    return parser.parse_args(argv)
+
+
+def run_perf(argv: list[str], colors: object) -> None:
+    """Run the perf command.
+
+    Args:
+        argv: Remaining arguments after 'perf'.
+        colors: ColorManager for output.
+    """
+    c = colors
+    args = _parse_perf_args(argv)
+    if args.last <= 0:
+        sys.stderr.write("Error: --last must be a positive integer.\n")
+        sys.exit(1)
+
+    try:
+        records = load_metrics(args.last)
+    except OSError as e:
+        sys.stderr.write(f"Error: Failed to read {metrics_path()}: {e}\n")
+        sys.exit(1)
+    if not records:
+        print(f"{c.yellow}No statusline metrics in {metrics_path()}.{c.reset}")
+        print(
+            f"{c.dim}Tip: set trace_metrics=true in ~/.claude/statusline.conf "
+            f"or export {TRACE_ENV}=1.{c.reset}"
+        )
+        return
+
+    summary = summarize_phases(records)
+    print(
+        f"\n{c.bold}{c.magenta}Statusline Timings{c.reset} "
+        f"{c.dim}(last {len(records)} refreshes, ms){c.reset}\n"
+    )
+    print(f"  {'phase':<12} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, stats in summary.items():
+        color = c.bold if name == "total" else ""
+        print(
+            f"  {color}{name:<12}{c.reset if color else ''} {stats['count']:>6} "
+            f"{stats['p50']:>8.2f} {stats['p95']:>8.2f} {stats['p99']:>8.2f} {stats['max']:>8.2f}"
+        )
+    print()
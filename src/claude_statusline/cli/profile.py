@@ -0,0 +1,130 @@
+"""Global ``--profile`` flag — run any context-stats action under a profiler.
+
+Usage:
+    context-stats --profile [action ...]              # cProfile
+    context-stats --profile=tracemalloc [action ...]  # allocation snapshot
+
+cProfile writes ``context-stats-<action>-<time>.pstats`` (open it with
+``python -m pstats`` or snakeviz); tracemalloc writes a ``.tracemalloc``
+snapshot (``tracemalloc.Snapshot.load``). Both go to the current directory
+and print their top hotspots to stderr, so stdout stays clean for reports
+redirected to a file.
+"""
+
+from __future__ import annotations
+
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+# Hotspots printed to stderr
+TOP_N = 25
+
+# Frames kept per tracemalloc allocation
+TRACE_FRAMES = 25
+
+
+def pop_profile_flag(argv: list[str]) -> tuple[str | None, list[str]]:
+    """Remove ``--profile[=mode]`` from argv.
+
+    Only the ``=`` form takes a mode, so ``--profile report`` still means
+    "profile the report action".
+
+    Args:
+        argv: Arguments after the program name.
+
+    Returns:
+        (mode or None, argv without the flag).
+
+    Raises:
+        SystemExit: If the mode is not one of PROFILE_MODES.
+    """
+    mode = None
+    rest = []
+    for arg in argv:
+        if arg == "--profile":
+            mode = "cprofile"
+        elif arg.startswith("--profile="):
+            mode = arg.split("=", 1)[1].lower()
+            if mode not in PROFILE_MODES:
+                sys.stderr.write(
+                    f"Error: Unknown profiler '{mode}'. Use one of: {', '.join(PROFILE_MODES)}\n"
+                )
+                sys.exit(1)
+        else:
+            rest.append(arg)
+    return mode, rest
+
+
+def _output_path(action: str, suffix: str) -> Path:
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return Path.cwd() / f"context-stats-{action}-{stamp}{suffix}"
+
+
+def _run_cprofile(action: str, fn: Callable[[], None]) -> Path:
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(fn)
+    finally:
+        path = _output_path(action, ".pstats")
+        profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(TOP_N)
+        sys.stderr.write(f"\n[profile] top {TOP_N} by cumulative time:\n{out.getvalue()}")
+        sys.stderr.write(f"[profile] wrote {path}\n")
+    return path
+
+
+def _run_tracemalloc(action: str, fn: Callable[[], None]) -> Path:
+    import tracemalloc
+
+    tracemalloc.start(TRACE_FRAMES)
+    try:
+        fn()
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            )
+        )
+        path = _output_path(action, ".tracemalloc")
+        snapshot.dump(str(path))
+        lines = [
+            f"\n[profile] peak {peak / 1024 / 1024:.1f} MiB, "
+            f"still allocated {current / 1024 / 1024:.1f} MiB; top {TOP_N} by size:\n"
+        ]
+        for stat in snapshot.statistics("lineno")[:TOP_N]:
+            lines.append(f"  {stat}\n")
+        sys.stderr.write("".join(lines))
+        sys.stderr.write(f"[profile] wrote {path}\n")
+    return path
+
+
+def run_profiled(mode: str, action: str, fn: Callable[[], None]) -> Path:
+    """Run ``fn`` under the chosen profiler and report its hotspots.
+
+    The profile is written even if the action exits early (``sys.exit``)
+    or is interrupted, e.g. a watch-mode graph stopped with Ctrl+C.
+
+    Args:
+        mode: One of PROFILE_MODES.
+        action: Action name, used in the output file name.
+        fn: The action to run.
+
+    Returns:
+        Path of the ``.pstats`` or ``.tracemalloc`` file.
+    """
+    if mode == "tracemalloc":
+        return _run_tracemalloc(action, fn)
+    return _run_cprofile(action, fn)
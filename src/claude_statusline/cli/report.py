@@ -222,6 +222,19 @@ def generate_report(projects_stats: list[ProjectStats], since_days: int | None =
     real_cache_pct = real_cache_read / real_total_tokens * 100 if real_total_tokens > 0 else 0
     lines.append(f"- **Cache Hit Ratio**: {real_cache_pct:.1f}% (room for improvement if <70%)")
 
+    missed = [s for s in real_sessions if s.cache_misses]
+    if missed:
+        miss_count = sum(s.cache_misses for s in missed)
+        miss_tokens = sum(s.cache_miss_tokens for s in missed)
+        miss_cost = sum(s.cache_miss_cost() for s in missed)
+        miss_pct = miss_cost / real_cost * 100 if real_cost > 0 else 0
+        lines.append(
+            f"- **Cache Misses**: {miss_count} prompt-cache expiries after idle gaps in "
+            f"{len(missed)} sessions re-cached {format_tokens(miss_tokens)} tokens, "
+            f"~${miss_cost:.2f} extra ({miss_pct:.1f}% of real cost) "
+            "— `cache-warm` keeps the cache alive across pauses"
+        )
+
     cost_per_1k = total_cost / (total_tokens / 1000) if total_tokens > 0 else 0
     lines.append(f"\n- **Cost per 1k tokens**: ${cost_per_1k:.3f}")
     lines.append("")
@@ -245,6 +258,20 @@ def generate_report(projects_stats: list[ProjectStats], since_days: int | None =
     lines.append("### Optimization Opportunities")
     lines.append("")
 
+    # Sessions that paid the most for expired caches
+    top_missed = sorted(missed, key=lambda s: s.cache_miss_cost(), reverse=True)[:5]
+    if top_missed:
+        lines.append("1. **Sessions losing their prompt cache to idle gaps**")
+        lines.append("   - Run `context-stats <session_id> cache-warm on` before long pauses:")
+        lines.append("")
+        for s in top_missed:
+            proj_name = s.project_dir.split("/")[-1] if "/" in s.project_dir else s.project_dir
+            lines.append(
+                f"     - {s.session_id[:8]}... ({proj_name}): {s.cache_misses} misses, "
+                f"{format_tokens(s.cache_miss_tokens)} re-cached, ~${s.cache_miss_cost():.2f} extra"
+            )
+        lines.append("")
+
     # Low cache sessions (cache < 10%, non-fake, min cost threshold)
     low_cache = [s for s in real_sessions if s.cache_hit_ratio() < 10 and s.total_tokens() > 10000]
     low_cache_sorted = sorted(low_cache, key=lambda s: s.cache_hit_ratio())[:5]
@@ -28,17 +28,71 @@ import sys
 
 from claude_statusline.core.colors import ColorManager
 from claude_statusline.core.config import Config
-from claude_statusline.core.git import get_git_info
-from claude_statusline.core.state import StateEntry, StateFile
+from claude_statusline.core.gather import (
+    RENDER_BUDGET_MS,
+    SegmentGatherer,
+    load_render_cache,
+    record_timeouts,
+    save_render_cache,
+)
+from claude_statusline.core.git import format_git_info, get_git_info, get_git_status
+from claude_statusline.core.state import SpoolPolicy, StateEntry, StateFile
+from claude_statusline.core.trace import PhaseTimer, append_metrics, env_tracing
 from claude_statusline.formatters.layout import fit_to_width, get_terminal_width
 from claude_statusline.formatters.time import get_current_timestamp
 from claude_statusline.formatters.tokens import calculate_context_usage, format_tokens
 
 
+def _record_entry(state_file: StateFile, entry: StateEntry, timer: PhaseTimer) -> StateEntry | None:
+    """Append ``entry`` unless context usage is unchanged; return the previous entry."""
+    with timer.phase("state_read"):
+        prev_entry = state_file.read_last_entry()
+    # Only append if context usage changed (avoid duplicates)
+    if prev_entry is None or entry.current_used_tokens != prev_entry.current_used_tokens:
+        with timer.phase("state_write"):
+            state_file.append_entry(entry)
+    return prev_entry
+
+
+def _start_gatherer(config: Config) -> SegmentGatherer | None:
+    """Return a gatherer if the config asks for budgeted rendering."""
+    if not (config.concurrent_render or config.render_budget_ms):
+        return None
+    return SegmentGatherer(
+        config.render_budget_ms or RENDER_BUDGET_MS,
+        {"git": config.render_budget_git_ms, "state": config.render_budget_state_ms},
+    )
+
+
+def _gathered_git_info(gather: SegmentGatherer, project_dir: str, colors: ColorManager) -> str:
+    """Collect the git segment, falling back to its cached value if late.
+
+    Also records every segment that missed its deadline in the render cache.
+    """
+    status = gather.result("git")
+    cache = load_render_cache()
+    git_cache = cache.setdefault("git", {})
+    key = str(project_dir)
+    changed = record_timeouts(cache, gather.missed)
+    if "git" in gather.missed:
+        status = git_cache.get(key)
+    elif status is not None and git_cache.get(key) != list(status):
+        git_cache[key] = list(status)
+        changed = True
+    if changed:
+        save_render_cache(cache)
+    if not status:
+        return ""
+    branch, changes = status
+    return format_git_info(branch, changes, color_manager=colors)
+
+
 def main() -> None:
     """Main entry point for claude-statusline CLI."""
+    timer = PhaseTimer()
     try:
-        data = json.load(sys.stdin)
+        with timer.phase("parse"):
+            data = json.load(sys.stdin)
     except json.JSONDecodeError:
         print("[Claude] ~")
         return
@@ -50,7 +104,16 @@ def main() -> None:
     dir_name = cwd.rsplit("/", 1)[-1] if "/" in cwd else cwd or "~"
 
     # Read settings from config file
-    config = Config.load()
+    with timer.phase("config"):
+        config = Config.load()
+
+    # Concurrent mode: git runs in the background from here on, and the
+    # state read/write joins it; both are collected by one deadline
+    gather = _start_gatherer(config)
+    if gather is not None:
+        gather.submit(
+            "git", timer.wrap("git", get_git_status), project_dir, gather.remaining("git")
+        )
 
     # Build color manager with any user overrides
     colors = ColorManager(enabled=True, overrides=config.color_overrides)
@@ -61,7 +124,10 @@ def main() -> None:
     git_colors = ColorManager(
         enabled=True, overrides={**config.color_overrides, "magenta": branch_color}
     )
-    git_info = get_git_info(project_dir, color_manager=git_colors)
+    git_info = ""
+    if gather is None:
+        with timer.phase("git"):
+            git_info = get_git_info(project_dir, color_manager=git_colors)
 
     # Extract session_id once for reuse
     session_id = data.get("session_id")
@@ -72,6 +138,7 @@ def main() -> None:
     mi_info = ""
     zone_info = ""
     session_info = ""
+    state_file = None
 
     total_size = data.get("context_window", {}).get("context_window_size", 0)
     current_usage = data.get("context_window", {}).get("current_usage")
@@ -103,21 +170,22 @@ def main() -> None:
         free_display = format_tokens(free_tokens, config.token_detail)
 
         # Zone indicator — determines color for both context info and zone label
-        from claude_statusline.graphs.intelligence import get_context_zone
-
-        zone_result = get_context_zone(
-            used_tokens,
-            total_size,
-            zone_1m_plan_max=config.zone_1m_plan_max,
-            zone_1m_code_max=config.zone_1m_code_max,
-            zone_1m_dump_max=config.zone_1m_dump_max,
-            zone_1m_xdump_max=config.zone_1m_xdump_max,
-            zone_std_dump_ratio=config.zone_std_dump_ratio,
-            zone_std_warn_buffer=config.zone_std_warn_buffer,
-            zone_std_hard_limit=config.zone_std_hard_limit,
-            zone_std_dead_ratio=config.zone_std_dead_ratio,
-            large_model_threshold=config.large_model_threshold,
-        )
+        with timer.phase("zone_mi"):
+            from claude_statusline.graphs.intelligence import get_context_zone
+
+            zone_result = get_context_zone(
+                used_tokens,
+                total_size,
+                zone_1m_plan_max=config.zone_1m_plan_max,
+                zone_1m_code_max=config.zone_1m_code_max,
+                zone_1m_dump_max=config.zone_1m_dump_max,
+                zone_1m_xdump_max=config.zone_1m_xdump_max,
+                zone_std_dump_ratio=config.zone_std_dump_ratio,
+                zone_std_warn_buffer=config.zone_std_warn_buffer,
+                zone_std_hard_limit=config.zone_std_hard_limit,
+                zone_std_dead_ratio=config.zone_std_dead_ratio,
+                large_model_threshold=config.large_model_threshold,
+            )
 
         # Traffic-light color map: green/yellow/orange/red/gray
         zone_color_map = {
@@ -142,11 +210,17 @@ def main() -> None:
 
         # State file management for delta display and history recording
         if config.show_delta or config.show_mi:
-            state_file = StateFile(session_id)
-            prev_entry = state_file.read_last_entry()
-            has_prev = prev_entry is not None
-            prev_tokens = prev_entry.current_used_tokens if prev_entry else 0
-
+            spool = (
+                SpoolPolicy(config.state_flush_entries, config.state_flush_seconds)
+                if config.state_write_behind
+                else None
+            )
+            state_file = StateFile(
+                session_id,
+                spool=spool,
+                keep_segments=config.state_keep_segments,
+                compact=config.state_compact_rows,
+            )
             # Build current entry
             cur_input_tokens = current_usage.get("input_tokens", 0)
             cur_output_tokens = current_usage.get("output_tokens", 0)
@@ -168,6 +242,15 @@ def main() -> None:
                 context_window_size=total_size,
             )
 
+            if gather is None:
+                prev_entry = _record_entry(state_file, entry, timer)
+            else:
+                # If late, the delta is left out; the write still completes
+                gather.submit("state", _record_entry, state_file, entry, timer)
+                prev_entry = gather.result("state")
+            has_prev = prev_entry is not None
+            prev_tokens = prev_entry.current_used_tokens if prev_entry else 0
+
             # Calculate and display token delta if enabled
             if config.show_delta:
                 delta = used_tokens - prev_tokens
@@ -177,23 +260,25 @@ def main() -> None:
 
             # Calculate MI score — pure function of utilization, no prev entry needed
             if config.show_mi:
-                from claude_statusline.graphs.intelligence import (
-                    calculate_intelligence,
-                    format_mi_score,
-                    get_mi_color,
-                )
-
-                mi_score = calculate_intelligence(entry, total_size, model_id, config.mi_curve_beta)
-                mi_color_name = get_mi_color(mi_score.mi, mi_score.utilization)
+                with timer.phase("zone_mi"):
+                    from claude_statusline.graphs.intelligence import (
+                        calculate_intelligence,
+                        format_mi_score,
+                        get_mi_color,
+                    )
+
+                    mi_score = calculate_intelligence(
+                        entry, total_size, model_id, config.mi_curve_beta
+                    )
+                    mi_color_name = get_mi_color(mi_score.mi, mi_score.utilization)
                 mi_color = getattr(colors, mi_color_name)
                 # Use per-property mi_score color if configured, else MI-based color
                 prop_mi_color = config.color_overrides.get("mi_score")
                 effective_mi_color = prop_mi_color if prop_mi_color else mi_color
                 mi_info = f" | {effective_mi_color}MI:{format_mi_score(mi_score.mi)}{colors.reset}"
 
-            # Only append if context usage changed (avoid duplicates)
-            if not has_prev or used_tokens != prev_tokens:
-                state_file.append_entry(entry)
+    if gather is not None:
+        git_info = _gathered_git_info(gather, project_dir, git_colors)
 
     # Display session_id if enabled
     if config.show_session and session_id:
@@ -203,9 +288,19 @@ def main() -> None:
     # Model name is lowest priority — truncated first when terminal is narrow
     base = f"{colors.project_name}{dir_name}{colors.reset}"
     model_info = f" | {colors.separator}{model}{colors.reset}"
-    max_width = get_terminal_width()
     parts = [base, git_info, context_info, zone_info, mi_info, delta_info, model_info, session_info]
-    print(fit_to_width(parts, max_width))
+    with timer.phase("layout"):
+        line = fit_to_width(parts, get_terminal_width())
+    print(line)
+    if gather is not None:
+        sys.stdout.flush()
+        gather.close()
+        # The state worker only spooled; fork the spool's flush timer here,
+        # off the pool (skipped if the worker is still running late)
+        if state_file is not None:
+            state_file.start_pending_flush_timer()
+    if config.trace_metrics or env_tracing():
+        append_metrics(timer.record())
 
 
 if __name__ == "__main__":
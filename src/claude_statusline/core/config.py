@@ -44,6 +44,22 @@ _ZONE_FLOAT_KEYS: set[str] = {
     "zone_std_dead_ratio",
 }
 
+# State file write-behind keys (positive integers)
+_STATE_INT_KEYS: set[str] = {
+    "state_flush_entries",
+    "state_flush_seconds",
+}
+
+# Non-negative integer keys where 0 means "off" or "no limit"
+_NONNEG_INT_KEYS: set[str] = {
+    "state_keep_segments",
+    "render_budget_ms",
+    "history_memory_cap",
+    # Per-segment render budgets; 0 = use the total budget
+    "render_budget_git_ms",
+    "render_budget_state_ms",
+}
+
 # Compaction-related float config keys (fractions in (0, 1))
 _COMPACTION_FLOAT_KEYS: set[str] = {
     "compaction_drop_threshold",
@@ -116,6 +132,25 @@ class Config:
     compaction_drop_threshold: float = 0.5  # drop fraction to qualify as compaction
     compact_mi_warn_threshold: float = 0.6  # MI below this at compact time → warning
 
+    # State file write-behind (buffer entries in a local spool, flush in batches)
+    state_write_behind: bool = False
+    state_flush_entries: int = 20
+    state_flush_seconds: int = 60
+    state_keep_segments: int = 10  # sealed history segments kept per session (0 = all)
+    state_compact_rows: bool = False  # delta-encode rows after a full row
+
+    # Gather git and state segments concurrently under a latency budget
+    concurrent_render: bool = False
+    render_budget_ms: int = 0  # total budget; > 0 implies concurrent_render
+    render_budget_git_ms: int = 0  # per-segment deadlines (0 = total budget)
+    render_budget_state_ms: int = 0
+
+    # Append per-phase refresh timings to ~/.claude/statusline/metrics.jsonl
+    trace_metrics: bool = False
+
+    # Entries export keeps in memory before spilling history to a temp file (0 = no cap)
+    history_memory_cap: int = 0
+
     # Custom color overrides (slot_name -> ANSI code)
     color_overrides: dict[str, str] = field(default_factory=dict)
 
@@ -189,6 +224,14 @@ class Config:
                     self.reduced_motion = value_lower != "false"
                 elif key == "show_mi":
                     self.show_mi = value_lower != "false"
+                elif key == "state_write_behind":
+                    self.state_write_behind = value_lower != "false"
+                elif key == "state_compact_rows":
+                    self.state_compact_rows = value_lower != "false"
+                elif key == "concurrent_render":
+                    self.concurrent_render = value_lower != "false"
+                elif key == "trace_metrics":
+                    self.trace_metrics = value_lower != "false"
                 elif key == "mi_curve_beta":
                     try:
                         self.mi_curve_beta = float(raw_value)
@@ -208,6 +251,34 @@ class Config:
                         sys.stderr.write(
                             f"[statusline] warning: invalid integer for {key}: '{raw_value}'\n"
                         )
+                elif key in _NONNEG_INT_KEYS:
+                    try:
+                        v = int(raw_value)
+                        if v >= 0:
+                            setattr(self, key, v)
+                        else:
+                            sys.stderr.write(
+                                f"[statusline] warning: {key} must be non-negative, "
+                                f"ignoring '{raw_value}'\n"
+                            )
+                    except ValueError:
+                        sys.stderr.write(
+                            f"[statusline] warning: invalid integer for {key}: '{raw_value}'\n"
+                        )
+                elif key in _STATE_INT_KEYS:
+                    try:
+                        v = int(raw_value)
+                        if v > 0:
+                            setattr(self, key, v)
+                        else:
+                            sys.stderr.write(
+                                f"[statusline] warning: {key} must be positive, "
+                                f"ignoring '{raw_value}'\n"
+                            )
+                    except ValueError:
+                        sys.stderr.write(
+                            f"[statusline] warning: invalid integer for {key}: '{raw_value}'\n"
+                        )
                 elif key in _ZONE_FLOAT_KEYS:
                     try:
                         v = float(raw_value)
@@ -274,4 +345,15 @@ class Config:
             "color_overrides": dict(self.color_overrides),
             "compaction_drop_threshold": self.compaction_drop_threshold,
             "compact_mi_warn_threshold": self.compact_mi_warn_threshold,
+            "state_write_behind": self.state_write_behind,
+            "state_flush_entries": self.state_flush_entries,
+            "state_flush_seconds": self.state_flush_seconds,
+            "state_keep_segments": self.state_keep_segments,
+            "state_compact_rows": self.state_compact_rows,
+            "concurrent_render": self.concurrent_render,
+            "render_budget_ms": self.render_budget_ms,
+            "render_budget_git_ms": self.render_budget_git_ms,
+            "render_budget_state_ms": self.render_budget_state_ms,
+            "trace_metrics": self.trace_metrics,
+            "history_memory_cap": self.history_memory_cap,
         }
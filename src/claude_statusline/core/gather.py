@@ -0,0 +1,168 @@
+"""Concurrent gathering of statusline segments under a latency budget.
+
+The statusline normally runs git and the state file read one after the
+other. With ``concurrent_render=true`` or ``render_budget_ms`` set they run
+on a small thread pool instead, and the line is printed once every segment
+is ready or its deadline passes, whichever comes first. A segment that
+misses its deadline is served from the render cache (its last good value)
+or left out, and the miss is counted in the cache's ``timeouts`` map.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Any, Callable
+
+from claude_statusline.core.state import StateFile
+
+# Default latency budget for a whole refresh, in milliseconds
+RENDER_BUDGET_MS = 200
+
+_CACHE_NAME = "render-cache.json"
+
+
+class SegmentGatherer:
+    """Run segment producers concurrently and collect them by a deadline.
+
+    Worker threads are not interrupted when the deadline passes; a late
+    producer (e.g. the state file append) finishes in the background and
+    the interpreter waits for it on exit, after the line has been printed.
+    """
+
+    def __init__(
+        self,
+        budget_ms: int = RENDER_BUDGET_MS,
+        segment_budgets: dict[str, int] | None = None,
+        max_workers: int = 4,
+    ) -> None:
+        """Start the budget clock.
+
+        Args:
+            budget_ms: Time allowed for all segments, from now.
+            segment_budgets: Optional tighter budget per segment name, in
+                milliseconds from now (capped by ``budget_ms``).
+            max_workers: Thread pool size.
+        """
+        self.start = time.monotonic()
+        self.deadline = self.start + budget_ms / 1000
+        self._deadlines = {
+            name: min(self.deadline, self.start + ms / 1000)
+            for name, ms in (segment_budgets or {}).items()
+            if ms > 0
+        }
+        self.missed: list[str] = []
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="statusline")
+        self._futures: dict[str, Future[Any]] = {}
+
+    def remaining(self, name: str | None = None) -> float:
+        """Seconds left before the deadline of segment ``name`` (never negative).
+
+        Args:
+            name: Segment name, or None for the overall deadline.
+        """
+        deadline = self._deadlines.get(name, self.deadline) if name else self.deadline
+        return max(0.0, deadline - time.monotonic())
+
+    def submit(self, name: str, fn: Callable[..., Any], *args: Any) -> None:
+        """Start producing segment ``name`` in the background.
+
+        Args:
+            name: Segment name, used to collect the result.
+            fn: Producer function.
+            *args: Arguments for ``fn``.
+        """
+        self._futures[name] = self._pool.submit(fn, *args)
+
+    def result(self, name: str, default: Any = None) -> Any:
+        """Wait for segment ``name`` until the deadline.
+
+        A producer that raises TimeoutError ran out of its own time budget
+        and counts as having missed the deadline.
+
+        Args:
+            name: Segment name passed to submit.
+            default: Returned if the segment was not submitted, failed, or
+                missed the deadline.
+
+        Returns:
+            The producer's return value, or ``default``.
+        """
+        future = self._futures.get(name)
+        if future is None:
+            return default
+        try:
+            return future.result(timeout=self.remaining(name))
+        except (FutureTimeout, TimeoutError):
+            self.missed.append(name)
+            return default
+        except Exception as e:
+            sys.stderr.write(f"[statusline] warning: {name} segment failed: {e}\n")
+            return default
+
+    def close(self) -> None:
+        """Release the pool without waiting for late producers."""
+        self._pool.shutdown(wait=False)
+
+
+def _cache_path() -> Path:
+    return StateFile.STATE_DIR / _CACHE_NAME
+
+
+def record_timeouts(cache: dict[str, Any], missed: list[str]) -> bool:
+    """Count segments that missed their deadline in the render cache.
+
+    Args:
+        cache: Render cache, updated in place.
+        missed: Segment names from SegmentGatherer.missed.
+
+    Returns:
+        True if the cache changed and should be saved.
+    """
+    now = int(time.time())
+    timeouts = cache.setdefault("timeouts", {})
+    for name in missed:
+        stats = timeouts.setdefault(name, {"count": 0})
+        stats["count"] = stats.get("count", 0) + 1
+        stats["last"] = now
+    return bool(missed)
+
+
+def load_render_cache() -> dict[str, Any]:
+    """Load the last good segment values, or an empty cache."""
+    try:
+        with open(_cache_path(), encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_render_cache(cache: dict[str, Any]) -> None:
+    """Atomically replace the render cache.
+
+    Args:
+        cache: Segment values keyed by segment name.
+    """
+    path = _cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".render-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+    except OSError as e:
+        sys.stderr.write(f"[statusline] warning: failed to write render cache: {e}\n")
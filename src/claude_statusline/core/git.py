@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import subprocess
+import time
 from pathlib import Path
 
 from claude_statusline.core.colors import CYAN, MAGENTA, RESET, ColorManager
@@ -60,19 +61,94 @@ def get_git_info(
         else:
             changes = len([line for line in result.stdout.split("\n") if line.strip()])
 
-        # Format output — use ColorManager if provided, else fallback to constants
-        if color_manager is not None:
-            magenta = color_manager.magenta
-            cyan = color_manager.cyan
-            reset = color_manager.reset
-        elif colors_enabled:
-            magenta, cyan, reset = MAGENTA, CYAN, RESET
-        else:
-            magenta = cyan = reset = ""
-
-        if changes > 0:
-            return f" | {magenta}{branch}{reset} {cyan}[{changes}]{reset}"
-        return f" | {magenta}{branch}{reset}"
+        return format_git_info(branch, changes, colors_enabled, color_manager)
 
     except (subprocess.TimeoutExpired, OSError):
         return ""
+
+
+def get_git_status(project_dir: str | Path, timeout: float = 5.0) -> tuple[str, int] | None:
+    """Get the git branch and change count without formatting.
+
+    Unlike get_git_info, both git commands are started at once and share a
+    single timeout; any git process still running when it expires is killed.
+
+    Args:
+        project_dir: Path to the project directory
+        timeout: Seconds to wait for both commands together
+
+    Returns:
+        (branch, changes), or None if not a git repo
+
+    Raises:
+        TimeoutError: If git did not answer in time, so callers can fall back
+            to a cached value instead of treating the directory as not a repo.
+    """
+    project_dir = Path(project_dir)
+    if not (project_dir / ".git").is_dir():
+        return None
+
+    deadline = time.monotonic() + timeout
+    procs: list[subprocess.Popen[str]] = []
+    try:
+        for args in (["rev-parse", "--abbrev-ref", "HEAD"], ["status", "--porcelain"]):
+            procs.append(
+                subprocess.Popen(
+                    ["git", "--no-optional-locks", *args],
+                    cwd=project_dir,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                )
+            )
+        branch_out, _ = procs[0].communicate(timeout=max(0.0, deadline - time.monotonic()))
+        branch = branch_out.strip() if procs[0].returncode == 0 else ""
+        if not branch:
+            return None
+        status_out, _ = procs[1].communicate(timeout=max(0.0, deadline - time.monotonic()))
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"git did not answer within {timeout:g}s") from None
+    except OSError:
+        return None
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+    if procs[1].returncode != 0:
+        return branch, 0
+    return branch, len([line for line in status_out.split("\n") if line.strip()])
+
+
+def format_git_info(
+    branch: str,
+    changes: int,
+    colors_enabled: bool = True,
+    color_manager: ColorManager | None = None,
+) -> str:
+    """Format a branch and change count as a statusline segment.
+
+    Args:
+        branch: Branch name
+        changes: Number of changed files
+        colors_enabled: Whether to include ANSI color codes (ignored when
+            color_manager is given)
+        color_manager: Optional ColorManager for custom colors
+
+    Returns:
+        Formatted segment, e.g. `` | main [3]``
+    """
+    # Use ColorManager if provided, else fallback to constants
+    if color_manager is not None:
+        magenta = color_manager.magenta
+        cyan = color_manager.cyan
+        reset = color_manager.reset
+    elif colors_enabled:
+        magenta, cyan, reset = MAGENTA, CYAN, RESET
+    else:
+        magenta = cyan = reset = ""
+
+    if changes > 0:
+        return f" | {magenta}{branch}{reset} {cyan}[{changes}]{reset}"
+    return f" | {magenta}{branch}{reset}"
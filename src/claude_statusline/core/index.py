@@ -0,0 +1,555 @@
+"""SQLite index over state files for cross-session queries.
+
+The index is optional: it lives next to the state files
+(``~/.claude/statusline/index.db``) and is only consulted once it has been
+created with ``context-stats index rebuild``. The CSV state files remain the
+source of truth — the index can be deleted and rebuilt at any time.
+
+Ingestion is incremental. For every state file the index remembers the inode
+and the byte offset up to which complete lines have been ingested, so an
+update only parses lines appended since the previous run. A file that shrank
+or was replaced is re-ingested from the start, and a live file sealed into a
+segment (same inode, new name) is carried over without being re-read.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+try:
+    import sqlite3
+except ImportError:  # pragma: no cover - Python built without sqlite3
+    sqlite3 = None  # type: ignore[assignment]
+
+from claude_statusline.core.state import (
+    ARCHIVE_ERRORS,
+    DELTA_PREFIX,
+    StateEntry,
+    StateFile,
+    discover_state_files,
+    open_state_file,
+    parse_state_filename,
+)
+from claude_statusline.graphs.statistics import CacheMissDetector
+
+INDEX_FILENAME = "index.db"
+SCHEMA_VERSION = 4
+
+# Bytes read back before the offset to find the start of a compact block
+# (a block is at most StateFile.COMPACT_BLOCK_ROWS short delta rows)
+_CONTEXT_WINDOW = 64 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    file TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    total_input_tokens INTEGER NOT NULL,
+    total_output_tokens INTEGER NOT NULL,
+    current_input_tokens INTEGER NOT NULL,
+    current_output_tokens INTEGER NOT NULL,
+    cache_creation INTEGER NOT NULL,
+    cache_read INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    lines_added INTEGER NOT NULL,
+    lines_removed INTEGER NOT NULL,
+    model_id TEXT NOT NULL,
+    workspace_project_dir TEXT NOT NULL,
+    context_window_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries (timestamp);
+CREATE INDEX IF NOT EXISTS idx_entries_project ON entries (workspace_project_dir);
+CREATE INDEX IF NOT EXISTS idx_entries_model ON entries (model_id);
+CREATE INDEX IF NOT EXISTS idx_entries_session ON entries (session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_entries_file ON entries (file);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    project_dir TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    start_time INTEGER NOT NULL,
+    end_time INTEGER NOT NULL,
+    entry_count INTEGER NOT NULL,
+    total_input_tokens INTEGER NOT NULL,
+    total_output_tokens INTEGER NOT NULL,
+    current_input_tokens INTEGER NOT NULL,
+    current_output_tokens INTEGER NOT NULL,
+    cache_creation INTEGER NOT NULL,
+    cache_read INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    lines_added INTEGER NOT NULL,
+    lines_removed INTEGER NOT NULL,
+    context_window_size INTEGER NOT NULL,
+    cache_misses INTEGER NOT NULL DEFAULT 0,
+    cache_miss_tokens INTEGER NOT NULL DEFAULT 0,
+    miss_prev_timestamp INTEGER,
+    miss_prev_cache_creation INTEGER,
+    miss_prev_cache_read INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions (start_time);
+CREATE INDEX IF NOT EXISTS idx_sessions_project ON sessions (project_dir);
+CREATE INDEX IF NOT EXISTS idx_sessions_model ON sessions (model_id);
+"""
+
+
+def index_available() -> bool:
+    """Return True if the sqlite3 module is usable in this interpreter."""
+    return sqlite3 is not None
+
+
+def default_index_path() -> Path:
+    """Return the index database path inside the state directory."""
+    return StateFile.STATE_DIR / INDEX_FILENAME
+
+
+@dataclass
+class IndexUpdate:
+    """Counters describing one incremental index update."""
+
+    files_scanned: int = 0
+    files_ingested: int = 0
+    files_removed: int = 0
+    entries_added: int = 0
+
+
+class StateIndex:
+    """Incrementally maintained SQLite index of all state files."""
+
+    def __init__(self, db_path: Path | None = None) -> None:
+        """Initialize the index.
+
+        Args:
+            db_path: Optional database path. Defaults to
+                ``~/.claude/statusline/index.db``.
+        """
+        self.db_path = db_path if db_path is not None else default_index_path()
+        self._conn: Any = None
+
+    def exists(self) -> bool:
+        """Return True if the index database has been created."""
+        return self.db_path.exists()
+
+    def connect(self) -> Any:
+        """Open (and if needed create) the index database.
+
+        Raises:
+            RuntimeError: If sqlite3 is not available.
+            sqlite3.Error: If the database cannot be opened.
+        """
+        if sqlite3 is None:
+            raise RuntimeError("sqlite3 is not available in this Python build")
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if _stored_schema_version(conn) not in (None, str(SCHEMA_VERSION)):
+                # The index is only a cache of the state files: rebuild it
+                conn.executescript(
+                    "DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS sessions; "
+                    "DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS meta;"
+                )
+            conn.executescript(_SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('schema_version', ?)",
+                    (str(SCHEMA_VERSION),),
+                )
+                conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> StateIndex:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def rebuild(self) -> IndexUpdate:
+        """Drop all indexed data and re-ingest every state file."""
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM sessions")
+            conn.execute("DELETE FROM files")
+        return self.update()
+
+    def update(self) -> IndexUpdate:
+        """Ingest lines appended to state files since the last update.
+
+        Returns:
+            IndexUpdate counters for this run.
+        """
+        StateFile.flush_all()
+        conn = self.connect()
+        result = IndexUpdate()
+        known = {row["path"]: row for row in conn.execute("SELECT * FROM files")}
+        found: dict[str, tuple[Path, os.stat_result]] = {}
+        for path in _discover_state_files():
+            result.files_scanned += 1
+            try:
+                found[str(path)] = (path, path.stat())
+            except OSError:
+                continue
+
+        # A sealed segment is the former live file under a new name: move its
+        # rows over so only the bytes appended before sealing are read
+        moved = {
+            (row["session_id"], row["inode"]): key
+            for key, row in known.items()
+            if key not in found or found[key][1].st_ino != row["inode"]
+        }
+        for key, (path, st) in found.items():
+            if key in known:
+                continue
+            old_key = moved.pop((parse_state_filename(path.name)[0], st.st_ino), None)
+            if old_key is not None:
+                with conn:
+                    conn.execute("UPDATE files SET path = ? WHERE path = ?", (key, old_key))
+                    conn.execute("UPDATE entries SET file = ? WHERE file = ?", (key, old_key))
+                known[key] = conn.execute("SELECT * FROM files WHERE path = ?", (key,)).fetchone()
+                del known[old_key]
+
+        for key, (path, st) in found.items():
+            row = known.get(key)
+            if row is not None and row["inode"] == st.st_ino and row["size"] == st.st_size:
+                continue
+            added = self._ingest_file(path, st, row)
+            result.files_ingested += 1
+            result.entries_added += added
+
+        for key, row in known.items():
+            if key not in found:
+                with conn:
+                    conn.execute("DELETE FROM entries WHERE file = ?", (key,))
+                    conn.execute("DELETE FROM files WHERE path = ?", (key,))
+                    self._refresh_session(row["session_id"])
+                result.files_removed += 1
+
+        return result
+
+    def _ingest_file(self, path: Path, st: os.stat_result, row: Any) -> int:
+        """Ingest the unread tail of one state file.
+
+        Returns:
+            Number of entries added.
+        """
+        conn = self._conn
+        session_id = parse_state_filename(path.name)[0]
+        offset = 0
+        if row is not None and row["inode"] == st.st_ino and st.st_size >= row["offset"]:
+            offset = row["offset"]
+
+        context = b""
+        try:
+            with open_state_file(path) as f:
+                f.seek(offset)
+                data = f.read()
+                if offset and data[:1] == DELTA_PREFIX.encode():
+                    # Compact rows continue a block that started before the
+                    # offset: re-read from the block's full row
+                    window = max(0, offset - _CONTEXT_WINDOW)
+                    f.seek(window)
+                    context = f.read(offset - window)
+                    context = context[_block_start(context, whole=window == 0) :]
+        except (OSError, *ARCHIVE_ERRORS) as e:
+            sys.stderr.write(f"[statusline] warning: failed to index {path}: {e}\n")
+            return 0
+
+        # Only consume complete lines; a partial trailing line is picked up next time
+        end = data.rfind(b"\n") + 1
+        if context:
+            skip = len(StateEntry.parse_many(context))
+            entries = StateEntry.parse_many(context + data[:end])[skip:]
+        else:
+            entries = StateEntry.parse_many(data[:end])
+
+        with conn:
+            if offset == 0:
+                conn.execute("DELETE FROM entries WHERE file = ?", (str(path),))
+            if entries:
+                conn.executemany(
+                    "INSERT INTO entries (file, session_id, timestamp, total_input_tokens, "
+                    "total_output_tokens, current_input_tokens, current_output_tokens, "
+                    "cache_creation, cache_read, cost_usd, lines_added, lines_removed, "
+                    "model_id, workspace_project_dir, context_window_size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            str(path),
+                            session_id,
+                            e.timestamp,
+                            e.total_input_tokens,
+                            e.total_output_tokens,
+                            e.current_input_tokens,
+                            e.current_output_tokens,
+                            e.cache_creation,
+                            e.cache_read,
+                            e.cost_usd,
+                            e.lines_added,
+                            e.lines_removed,
+                            e.model_id,
+                            e.workspace_project_dir,
+                            e.context_window_size,
+                        )
+                        for e in entries
+                    ],
+                )
+            if entries or offset == 0:
+                # Rows of this file were dropped on a re-ingest: the session's
+                # cache misses can no longer be carried over
+                replaced = offset == 0 and row is not None
+                self._refresh_session(session_id, None if replaced else entries)
+            conn.execute(
+                "INSERT OR REPLACE INTO files (path, session_id, inode, size, mtime, offset) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(path), session_id, st.st_ino, st.st_size, st.st_mtime, offset + end),
+            )
+        return len(entries)
+
+    def _refresh_session(self, session_id: str, appended: list[StateEntry] | None = None) -> None:
+        """Recompute the per-session summary row from the session's entries.
+
+        The session's history may span several segment files, so the summary
+        is derived from the first and last indexed entries rather than from
+        any single file. Cache misses need the whole timeline: the session
+        row keeps the detector's last row, so entries appended after every
+        indexed one are fed to a resumed detector; otherwise detection is
+        re-run over all of the session's entries.
+
+        Args:
+            session_id: Session to refresh.
+            appended: Entries just inserted for the session, if nothing else
+                changed since its summary was written.
+        """
+        conn = self._conn
+        stored = None
+        if appended:
+            stored = conn.execute(
+                "SELECT entry_count, end_time, cache_misses, cache_miss_tokens, "
+                "miss_prev_timestamp, miss_prev_cache_creation, miss_prev_cache_read "
+                "FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            # Entries older than the session's end sort among the indexed ones
+            if stored is not None and min(e.timestamp for e in appended) < stored["end_time"]:
+                stored = None
+
+        if stored is not None:
+            assert appended is not None
+            count = stored["entry_count"] + len(appended)
+            prev_row = None
+            if stored["miss_prev_timestamp"] is not None:
+                prev_row = (
+                    stored["miss_prev_timestamp"],
+                    stored["miss_prev_cache_creation"],
+                    stored["miss_prev_cache_read"],
+                )
+            misses = CacheMissDetector.resume(
+                prev_row, stored["entry_count"], stored["cache_misses"], stored["cache_miss_tokens"]
+            )
+            # Stable, like ORDER BY timestamp, rowid over insertion order
+            for e in sorted(appended, key=lambda e: e.timestamp):
+                misses.feed(e.timestamp, e.cache_creation, e.cache_read)
+        else:
+            count = conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+            if not count:
+                conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                return
+            misses = CacheMissDetector()
+            for row in conn.execute(
+                "SELECT timestamp, cache_creation, cache_read FROM entries WHERE session_id = ? "
+                "ORDER BY timestamp, rowid",
+                (session_id,),
+            ):
+                misses.feed(*row)
+        first = conn.execute(
+            "SELECT timestamp, workspace_project_dir FROM entries WHERE session_id = ? "
+            "ORDER BY timestamp, rowid LIMIT 1",
+            (session_id,),
+        ).fetchone()
+        last = conn.execute(
+            "SELECT * FROM entries WHERE session_id = ? ORDER BY timestamp DESC, rowid DESC LIMIT 1",
+            (session_id,),
+        ).fetchone()
+        prev_row = misses.prev_row or (None, None, None)
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, project_dir, start_time, entry_count, "
+            "model_id, end_time, total_input_tokens, total_output_tokens, "
+            "current_input_tokens, current_output_tokens, cache_creation, cache_read, "
+            "cost_usd, lines_added, lines_removed, context_window_size, "
+            "cache_misses, cache_miss_tokens, miss_prev_timestamp, "
+            "miss_prev_cache_creation, miss_prev_cache_read) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                session_id,
+                first["workspace_project_dir"],
+                first["timestamp"],
+                count,
+                last["model_id"],
+                last["timestamp"],
+                last["total_input_tokens"],
+                last["total_output_tokens"],
+                last["current_input_tokens"],
+                last["current_output_tokens"],
+                last["cache_creation"],
+                last["cache_read"],
+                last["cost_usd"],
+                last["lines_added"],
+                last["lines_removed"],
+                last["context_window_size"],
+                misses.count,
+                misses.tokens,
+                *prev_row,
+            ),
+        )
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def sessions(self, since: int | None = None) -> list[Any]:
+        """Return one summary row per indexed session, ordered by session ID.
+
+        Row columns mirror the first entry (``project_dir``, ``start_time``)
+        and the last entry (cumulative totals, ``model_id``, ``end_time``).
+
+        Args:
+            since: Optional Unix timestamp; only sessions whose first entry is
+                at or after it are returned.
+        """
+        conn = self.connect()
+        if since is None:
+            return conn.execute("SELECT * FROM sessions ORDER BY session_id").fetchall()
+        return conn.execute(
+            "SELECT * FROM sessions WHERE start_time >= ? ORDER BY session_id", (since,)
+        ).fetchall()
+
+    def recent_files(self, since_mtime: float) -> list[Any]:
+        """Return sessions whose newest file was modified at or after ``since_mtime``.
+
+        Rows are newest first, one per session. Each carries
+        ``file_session_id`` and ``file_mtime`` plus the session summary
+        columns (NULL when the files hold no valid entries).
+        """
+        conn = self.connect()
+        return conn.execute(
+            "SELECT f.session_id AS file_session_id, f.mtime AS file_mtime, s.* FROM "
+            "(SELECT session_id, MAX(mtime) AS mtime FROM files GROUP BY session_id) f "
+            "LEFT JOIN sessions s ON s.session_id = f.session_id "
+            "WHERE f.mtime >= ? ORDER BY f.mtime DESC",
+            (since_mtime,),
+        ).fetchall()
+
+    def status(self) -> dict[str, Any]:
+        """Return summary counters for ``context-stats index status``."""
+        conn = self.connect()
+        files = conn.execute("SELECT COUNT(*), COALESCE(SUM(offset), 0) FROM files").fetchone()
+        entries = conn.execute(
+            "SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM entries"
+        ).fetchone()
+        session_count = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        try:
+            db_size = self.db_path.stat().st_size
+        except OSError:
+            db_size = 0
+        return {
+            "path": str(self.db_path),
+            "schema_version": SCHEMA_VERSION,
+            "files": files[0],
+            "bytes_indexed": files[1],
+            "sessions": session_count,
+            "entries": entries[0],
+            "first_timestamp": entries[1],
+            "last_timestamp": entries[2],
+            "db_size": db_size,
+        }
+
+
+def _discover_state_files() -> list[Path]:
+    """Return all per-session state files (live and sealed) in the state directory."""
+    state_dir = StateFile.STATE_DIR
+    if not state_dir.exists():
+        return []
+    return [p for paths in discover_state_files(state_dir).values() for p in paths if p.is_file()]
+
+
+def _block_start(context: bytes, whole: bool) -> int:
+    """Offset of the last full row in ``context``, which ends at a line boundary.
+
+    Args:
+        context: Bytes preceding the ingest offset.
+        whole: True if ``context`` starts at the beginning of the file, so its
+            first line is complete.
+    """
+    end = len(context)
+    while end > 0:
+        pos = context.rfind(b"\n", 0, end - 1) + 1
+        if pos == 0 and not whole:
+            break
+        if context[pos : pos + 1] not in (b"~", b"\n", b""):
+            return pos
+        end = pos
+    return len(context)
+
+
+def _stored_schema_version(conn: Any) -> str | None:
+    """Return the schema version recorded in an existing database, if any."""
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def open_existing_index(create: bool = False) -> StateIndex | None:
+    """Return an up-to-date StateIndex if one has been built, else None.
+
+    Readers call this to opportunistically use the index: when sqlite3 is
+    unavailable, the index was never built, or it cannot be updated, None is
+    returned and the caller falls back to parsing the CSV files directly.
+
+    Args:
+        create: Build the index if it does not exist yet.
+    """
+    if not index_available():
+        return None
+    index = StateIndex()
+    if not create and not index.exists():
+        return None
+    try:
+        index.update()
+    except (sqlite3.Error, OSError) as e:
+        sys.stderr.write(f"[statusline] warning: state index unavailable, using CSV files: {e}\n")
+        index.close()
+        return None
+    return index
@@ -0,0 +1,170 @@
+"""History that spills to a temporary file past an in-memory entry cap.
+
+``context-stats export`` on a months-long session would otherwise hold every
+StateEntry (~440 bytes each) at once. SpilledHistory keeps at most
+``memory_cap`` entries as objects; older ones are packed into fixed-width
+binary records in an anonymous temporary file and decoded again on access.
+It is a read-only Sequence, so code that indexes, iterates and takes len()
+works unchanged; slices materialize a list and should be avoided on large
+histories (use itertools.islice instead).
+"""
+
+from __future__ import annotations
+
+import struct
+import tempfile
+from collections.abc import Iterable, Iterator, Sequence
+from typing import BinaryIO, overload
+
+from claude_statusline.core.state import StateEntry
+
+# timestamp, 6 token counts, cost, lines added/removed, 3 string ids, window
+_RECORD = struct.Struct("<7qd2q3Iq")
+_BLANK_RECORD = bytes(_RECORD.size)
+
+# Records decoded per read while iterating the spill file
+_READ_BATCH = 1024
+
+
+class SpilledHistory(Sequence[StateEntry]):
+    """Append-only entry sequence with a bounded number of live entries."""
+
+    def __init__(self, memory_cap: int) -> None:
+        """Create an empty history.
+
+        Args:
+            memory_cap: Entries kept as objects before spilling (at least 1).
+        """
+        self.memory_cap = max(1, memory_cap)
+        self._tail: list[StateEntry] = []
+        self._file: BinaryIO | None = None
+        self._spilled = 0
+        self._strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        # Spilled entries whose values do not fit a record, by index
+        self._unpacked: dict[int, StateEntry] = {}
+
+    @classmethod
+    def collect(cls, entries: Iterable[StateEntry], memory_cap: int) -> SpilledHistory:
+        """Build a history from an entry stream (e.g. StateFile.iter_history)."""
+        history = cls(memory_cap)
+        for entry in entries:
+            history.append(entry)
+        return history
+
+    @property
+    def spilled(self) -> int:
+        """Number of entries held in the temporary file."""
+        return self._spilled
+
+    def append(self, entry: StateEntry) -> None:
+        """Add an entry, spilling the in-memory batch once it reaches the cap."""
+        self._tail.append(entry)
+        if len(self._tail) >= self.memory_cap:
+            self._spill()
+
+    def _string_id(self, value: str) -> int:
+        sid = self._string_ids.get(value)
+        if sid is None:
+            sid = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return sid
+
+    def _spill(self) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="context-stats-", suffix=".spill")
+        pack = _RECORD.pack
+        sid = self._string_id
+        records = []
+        for i, e in enumerate(self._tail, self._spilled):
+            try:
+                record = pack(
+                    e.timestamp,
+                    e.total_input_tokens,
+                    e.total_output_tokens,
+                    e.current_input_tokens,
+                    e.current_output_tokens,
+                    e.cache_creation,
+                    e.cache_read,
+                    e.cost_usd,
+                    e.lines_added,
+                    e.lines_removed,
+                    sid(e.session_id),
+                    sid(e.model_id),
+                    sid(e.workspace_project_dir),
+                    e.context_window_size,
+                )
+            except struct.error:
+                # A value out of the record's range: keep this entry as an
+                # object and leave a blank record in its slot
+                self._unpacked[i] = e
+                record = _BLANK_RECORD
+            records.append(record)
+        self._file.seek(0, 2)
+        self._file.write(b"".join(records))
+        self._spilled += len(self._tail)
+        self._tail = []
+
+    def _decode(self, fields: tuple) -> StateEntry:
+        strings = self._strings
+        return StateEntry(
+            *fields[:10],
+            strings[fields[10]],
+            strings[fields[11]],
+            strings[fields[12]],
+            fields[13],
+        )
+
+    def _read(self, start: int, count: int) -> list[StateEntry]:
+        """Decode ``count`` spilled records starting at record ``start``."""
+        assert self._file is not None
+        self._file.seek(start * _RECORD.size)
+        data = self._file.read(count * _RECORD.size)
+        entries = [self._decode(fields) for fields in _RECORD.iter_unpack(data)]
+        if self._unpacked:
+            for i in range(count):
+                entry = self._unpacked.get(start + i)
+                if entry is not None:
+                    entries[i] = entry
+        return entries
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._tail)
+
+    @overload
+    def __getitem__(self, index: int) -> StateEntry: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[StateEntry]: ...
+
+    def __getitem__(self, index: int | slice) -> StateEntry | list[StateEntry]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("history index out of range")
+        if index >= self._spilled:
+            return self._tail[index - self._spilled]
+        return self._read(index, 1)[0]
+
+    def __iter__(self) -> Iterator[StateEntry]:
+        for start in range(0, self._spilled, _READ_BATCH):
+            yield from self._read(start, min(_READ_BATCH, self._spilled - start))
+        yield from self._tail
+
+    def close(self) -> None:
+        """Delete the temporary file. The history is empty afterwards."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._spilled = 0
+        self._tail = []
+        self._unpacked = {}
+
+    def __enter__(self) -> SpilledHistory:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -2,17 +2,125 @@
 
 from __future__ import annotations
 
+import copy
+import glob
+import gzip
+import io
+import mmap
 import os
 import shutil
+import stat
 import sys
 import tempfile
+import threading
+import time
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import BinaryIO
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends stay atomic via O_APPEND, rotation is unguarded
+    fcntl = None
+
+try:
+    import lzma
+except ImportError:  # pragma: no cover - Python built without lzma
+    lzma = None  # type: ignore[assignment]
+
+# Archive format name -> file suffix appended to ".state"
+ARCHIVE_FORMATS = {"gzip": ".gz", "xz": ".xz"}
+# Raised by truncated or corrupt archives (gzip's own errors are OSErrors)
+ARCHIVE_ERRORS: tuple[type[Exception], ...] = (EOFError,) + ((lzma.LZMAError,) if lzma else ())
+
+
+def _safe_int(val: str) -> int:
+    """Decode an integer CSV field, defaulting to 0 when empty or invalid."""
+    try:
+        return int(val) if val else 0
+    except ValueError:
+        return 0
+
+
+def _safe_float(val: str) -> float:
+    """Decode a float CSV field, defaulting to 0.0 when empty or invalid."""
+    try:
+        return float(val) if val else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _safe_str(val: str) -> str:
+    """Intern a string CSV field; session, model and project repeat on every row."""
+    return sys.intern(val)
+
+
+# Column plan for the 14-field format: one decoder per CSV column, in the
+# same order as the StateEntry fields. Field 0 (timestamp) stays strict — a
+# line without a valid timestamp is rejected rather than defaulted.
+_LENIENT_PLAN = (
+    int,
+    _safe_int,
+    _safe_int,
+    _safe_int,
+    _safe_int,
+    _safe_int,
+    _safe_int,
+    _safe_float,
+    _safe_int,
+    _safe_int,
+    _safe_str,
+    _safe_str,
+    _safe_str,
+    _safe_int,
+)
+_FIELD_COUNT = len(_LENIENT_PLAN)
+
+
+def _decode_str(val: memoryview) -> str:
+    """Decode and intern a raw string field from a mapped state file."""
+    return sys.intern(str(val, "utf-8", "replace"))
+
+
+# Same plan for raw (bytes-like) fields: int() and float() accept buffers
+# directly, only the string columns need an explicit decode.
+_RAW_PLAN = tuple(_decode_str if decode is _safe_str else decode for decode in _LENIENT_PLAN)
+
+# Compact rows: "~" followed by the first 10 (numeric) columns as deltas from
+# the full row that starts their block. Empty means zero; cost_usd is stored
+# absolute (empty when unchanged) so no float error creeps in. The string
+# columns and context_window_size are taken from the block's full row.
+DELTA_PREFIX = "~"
+_DELTA_FIELDS = 10
+_COST_COLUMN = 7
 
 
 @dataclass
 class StateEntry:
-    """A single state file entry."""
+    """A single state file entry.
+
+    Slotted: a session can load 10,000 of these, and dropping the per-instance
+    ``__dict__`` roughly halves their footprint.
+    """
+
+    __slots__ = (
+        "timestamp",
+        "total_input_tokens",
+        "total_output_tokens",
+        "current_input_tokens",
+        "current_output_tokens",
+        "cache_creation",
+        "cache_read",
+        "cost_usd",
+        "lines_added",
+        "lines_removed",
+        "session_id",
+        "model_id",
+        "workspace_project_dir",
+        "context_window_size",
+    )
 
     timestamp: int
     total_input_tokens: int
@@ -40,65 +148,122 @@ class StateEntry:
             StateEntry or None if parsing fails
         """
         parts = line.strip().split(",")
+        n = len(parts)
 
         # Handle old format (timestamp,tokens) and new format (14 fields)
-        if len(parts) < 2:
+        if n < 2:
             return None
 
         try:
-            timestamp = int(parts[0])
-
             # Old format: timestamp,tokens
-            if len(parts) == 2:
-                tokens = int(parts[1])
-                return cls(
-                    timestamp=timestamp,
-                    total_input_tokens=tokens,
-                    total_output_tokens=0,
-                    current_input_tokens=0,
-                    current_output_tokens=0,
-                    cache_creation=0,
-                    cache_read=0,
-                    cost_usd=0.0,
-                    lines_added=0,
-                    lines_removed=0,
-                    session_id="",
-                    model_id="",
-                    workspace_project_dir="",
-                    context_window_size=0,
-                )
+            if n == 2:
+                return cls(int(parts[0]), int(parts[1]), 0, 0, 0, 0, 0, 0.0, 0, 0, "", "", "", 0)
 
-            # New format with all fields
-            def safe_int(val: str, default: int = 0) -> int:
-                try:
-                    return int(val) if val else default
-                except ValueError:
-                    return default
+            # New format: missing trailing fields default to zero/empty
+            if n < _FIELD_COUNT:
+                parts.extend([""] * (_FIELD_COUNT - n))
+            return cls(*[decode(val) for decode, val in zip(_LENIENT_PLAN, parts)])
 
-            def safe_float(val: str, default: float = 0.0) -> float:
+        except (ValueError, IndexError):
+            return None
+
+    @classmethod
+    def parse_many(cls, data: bytes | memoryview | str) -> list[StateEntry]:
+        """Parse a whole state file buffer into entries.
+
+        Equivalent to calling from_csv_line on every line and dropping the
+        None results, but the common case — a well-formed 14-field row — is
+        decoded with a single strict pass over the column plan. The string
+        columns are interned, so every row of a session shares one copy. Legacy
+        2-field rows and malformed rows fall back to from_csv_line, so the
+        results are identical. (A csv.reader loader benchmarked slower; see
+        benchmarks/bench_state_parse.py.)
+
+        Args:
+            data: File contents (bytes and buffers are decoded as UTF-8).
+
+        Returns:
+            List of parsed StateEntry objects, in file order.
+        """
+        if not isinstance(data, str):
+            data = str(data, "utf-8", "replace")
+
+        entries: list[StateEntry] = []
+        append = entries.append
+        make = cls
+        fallback = cls.from_csv_line
+        intern = sys.intern
+        base = None  # full row that compact "~" rows are relative to
+        for line in data.splitlines():
+            parts = line.split(",")
+            if len(parts) == _FIELD_COUNT:
+                # Strict plan, unrolled: any bad field raises and the line
+                # takes the lenient from_csv_line path instead
                 try:
-                    return float(val) if val else default
+                    base = make(
+                        int(parts[0]),
+                        int(parts[1]),
+                        int(parts[2]),
+                        int(parts[3]),
+                        int(parts[4]),
+                        int(parts[5]),
+                        int(parts[6]),
+                        float(parts[7]),
+                        int(parts[8]),
+                        int(parts[9]),
+                        intern(parts[10]),
+                        intern(parts[11]),
+                        intern(parts[12]),
+                        int(parts[13]),
+                    )
+                    append(base)
+                    continue
                 except ValueError:
-                    return default
+                    pass
+            if line[:1] == DELTA_PREFIX:
+                entry = cls.from_delta_line(line, base) if base is not None else None
+            elif line.strip():
+                entry = base = fallback(line)
+            else:
+                continue
+            if entry is not None:
+                append(entry)
+        return entries
 
+    @classmethod
+    def from_delta_line(cls, line: str, prev: StateEntry) -> StateEntry | None:
+        """Expand a compact ``~`` row against the full row of its block.
+
+        Args:
+            line: Delta row, as written by to_delta_line.
+            prev: The entry parsed from the block's full row.
+
+        Returns:
+            The full StateEntry, or None if the row is malformed.
+        """
+        parts = line.strip()[1:].split(",")
+        if len(parts) != _DELTA_FIELDS:
+            return None
+        try:
+            d = [int(p) if p else 0 for p in parts[:_COST_COLUMN]]
+            cost = parts[_COST_COLUMN]
             return cls(
-                timestamp=timestamp,
-                total_input_tokens=safe_int(parts[1] if len(parts) > 1 else ""),
-                total_output_tokens=safe_int(parts[2] if len(parts) > 2 else ""),
-                current_input_tokens=safe_int(parts[3] if len(parts) > 3 else ""),
-                current_output_tokens=safe_int(parts[4] if len(parts) > 4 else ""),
-                cache_creation=safe_int(parts[5] if len(parts) > 5 else ""),
-                cache_read=safe_int(parts[6] if len(parts) > 6 else ""),
-                cost_usd=safe_float(parts[7] if len(parts) > 7 else ""),
-                lines_added=safe_int(parts[8] if len(parts) > 8 else ""),
-                lines_removed=safe_int(parts[9] if len(parts) > 9 else ""),
-                session_id=parts[10] if len(parts) > 10 else "",
-                model_id=parts[11] if len(parts) > 11 else "",
-                workspace_project_dir=parts[12] if len(parts) > 12 else "",
-                context_window_size=safe_int(parts[13] if len(parts) > 13 else ""),
+                prev.timestamp + d[0],
+                prev.total_input_tokens + d[1],
+                prev.total_output_tokens + d[2],
+                prev.current_input_tokens + d[3],
+                prev.current_output_tokens + d[4],
+                prev.cache_creation + d[5],
+                prev.cache_read + d[6],
+                float(cost) if cost else prev.cost_usd,
+                prev.lines_added + (int(parts[8]) if parts[8] else 0),
+                prev.lines_removed + (int(parts[9]) if parts[9] else 0),
+                prev.session_id,
+                prev.model_id,
+                prev.workspace_project_dir,
+                prev.context_window_size,
             )
-
-        except (ValueError, IndexError):
+        except ValueError:
             return None
 
     def to_csv_line(self) -> str:
@@ -123,6 +288,40 @@ class StateEntry:
             ]
         )
 
+    def to_delta_line(self, prev: StateEntry) -> str | None:
+        """Encode this entry as a compact ``~`` row relative to ``prev``.
+
+        ``prev`` is the block's full row, not the row just before: every
+        delta row then expands on its own, and finding the last entry never
+        has to replay the block.
+
+        Returns:
+            The delta row, or None when a string column or the context window
+            size changed and a full row has to be written instead.
+        """
+        if (
+            self.session_id != prev.session_id
+            or self.model_id != prev.model_id
+            or self.workspace_project_dir.replace(",", "_") != prev.workspace_project_dir
+            or self.context_window_size != prev.context_window_size
+        ):
+            return None
+        deltas = [
+            self.timestamp - prev.timestamp,
+            self.total_input_tokens - prev.total_input_tokens,
+            self.total_output_tokens - prev.total_output_tokens,
+            self.current_input_tokens - prev.current_input_tokens,
+            self.current_output_tokens - prev.current_output_tokens,
+            self.cache_creation - prev.cache_creation,
+            self.cache_read - prev.cache_read,
+            None,
+            self.lines_added - prev.lines_added,
+            self.lines_removed - prev.lines_removed,
+        ]
+        fields = [str(d) if d else "" for d in deltas]
+        fields[_COST_COLUMN] = "" if self.cost_usd == prev.cost_usd else str(self.cost_usd)
+        return DELTA_PREFIX + ",".join(fields)
+
     @property
     def total_tokens(self) -> int:
         """Get combined input + output tokens."""
@@ -151,32 +350,740 @@ def _validate_session_id(session_id: str) -> None:
             )
 
 
+def open_locked(path: Path, flags: int, operation: int) -> int:
+    """Open a file and flock the inode currently linked at ``path``.
+
+    Rotation swaps in a new file with os.replace, so a lock that was granted
+    on the old inode after waiting is worthless: re-check the path and retry
+    against the new file. Without fcntl the file is opened unlocked. Other
+    files replaced under a lock (e.g. the metrics file) use it too.
+
+    Args:
+        path: File path.
+        flags: os.open flags.
+        operation: fcntl.LOCK_SH or fcntl.LOCK_EX.
+
+    Returns:
+        An open file descriptor; closing it releases the lock.
+
+    Raises:
+        FileNotFoundError: If the file does not exist and O_CREAT is not set.
+    """
+    while True:
+        fd = os.open(path, flags | getattr(os, "O_BINARY", 0), 0o666)
+        if fcntl is None:
+            return fd
+        try:
+            fcntl.flock(fd, operation)
+            held = os.fstat(fd)
+            current = os.stat(path)
+            if (held.st_dev, held.st_ino) == (current.st_dev, current.st_ino):
+                return fd
+        except FileNotFoundError:
+            if not flags & os.O_CREAT:
+                os.close(fd)
+                raise
+        except BaseException:
+            os.close(fd)
+            raise
+        os.close(fd)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write data with as few write() calls as the kernel allows (normally one)."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def read_all(fd: int) -> bytes:
+    """Read a small file from the start through an open descriptor."""
+    os.lseek(fd, 0, os.SEEK_SET)
+    chunks = []
+    while True:
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def _default_spool_dir() -> Path:
+    """Per-user spool directory on local storage, outside ~/.claude."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return Path(runtime) / "claude-statusline"
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(tempfile.gettempdir()) / f"claude-statusline-{uid}"
+
+
+def _split_spool(pending: bytes) -> tuple[int | None, bytes]:
+    """Split spool contents into its ``#<unix time>`` header value and records."""
+    if not pending.startswith(b"#"):
+        return None, pending
+    header, _, records = pending.partition(b"\n")
+    return _line_timestamp(header[1:]), records
+
+
+def _spool_policy(pending: bytes) -> tuple[int, bool] | None:
+    """Return the (keep_segments, compact) its writer recorded in a spool header.
+
+    The header is ``#<unix time>,<keep_segments>,<compact 0/1>``. Returns
+    None for spools without them.
+    """
+    if not pending.startswith(b"#"):
+        return None
+    fields = pending[1:].partition(b"\n")[0].split(b",")
+    if len(fields) != 3:
+        return None
+    try:
+        return int(fields[1]), fields[2] == b"1"
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class SpoolPolicy:
+    """When a write-behind spool is flushed into its state file.
+
+    Attributes:
+        max_entries: Flush once this many entries are pending.
+        max_age: Flush once the oldest pending entry is this many seconds old.
+    """
+
+    max_entries: int = 20
+    max_age: int = 60
+
+
+def _line_timestamp(line: bytes) -> int | None:
+    """Return the leading timestamp field of a raw CSV line, or None."""
+    try:
+        return int(line.split(b",", 1)[0])
+    except ValueError:
+        return None
+
+
+def seek_timestamp(f: BinaryIO, since: int) -> int:
+    """Position a state file at the first line whose timestamp is >= since.
+
+    State files are appended in chronological order, so the line timestamps
+    are sorted and the first matching line can be found with a binary search
+    over byte offsets, reading O(log n) lines instead of the whole file.
+    Lines with an unparseable timestamp are treated as older than ``since``.
+
+    Compact delta rows carry no absolute timestamp: a probe that lands on one
+    reads on to the next full row (at most COMPACT_BLOCK_ROWS rows away), and
+    the result backs up to the full row of the block before the match, whose
+    delta rows may be newer than ``since``. Callers filter the parsed entries
+    of that block.
+
+    Args:
+        f: State file opened in binary mode.
+        since: Unix timestamp lower bound (inclusive).
+
+    Returns:
+        The byte offset of the first matching line, or of the block holding
+        it in a compact file (file size if no line can match). The file is left
+        positioned at that offset.
+    """
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+
+    def first_full_line_at(pos: int) -> tuple[int, bytes]:
+        # First non-delta line starting at or after byte offset pos
+        if pos == 0:
+            f.seek(0)
+        else:
+            f.seek(pos - 1)
+            f.readline()
+        offset, line = f.tell(), f.readline()
+        while line[:1] == b"~":
+            offset, line = f.tell(), f.readline()
+        return offset, line
+
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        _, line = first_full_line_at(mid)
+        ts = _line_timestamp(line) if line else None
+        if not line or (ts is not None and ts >= since):
+            hi = mid
+        else:
+            lo = mid + 1
+
+    offset, _ = first_full_line_at(lo)
+    offset = _block_start(f, offset)
+    f.seek(offset)
+    return offset
+
+
+def _block_start(f: BinaryIO, offset: int) -> int:
+    """Back up from ``offset`` over the delta rows right before it.
+
+    Returns:
+        The offset of the full row those delta rows expand from, or
+        ``offset`` itself if the line before it is not a delta row.
+    """
+    window = 4096
+    while offset > 0:
+        start = max(0, offset - window)
+        f.seek(start)
+        # The byte before offset ends a line; the first line may be partial
+        lines = f.read(offset - start).split(b"\n")[:-1]
+        if start:
+            lines = lines[1:]
+        pos = offset
+        for line in reversed(lines):
+            line_start = pos - len(line) - 1
+            if line[:1] != b"~" and line.strip():
+                return offset if pos == offset else line_start
+            pos = line_start
+        if not start:
+            return 0
+        window *= 4
+    return 0
+
+
+def read_first_entry(file_path: Path) -> StateEntry | None:
+    """Read only the first valid entry of a state file.
+
+    Args:
+        file_path: Path to the state file.
+
+    Returns:
+        The first StateEntry, or None if the file is empty, missing or has no
+        valid lines.
+    """
+    try:
+        with open_state_file(file_path) as f:
+            for line in f:
+                if line.strip():
+                    entry = StateEntry.from_csv_line(line.decode("utf-8", "replace"))
+                    if entry:
+                        return entry
+    except (OSError, *ARCHIVE_ERRORS):
+        pass
+    return None
+
+
+def is_archived(path: Path) -> bool:
+    """Return True if ``path`` is a compressed state file."""
+    return path.suffix in (".gz", ".xz")
+
+
+def open_state_file(path: Path) -> BinaryIO:
+    """Open a state file for binary reading, decompressing archives on the fly.
+
+    Raises:
+        OSError: If the file cannot be opened, or it is an xz archive and
+            this Python has no lzma module.
+    """
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")  # type: ignore[return-value]
+    if path.suffix == ".xz":
+        if lzma is None:
+            raise OSError(f"cannot read {path.name}: Python was built without lzma")
+        return lzma.open(path, "rb")  # type: ignore[return-value]
+    return open(path, "rb")
+
+
+@dataclass(frozen=True)
+class ArchivedFile:
+    """One state file compressed by StateFile.archive."""
+
+    source: Path
+    target: Path
+    original_size: int
+    archived_size: int
+
+
+@dataclass(frozen=True)
+class SessionSummary:
+    """Newest state file and last entry of one session (StateFile.summarize_sessions)."""
+
+    session_id: str
+    path: Path
+    mtime: float
+    last_entry: StateEntry | None
+
+
+def compress_state_file(path: Path, fmt: str = "gzip") -> Path:
+    """Compress a sealed state file next to itself and remove the original.
+
+    The archive keeps the original mtime, so idle and ``--since-days``
+    checks see the same age as before. It is written to a temporary file
+    and renamed into place; readers briefly seeing both copies prefer the
+    uncompressed one.
+
+    Args:
+        path: Uncompressed state file that no process appends to any more.
+        fmt: A key of ARCHIVE_FORMATS.
+
+    Returns:
+        Path of the archive.
+
+    Raises:
+        ValueError: If ``fmt`` is unknown or unavailable.
+        OSError: If reading or writing fails; the original is left in place.
+    """
+    if fmt not in ARCHIVE_FORMATS:
+        raise ValueError(f"unknown archive format '{fmt}'")
+    if fmt == "xz" and lzma is None:
+        raise ValueError("xz archives need Python's lzma module")
+    target = path.with_name(path.name + ARCHIVE_FORMATS[fmt])
+    st = os.stat(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".archive-", suffix=".tmp")
+    try:
+        with open(fd, "wb") as raw, open(path, "rb") as src:
+            if fmt == "gzip":
+                out = gzip.GzipFile(fileobj=raw, mode="wb", mtime=int(st.st_mtime))
+            else:
+                out = lzma.LZMAFile(raw, "wb", preset=6)
+            with out:
+                shutil.copyfileobj(src, out, 1 << 20)
+        os.utime(tmp_name, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    os.unlink(path)
+    return target
+
+
+def _read_last_line_entry(file_path: Path) -> StateEntry | None:
+    """Parse the last line of a state file, or None if missing or empty."""
+    try:
+        with MappedStateFile(file_path) as m:
+            line = m.last_line()
+            if line is not None:
+                with line:
+                    text = str(line, "utf-8", "replace")
+                if text[:1] == DELTA_PREFIX:
+                    return m.last_entry()
+                return StateEntry.from_csv_line(text)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        sys.stderr.write(f"[statusline] warning: failed to read last entry {file_path}: {e}\n")
+    return None
+
+
+def parse_state_filename(name: str) -> tuple[str, int] | None:
+    """Split a state file name into its session ID and segment number.
+
+    ``statusline.<sid>.state`` is the live file (segment 0) and
+    ``statusline.<sid>.<n>.state`` is sealed segment ``n`` (n >= 1). Sealed
+    segments may carry an archive suffix (``.state.gz``, ``.state.xz``).
+
+    Args:
+        name: File name, without directory.
+
+    Returns:
+        (session_id, segment) or None if the name is not a per-session state file.
+    """
+    archived = name.endswith((".state.gz", ".state.xz"))
+    if archived:
+        name = name[:-3]
+    if not name.startswith("statusline.") or not name.endswith(".state"):
+        return None
+    stem = name[len("statusline.") : -len(".state")]
+    session_id, dot, segment = stem.rpartition(".")
+    if dot and session_id and segment.isascii() and segment.isdigit():
+        return session_id, int(segment)
+    return (stem, 0) if stem and not archived else None
+
+
+def _order_segments(found: list[tuple[int, Path]]) -> list[Path]:
+    """Sort (segment, path) pairs, keeping one file per segment number.
+
+    While a segment is being archived both copies exist for a moment; the
+    uncompressed one wins.
+    """
+    by_number: dict[int, Path] = {}
+    for segment, path in found:
+        if segment not in by_number or is_archived(by_number[segment]):
+            by_number[segment] = path
+    return [by_number[segment] for segment in sorted(by_number)]
+
+
+def discover_state_files(state_dir: Path) -> dict[str, list[Path]]:
+    """Group the state files in a directory by session.
+
+    Args:
+        state_dir: Directory to scan.
+
+    Returns:
+        Mapping of session ID to its files in history order: sealed segments
+        oldest first, then the live file.
+    """
+    sessions: dict[str, list[tuple[int, Path]]] = {}
+    for path in state_dir.glob("statusline.*.state*"):
+        parsed = parse_state_filename(path.name)
+        if parsed is not None:
+            session_id, segment = parsed
+            sessions.setdefault(session_id, []).append((segment or sys.maxsize, path))
+    return {sid: _order_segments(files) for sid, files in sessions.items()}
+
+
+def discover_sessions(since: int | None = None) -> list[tuple[str, list[Path]]]:
+    """Discover all state files in the state directory, grouped by session.
+
+    Args:
+        since: Optional Unix timestamp. Sessions whose newest file was last
+            modified before it are skipped without being opened: every entry,
+            and therefore the session start, predates the cutoff.
+
+    Returns:
+        (session_id, files) pairs sorted by session ID, with each session's
+        segments oldest first.
+    """
+    state_dir = StateFile.STATE_DIR
+    if not state_dir.exists():
+        return []
+
+    sessions = []
+    for session_id, paths in sorted(discover_state_files(state_dir).items()):
+        try:
+            st = paths[-1].stat()
+        except OSError:
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            continue
+        if since is not None and st.st_mtime < since:
+            continue
+        sessions.append((session_id, paths))
+    return sessions
+
+
+def cutoff_timestamp(since_days: int | None) -> int | None:
+    """Convert a --since-days window into a Unix timestamp cutoff."""
+    if since_days is None:
+        return None
+    return int((datetime.now() - timedelta(days=since_days)).timestamp())
+
+
+class MappedStateFile:
+    """Read-only memory map over a state file.
+
+    Lines are handed out as memoryview slices of the mapping and fields are
+    decoded on request, so scanning a large history never materializes the
+    file as one Python string. Views must not be kept past the ``with``
+    block that opened the file.
+
+    Archived segments (``.state.gz``, ``.state.xz``) cannot be mapped; they
+    are decompressed into memory instead, which segmenting bounds to
+    roughly SEGMENT_MAX_BYTES.
+
+    Usage:
+        with MappedStateFile(path) as m:
+            count = sum(1 for _ in m.rows(("timestamp",)))
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._file: BinaryIO | None = None
+        self._mm: mmap.mmap | bytes | None = None
+        self._view = memoryview(b"")
+
+    def __enter__(self) -> MappedStateFile:
+        if is_archived(self.path):
+            try:
+                with open_state_file(self.path) as f:
+                    data = f.read()
+            except ARCHIVE_ERRORS as e:
+                raise OSError(f"corrupt archive {self.path}: {e}") from e
+            if data:
+                self._mm = data
+                self._view = memoryview(data)
+            return self
+        self._file = open(self.path, "rb")
+        try:
+            if os.fstat(self._file.fileno()).st_size:
+                self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mm)
+        except BaseException:
+            self._file.close()
+            raise
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._view.release()
+        if isinstance(self._mm, mmap.mmap):
+            try:
+                self._mm.close()
+            except BufferError:
+                # A caller kept a line view; the mapping is freed with it
+                pass
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def size(self) -> int:
+        """Mapped size in bytes."""
+        return len(self._view)
+
+    def buffer(self, start: int = 0) -> memoryview:
+        """Return the mapped bytes from ``start`` to the end, without copying."""
+        return self._view[start:]
+
+    def chunks(self, start: int = 0, size: int = 1 << 20) -> Iterator[memoryview]:
+        """Yield the mapped bytes from ``start`` in slices of about ``size`` bytes.
+
+        Slices end at a line boundary and never split a compact block (the
+        next slice starts at a full row), so each one can be passed to
+        StateEntry.parse_many on its own.
+        """
+        mm = self._mm
+        if mm is None:
+            return
+        view = self._view
+        total = len(mm)
+        pos = start
+        while pos < total:
+            cut = pos + size
+            while cut < total:
+                nl = mm.find(b"\n", cut)
+                cut = total if nl < 0 else nl + 1
+                if mm[cut : cut + 1] != b"~":
+                    break
+            yield view[pos:cut]
+            pos = cut
+
+    def seek_timestamp(self, since: int) -> int:
+        """Byte offset of the first line whose timestamp is >= since.
+
+        In compact files this is the start of the block holding that line;
+        the caller filters the block's older entries (see seek_timestamp).
+        """
+        if self._mm is None:
+            return 0
+        f = self._mm if isinstance(self._mm, mmap.mmap) else io.BytesIO(self._mm)
+        return seek_timestamp(f, since)
+
+    def _spans(self, start: int = 0) -> Iterator[tuple[int, int]]:
+        """Yield (start, stop) byte offsets of each line, excluding the EOL."""
+        mm = self._mm
+        if mm is None:
+            return
+        find = mm.find
+        size = len(mm)
+        pos = start
+        while pos < size:
+            end = find(b"\n", pos)
+            if end < 0:
+                end = size
+            stop = end - 1 if end > pos and mm[end - 1] == 0x0D else end
+            yield pos, stop
+            pos = end + 1
+
+    def lines(self, start: int = 0) -> Iterator[memoryview]:
+        """Yield every line from byte offset ``start`` as a memoryview slice."""
+        view = self._view
+        for pos, stop in self._spans(start):
+            yield view[pos:stop]
+
+    def reversed_lines(self) -> Iterator[memoryview]:
+        """Yield lines from last to first, scanning backwards from the end."""
+        mm = self._mm
+        if mm is None:
+            return
+        view = self._view
+        end = len(mm)
+        if mm[end - 1] == 0x0A:
+            end -= 1
+        while end >= 0:
+            pos = mm.rfind(b"\n", 0, end) + 1
+            stop = end - 1 if end > pos and mm[end - 1] == 0x0D else end
+            yield view[pos:stop]
+            end = pos - 1
+
+    def last_line(self) -> memoryview | None:
+        """Return the last non-blank line, or None."""
+        for line in self.reversed_lines():
+            if bytes(line).strip():
+                return line
+        return None
+
+    def first_entry(self) -> StateEntry | None:
+        """Parse the first valid entry, reading forward from the start."""
+        for line in self.lines():
+            entry = StateEntry.from_csv_line(str(line, "utf-8", "replace"))
+            if entry is not None:
+                return entry
+        return None
+
+    def last_entry(self) -> StateEntry | None:
+        """Parse the last valid entry, reading backwards from the end.
+
+        A trailing delta row is expanded from the full row that starts its
+        block.
+        """
+        deltas: list[str] = []
+        for line in self.reversed_lines():
+            text = str(line, "utf-8", "replace")
+            if text[:1] == DELTA_PREFIX:
+                deltas.append(text)
+                continue
+            base = StateEntry.from_csv_line(text)
+            if base is None:
+                if deltas:
+                    # Deltas of a malformed full row cannot be expanded
+                    deltas.clear()
+                continue
+            for delta in deltas:
+                entry = StateEntry.from_delta_line(delta, base)
+                if entry is not None:
+                    return entry
+            return base
+        return None
+
+    def tail_offset(self, count: int) -> int:
+        """Byte offset where the last ``count`` lines start (0 if there are fewer)."""
+        mm = self._mm
+        if mm is None:
+            return 0
+        end = len(mm)
+        if end and mm[end - 1] == 0x0A:
+            end -= 1
+        for _ in range(count):
+            nl = mm.rfind(b"\n", 0, end)
+            if nl < 0:
+                return 0
+            end = nl
+        return end + 1
+
+    def rows(self, fields: Sequence[str], start: int = 0) -> Iterator[tuple]:
+        """Decode only the requested fields of each valid line.
+
+        Lines are accepted and rejected exactly as StateEntry.from_csv_line
+        does; missing trailing fields decode to zero/empty.
+
+        Args:
+            fields: StateEntry field names, e.g. ``("timestamp", "cost_usd")``.
+            start: Byte offset to start from.
+
+        Returns:
+            Iterator of tuples, one value per requested field.
+        """
+        cols = [StateEntry.__slots__.index(name) for name in fields]
+        decoders = [_RAW_PLAN[c] for c in cols]
+        # Commas needed to bound the highest column, and at least two to
+        # tell the legacy 2-field format apart
+        wanted = max(max(cols, default=0) + 1, 2)
+        mm = self._mm
+        if mm is None:
+            return
+        view = self._view
+        # Delta rows are expanded against their block's full row, parsed
+        # only once a block turns out to have deltas
+        base_span: tuple[int, int] | None = None
+        base: StateEntry | None = None
+        for pos, stop in self._spans(start):
+            if mm[pos : pos + 1] == b"~":
+                if base is None and base_span is not None:
+                    base = StateEntry.from_csv_line(
+                        str(view[base_span[0] : base_span[1]], "utf-8", "replace")
+                    )
+                    base_span = None
+                if base is not None:
+                    text = str(view[pos:stop], "utf-8", "replace")
+                    entry = StateEntry.from_delta_line(text, base)
+                    if entry is not None:
+                        yield tuple(getattr(entry, name) for name in fields)
+                continue
+            if pos == stop:
+                continue
+            # One C-level split bounds every wanted column; the last part runs
+            # to the end of the line only when fewer commas were found
+            parts = mm[pos:stop].split(b",", wanted)
+            n = len(parts)
+            if n < 2:
+                continue
+            try:
+                # Timestamp is strict; so is the token count of legacy lines
+                int(parts[0])
+                if n == 2:
+                    int(parts[1])
+            except ValueError:
+                base_span = base = None
+                continue
+            base_span, base = (pos, stop), None
+            yield tuple(
+                decode(parts[col]) if col < n else decode(b"")
+                for col, decode in zip(cols, decoders)
+            )
+
+
 class StateFile:
     """Manage state files for token tracking."""
 
     STATE_DIR = Path.home() / ".claude" / "statusline"
     OLD_STATE_DIR = Path.home() / ".claude"
+    SEGMENT_MAX_BYTES = 1_500_000  # ~10,000 entries
+    SEGMENT_KEEP = 10
+    # Compact mode: a full row at least every this many rows bounds how far
+    # back readers of the last entry have to look
+    COMPACT_BLOCK_ROWS = 100
+    # The sessionless legacy file (statusline.state) is still truncated
     ROTATION_THRESHOLD = 10_000
     ROTATION_KEEP = 5_000
+    SPOOL_DIR = _default_spool_dir()
+    # Written to STATE_DIR once old ~/.claude/statusline*.state files have
+    # been moved; bump the suffix to run a migration again
+    MIGRATION_MARKER = ".migrated-v1"
+    # (STATE_DIR, OLD_STATE_DIR) pairs already prepared by this process
+    _prepared: set[tuple[Path, Path]] = set()
 
-    def __init__(self, session_id: str | None = None) -> None:
+    def __init__(
+        self,
+        session_id: str | None = None,
+        spool: SpoolPolicy | None = None,
+        keep_segments: int | None = None,
+        compact: bool = False,
+    ) -> None:
         """Initialize state file manager.
 
         Args:
             session_id: Optional session ID. If not provided, uses latest session.
+            spool: Optional write-behind policy. When set, append_entry
+                collects entries in a local spool file and writes them to the
+                state file in batches. Ignored without fcntl (Windows).
+            keep_segments: Sealed segments to retain per session (0 keeps
+                all). Defaults to SEGMENT_KEEP.
+            compact: Write delta-encoded ``~`` rows after a full row instead
+                of a full row per entry (see StateEntry.to_delta_line).
+                Session files only.
         """
         if session_id is not None:
             _validate_session_id(session_id)
         self.session_id = session_id
-        self._ensure_state_dir()
-        self._migrate_old_files()
+        self.spool = spool if session_id and fcntl is not None else None
+        self.keep_segments = self.SEGMENT_KEEP if keep_segments is None else keep_segments
+        self.compact = compact and bool(session_id)
+        self._timer_pending = False
+        key = (self.STATE_DIR, self.OLD_STATE_DIR)
+        if key not in StateFile._prepared:
+            self._ensure_state_dir()
+            self._migrate_old_files()
+            StateFile._prepared.add(key)
 
     def _ensure_state_dir(self) -> None:
         """Create state directory if it doesn't exist."""
         self.STATE_DIR.mkdir(parents=True, exist_ok=True)
 
     def _migrate_old_files(self) -> None:
-        """Migrate old state files from ~/.claude/ to ~/.claude/statusline/."""
+        """Migrate old state files from ~/.claude/ to ~/.claude/statusline/.
+
+        Runs once per state directory: afterwards MIGRATION_MARKER exists
+        and the old directory is not scanned again.
+        """
+        marker = self.STATE_DIR / self.MIGRATION_MARKER
+        if marker.exists():
+            return
         for old_file in self.OLD_STATE_DIR.glob("statusline*.state"):
             if old_file.is_file():
                 new_file = self.STATE_DIR / old_file.name
@@ -190,6 +1097,10 @@ class StateFile:
                         old_file.unlink()
                     except OSError:
                         pass
+        try:
+            marker.touch()
+        except OSError:
+            pass  # retried by the next process
 
     @property
     def file_path(self) -> Path:
@@ -198,18 +1109,273 @@ class StateFile:
             return self.STATE_DIR / f"statusline.{self.session_id}.state"
         return self.STATE_DIR / "statusline.state"
 
+    @property
+    def spool_path(self) -> Path | None:
+        """Get the write-behind spool path for the current session."""
+        if self.session_id:
+            return self.SPOOL_DIR / f"statusline.{self.session_id}.spool"
+        return None
+
+    def _spool_dir_ok(self, create: bool = False) -> bool:
+        """Check the spool directory is a real directory owned by this user."""
+        spool_dir = self.SPOOL_DIR
+        try:
+            if create:
+                spool_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            st = os.lstat(spool_dir)
+        except OSError:
+            return False
+        if not stat.S_ISDIR(st.st_mode):
+            return False
+        return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+    def _spool_record(self, data: bytes) -> bool:
+        """Add a record to the write-behind spool, flushing it when due.
+
+        A new spool starts with a ``#<unix time>,<keep_segments>,<compact>``
+        header so its age can be checked without trusting entry timestamps,
+        and so readers that flush it apply this writer's retention and row
+        format.
+
+        Args:
+            data: One encoded CSV record, newline-terminated.
+
+        Returns:
+            False if the spool could not be written; the caller should write
+            the record directly instead.
+        """
+        if not self._spool_dir_ok(create=True):
+            return False
+        try:
+            fd = open_locked(self.spool_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, fcntl.LOCK_EX)
+        except OSError:
+            return False
+        flushed = 0
+        try:
+            try:
+                new = os.fstat(fd).st_size == 0
+                if new:
+                    header = f"#{int(time.time())},{self.keep_segments},{int(self.compact)}\n"
+                    data = header.encode() + data
+                _write_all(fd, data)
+            except OSError:
+                return False
+            try:
+                pending = read_all(fd)
+                started, records = _split_spool(pending)
+                due = records.count(b"\n") >= self.spool.max_entries or (
+                    started is not None and time.time() - started >= self.spool.max_age
+                )
+                if due:
+                    flushed = self._drain_spool(fd, pending)
+            except OSError as e:
+                sys.stderr.write(
+                    f"[statusline] warning: failed to flush spool {self.spool_path}: {e}\n"
+                )
+        finally:
+            os.close(fd)
+        if flushed:
+            self._maybe_rotate()
+        elif new:
+            # First entry of a fresh spool: make sure it gets flushed even if
+            # no further refresh arrives (fork only once the lock is released,
+            # and never from a worker thread: see start_pending_flush_timer)
+            if threading.current_thread() is threading.main_thread():
+                self._start_flush_timer()
+            else:
+                self._timer_pending = True
+        return True
+
+    def _drain_spool(self, fd: int, pending: bytes) -> int:
+        """Append spooled records to the state file in one write, then drop the spool.
+
+        Must be called with the spool locked. The spool is unlinked while
+        still locked; writers waiting on it notice and start a new one.
+
+        Returns:
+            Number of records written.
+        """
+        _, records = _split_spool(pending)
+        if records:
+            self._append_records(records)
+        os.unlink(self.spool_path)
+        return records.count(b"\n")
+
+    def start_pending_flush_timer(self) -> None:
+        """Start the flush timer a worker thread's append left pending.
+
+        Forking while other threads run can deadlock the child on a lock
+        one of them held, so appends made off the main thread only mark the
+        timer as due. Call this from the main thread once those threads are
+        done with the state file.
+        """
+        if self._timer_pending:
+            self._timer_pending = False
+            self._start_flush_timer()
+
+    def _start_flush_timer(self) -> None:
+        """Fork a detached process that flushes the spool after max_age seconds.
+
+        Double-forks so the statusline process never waits for or reaps it,
+        and points the child's stdio at /dev/null so it cannot hold the
+        statusline's output pipe open.
+        """
+        if not hasattr(os, "fork"):
+            return
+        try:
+            pid = os.fork()
+        except OSError:
+            return
+        if pid:
+            try:
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+            return
+        try:
+            os.setsid()
+            if os.fork():
+                os._exit(0)
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for std_fd in (0, 1, 2):
+                os.dup2(devnull, std_fd)
+            time.sleep(self.spool.max_age)
+            self.flush()
+        except BaseException:
+            pass
+        os._exit(0)
+
+    def flush(self) -> int:
+        """Write any spooled entries for this session to its state file.
+
+        Readers call this before reading, so write-behind never hides data
+        from them. Safe to call when write-behind is off.
+
+        Returns:
+            Number of entries flushed.
+        """
+        path = self.spool_path
+        if path is None or fcntl is None or not path.exists() or not self._spool_dir_ok():
+            return 0
+        try:
+            fd = open_locked(path, os.O_RDWR, fcntl.LOCK_EX)
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            sys.stderr.write(f"[statusline] warning: failed to open spool {path}: {e}\n")
+            return 0
+        flushed = 0
+        writer = self
+        try:
+            pending = read_all(fd)
+            writer = self._spool_writer(pending)
+            flushed = writer._drain_spool(fd, pending)
+        except OSError as e:
+            sys.stderr.write(f"[statusline] warning: failed to flush spool {path}: {e}\n")
+        finally:
+            os.close(fd)
+        if flushed:
+            writer._maybe_rotate()
+        return flushed
+
+    def _spool_writer(self, pending: bytes) -> StateFile:
+        """Return a StateFile with the retention and row format of the spool's writer.
+
+        Readers flush spools without knowing the user's state_keep_segments
+        or state_compact_rows, so the writer's values come from the spool
+        header. A spool without them keeps every segment rather than
+        pruning by a default the user may not have chosen.
+        """
+        policy = _spool_policy(pending)
+        keep_segments, compact = policy if policy is not None else (0, self.compact)
+        writer = copy.copy(self)
+        writer.keep_segments = keep_segments
+        writer.compact = compact and bool(self.session_id)
+        return writer
+
+    @classmethod
+    def flush_all(cls) -> int:
+        """Flush the write-behind spools of every session.
+
+        Returns:
+            Total number of entries flushed.
+        """
+        total = 0
+        for path in cls.SPOOL_DIR.glob("statusline.*.spool"):
+            session_id = path.name[len("statusline.") : -len(".spool")]
+            try:
+                total += cls(session_id).flush()
+            except ValueError:
+                continue
+        return total
+
+    def _peek_spool(self) -> StateEntry | None:
+        """Return the newest spooled entry without flushing."""
+        path = self.spool_path
+        if path is None or not path.exists() or not self._spool_dir_ok():
+            return None
+        try:
+            lines = path.read_bytes().splitlines()
+        except OSError:
+            return None
+        for line in reversed(lines):
+            if line.strip() and not line.startswith(b"#"):
+                return StateEntry.from_csv_line(line.decode("utf-8", "replace"))
+        return None
+
+    def segment_path(self, segment: int) -> Path:
+        """Get the path of sealed segment ``segment`` for the current session."""
+        return self.STATE_DIR / f"statusline.{self.session_id}.{segment}.state"
+
+    def segment_paths(self) -> list[Path]:
+        """List the sealed segments of the current session, oldest first."""
+        if not self.session_id:
+            return []
+        found = []
+        pattern = f"statusline.{glob.escape(self.session_id)}.*.state*"
+        for path in self.STATE_DIR.glob(pattern):
+            parsed = parse_state_filename(path.name)
+            if parsed is not None and parsed[0] == self.session_id and parsed[1] > 0:
+                found.append((parsed[1], path))
+        return _order_segments(found)
+
+    def history_paths(self) -> list[Path]:
+        """List every file holding the session's history, oldest first.
+
+        For an unspecified session this is the history of the most recently
+        updated one.
+        """
+        if not self.session_id:
+            latest = self.find_latest_state_file()
+            parsed = parse_state_filename(latest.name) if latest else None
+            if parsed is None:
+                return [latest] if latest else []
+            return StateFile(parsed[0]).history_paths()
+        paths = self.segment_paths()
+        if self.file_path.exists():
+            paths.append(self.file_path)
+        return paths
+
     def find_latest_state_file(self) -> Path | None:
         """Find the most recently modified state file.
 
         Returns:
-            Path to the latest state file, or None if no files exist
+            Path to the latest state file (the live file, or the newest
+            segment right after sealing), or None if no files exist
         """
         if self.session_id:
             file_path = self.STATE_DIR / f"statusline.{self.session_id}.state"
-            return file_path if file_path.exists() else None
+            if file_path.exists():
+                return file_path
+            segments = self.segment_paths()
+            return segments[-1] if segments else None
 
         # Find most recent state file by modification time
-        state_files = list(self.STATE_DIR.glob("statusline.*.state"))
+        state_files = [
+            p
+            for p in self.STATE_DIR.glob("statusline.*.state*")
+            if parse_state_filename(p.name) is not None
+        ]
         if not state_files:
             # Try default state file
             default = self.STATE_DIR / "statusline.state"
@@ -217,30 +1383,73 @@ class StateFile:
 
         return max(state_files, key=lambda f: f.stat().st_mtime)
 
-    def read_history(self) -> list[StateEntry]:
-        """Read all entries from the state file.
+    def read_history(self, since: int | None = None) -> list[StateEntry]:
+        """Read all entries of the session, across its sealed segments.
+
+        Args:
+            since: Optional Unix timestamp. When given, only entries at or
+                after it are returned and older lines are skipped without
+                being read (see seek_timestamp).
 
         Returns:
             List of StateEntry objects
         """
-        file_path = self.find_latest_state_file()
-        if not file_path or not file_path.exists():
-            return []
+        entries: list[StateEntry] = []
+        for parsed in self._history_chunks(since):
+            entries.extend(parsed)
+        return entries
 
-        entries = []
-        try:
-            content = file_path.read_text()
-            for line in content.splitlines():
-                if line.strip():
-                    entry = StateEntry.from_csv_line(line)
-                    if entry:
-                        entries.append(entry)
-        except OSError as e:
-            sys.stderr.write(
-                f"[statusline] warning: failed to read state history {file_path}: {e}\n"
-            )
+    def iter_history(
+        self, since: int | None = None, chunk_bytes: int = 1 << 20
+    ) -> Iterator[StateEntry]:
+        """Yield the same entries as read_history, parsing a chunk at a time.
 
-        return entries
+        Only one chunk's entries (about ``chunk_bytes`` of CSV) are alive at
+        once, so memory stays flat however long the session is.
+
+        Args:
+            since: Optional Unix timestamp, as for read_history.
+            chunk_bytes: Approximate bytes parsed per step.
+        """
+        for parsed in self._history_chunks(since, chunk_bytes):
+            yield from parsed
+
+    def _history_chunks(
+        self, since: int | None = None, chunk_bytes: int | None = None
+    ) -> Iterator[list[StateEntry]]:
+        """Parse the session's files, oldest first, in lists of entries.
+
+        Args:
+            since: Optional Unix timestamp; older entries are skipped.
+            chunk_bytes: Parse at most about this many bytes per list, or
+                whole files at once if None.
+        """
+        if self.session_id:
+            self.flush()
+        else:
+            self.flush_all()
+
+        for file_path in self.history_paths():
+            try:
+                with MappedStateFile(file_path) as m:
+                    start = m.seek_timestamp(since) if since is not None else 0
+                    if start >= m.size:
+                        continue
+                    chunks = m.chunks(start, chunk_bytes) if chunk_bytes else [m.buffer(start)]
+                    for chunk in chunks:
+                        with chunk as buf:
+                            parsed = StateEntry.parse_many(buf)
+                        # Only a compact block found by the seek starts older
+                        if since is not None and parsed and parsed[0].timestamp < since:
+                            parsed = [e for e in parsed if e.timestamp >= since]
+                        yield parsed
+            except FileNotFoundError:
+                # Pruned by retention while we were reading
+                continue
+            except OSError as e:
+                sys.stderr.write(
+                    f"[statusline] warning: failed to read state history {file_path}: {e}\n"
+                )
 
     def read_last_entry(self) -> StateEntry | None:
         """Read only the last entry from the state file.
@@ -248,21 +1457,26 @@ class StateFile:
         Returns:
             The last StateEntry or None if file is empty/missing
         """
-        # Use file_path for specific session, find_latest for unspecified session
-        file_path = self.file_path if self.session_id else self.find_latest_state_file()
-        if not file_path or not file_path.exists():
-            return None
+        # Entries waiting in the write-behind spool are newer than the file
+        if self.session_id:
+            spooled = self._peek_spool()
+            if spooled is not None:
+                return spooled
+        else:
+            self.flush_all()
 
-        try:
-            content = file_path.read_text()
-            lines = content.splitlines()
-            for line in reversed(lines):
-                if line.strip():
-                    return StateEntry.from_csv_line(line)
-        except OSError as e:
-            sys.stderr.write(f"[statusline] warning: failed to read last entry {file_path}: {e}\n")
+        if not self.session_id:
+            latest = self.find_latest_state_file()
+            return _read_last_line_entry(latest) if latest else None
 
-        return None
+        entry = _read_last_line_entry(self.file_path)
+        if entry is None:
+            # Right after sealing there is no live file yet; the newest
+            # segment holds the last entry
+            segments = self.segment_paths()
+            if segments:
+                entry = _read_last_line_entry(segments[-1])
+        return entry
 
     def append_entry(self, entry: StateEntry) -> None:
         """Append an entry to the state file.
@@ -270,37 +1484,180 @@ class StateFile:
         Args:
             entry: StateEntry to append
         """
+        data = f"{entry.to_csv_line()}\n".encode()
+        if self.spool is not None and self._spool_record(data):
+            return
         try:
-            with open(self.file_path, "a") as f:
-                f.write(f"{entry.to_csv_line()}\n")
+            self._append_records(data)
         except OSError as e:
             sys.stderr.write(f"[statusline] warning: failed to write state {self.file_path}: {e}\n")
             return
         self._maybe_rotate()
 
+    def _append_records(self, data: bytes) -> None:
+        """Append newline-terminated records to the state file.
+
+        One write() on an O_APPEND descriptor keeps concurrent records whole;
+        the shared lock only keeps appends out of a rotation in progress.
+        Compact mode needs the previous row to encode against, so it holds
+        the lock exclusively while reading the tail and writing.
+        """
+        if self.compact:
+            flags, operation = os.O_RDWR, fcntl.LOCK_EX if fcntl else 0
+        else:
+            flags, operation = os.O_WRONLY, fcntl.LOCK_SH if fcntl else 0
+        flags |= os.O_APPEND | os.O_CREAT
+        try:
+            fd = open_locked(self.file_path, flags, operation)
+        except FileNotFoundError:
+            # The directory is only created once per process; recreate it
+            # if it was removed since
+            self._ensure_state_dir()
+            fd = open_locked(self.file_path, flags, operation)
+        try:
+            if self.compact:
+                data = self._encode_compact(fd, data)
+            _write_all(fd, data)
+        finally:
+            os.close(fd)
+
+    def _encode_compact(self, fd: int, data: bytes) -> bytes:
+        """Re-encode full CSV records as delta rows against the file's tail.
+
+        A full row is written whenever there is no block to continue, a
+        string column changed, or the block reached COMPACT_BLOCK_ROWS.
+        """
+        base, block_rows = self._compact_tail(fd)
+        out = []
+        for line in data.decode("utf-8", "replace").splitlines():
+            entry = StateEntry.from_csv_line(line)
+            delta = None
+            if entry is not None and base is not None and block_rows < self.COMPACT_BLOCK_ROWS:
+                delta = entry.to_delta_line(base)
+            if delta is None:
+                out.append(line)
+                base, block_rows = entry, 0
+            else:
+                out.append(delta)
+                block_rows += 1
+        return ("\n".join(out) + "\n").encode() if out else b""
+
+    def _compact_tail(self, fd: int) -> tuple[StateEntry | None, int]:
+        """Return the full row of the file's last block and its delta count.
+
+        Reads only the end of the file: a block is at most
+        COMPACT_BLOCK_ROWS delta rows after one full row.
+        """
+        size = os.fstat(fd).st_size
+        if not size:
+            return None, 0
+        start = max(0, size - 16 * 1024)
+        os.lseek(fd, start, os.SEEK_SET)
+        chunk = b""
+        while len(chunk) < size - start:
+            part = os.read(fd, size - start - len(chunk))
+            if not part:
+                break
+            chunk += part
+        lines = chunk.decode("utf-8", "replace").splitlines()
+        if start:
+            lines = lines[1:]  # first line may be partial
+        for i in range(len(lines) - 1, -1, -1):
+            if lines[i][:1] == DELTA_PREFIX or not lines[i].strip():
+                continue
+            base = StateEntry.from_csv_line(lines[i])
+            if base is None:
+                continue
+            return base, len(lines) - i - 1
+        return None, 0
+
     def _maybe_rotate(self) -> None:
-        """Rotate state file if it exceeds the line threshold.
+        """Seal the live state file into a segment once it is full.
 
-        If the file has more than ROTATION_THRESHOLD lines, truncate to
-        the most recent ROTATION_KEEP lines via atomic temp-file + rename.
+        When the live file reaches SEGMENT_MAX_BYTES it is renamed to the
+        next ``statusline.<sid>.<n>.state`` segment and the next append
+        starts a new live file. Nothing is rewritten, so the check is a
+        single stat and history survives. Segments beyond ``keep_segments``
+        are deleted oldest first.
+
+        The seal holds an exclusive flock on the live file, so appends from
+        other statusline processes wait for it and then land in the new live
+        file instead of the sealed one.
         """
+        if not self.session_id:
+            self._truncate_sessionless()
+            return
         file_path = self.file_path
         try:
-            if not file_path.exists():
-                return
-            lines = file_path.read_text().splitlines(keepends=True)
-            if len(lines) <= self.ROTATION_THRESHOLD:
+            if os.stat(file_path).st_size < self.SEGMENT_MAX_BYTES:
                 return
-            keep = lines[-self.ROTATION_KEEP :]
-            fd = tempfile.NamedTemporaryFile(
-                dir=str(self.STATE_DIR), delete=False, mode="w", suffix=".tmp"
+        except OSError:
+            return
+        lock_fd = None
+        try:
+            if fcntl is not None:
+                try:
+                    lock_fd = open_locked(file_path, os.O_RDONLY, fcntl.LOCK_EX)
+                except FileNotFoundError:
+                    return
+                # Another process may have sealed it while we waited
+                if os.fstat(lock_fd).st_size < self.SEGMENT_MAX_BYTES:
+                    return
+            segments = self.segment_paths()
+            last = parse_state_filename(segments[-1].name)[1] if segments else 0
+            sealed = self.segment_path(last + 1)
+            os.rename(file_path, sealed)
+            segments.append(sealed)
+            if self.keep_segments > 0:
+                for old in segments[: -self.keep_segments]:
+                    try:
+                        old.unlink()
+                    except FileNotFoundError:
+                        pass
+        except OSError as e:
+            sys.stderr.write(
+                f"[statusline] warning: failed to rotate state file {file_path}: {e}\n"
             )
+        finally:
+            if lock_fd is not None:
+                os.close(lock_fd)
+
+    def _truncate_sessionless(self) -> None:
+        """Truncate the legacy sessionless file to its newest ROTATION_KEEP lines.
+
+        ``statusline.state`` has no session ID to name segments after, so it
+        keeps the old truncate-and-replace rotation once it exceeds
+        ROTATION_THRESHOLD lines.
+        """
+        file_path = self.file_path
+        lock_fd = None
+        try:
+            if fcntl is not None:
+                try:
+                    lock_fd = open_locked(file_path, os.O_RDONLY, fcntl.LOCK_EX)
+                except FileNotFoundError:
+                    return
+            elif not file_path.exists():
+                return
+            with MappedStateFile(file_path) as m:
+                if m.tail_offset(self.ROTATION_THRESHOLD) == 0:
+                    return
+                fd = tempfile.NamedTemporaryFile(
+                    dir=str(self.STATE_DIR), delete=False, mode="wb", suffix=".tmp"
+                )
+                try:
+                    # Copy the kept tail straight from the mapping
+                    with m.buffer(m.tail_offset(self.ROTATION_KEEP)) as keep:
+                        fd.write(keep)
+                    fd.close()
+                except BaseException:
+                    fd.close()
+                    os.unlink(fd.name)
+                    raise
+            # Replace only once the mapping is closed (required on Windows)
             try:
-                fd.writelines(keep)
-                fd.close()
                 os.replace(fd.name, str(file_path))
             except BaseException:
-                fd.close()
                 try:
                     os.unlink(fd.name)
                 except OSError:
@@ -310,6 +1667,76 @@ class StateFile:
             sys.stderr.write(
                 f"[statusline] warning: failed to rotate state file {file_path}: {e}\n"
             )
+        finally:
+            if lock_fd is not None:
+                os.close(lock_fd)
+
+    def archive(self, idle_before: float, fmt: str = "gzip") -> list[ArchivedFile]:
+        """Compress the session's files last modified before ``idle_before``.
+
+        An idle live file is first sealed as the next segment (under the same
+        exclusive flock appends take), so a resumed session simply starts a
+        new live file and history order is preserved.
+
+        Args:
+            idle_before: Unix timestamp; newer files are left alone.
+            fmt: A key of ARCHIVE_FORMATS.
+
+        Returns:
+            One ArchivedFile per compressed file.
+
+        Raises:
+            ValueError: If ``fmt`` is unknown or unavailable.
+        """
+        if not self.session_id:
+            return []
+        idle = []
+        for path in self.segment_paths():
+            try:
+                if not is_archived(path) and os.stat(path).st_mtime < idle_before:
+                    idle.append((path, path))
+            except FileNotFoundError:
+                continue
+        sealed = self._seal_idle_live_file(idle_before)
+        if sealed is not None:
+            idle.append((self.file_path, sealed))
+
+        archived = []
+        for source, path in idle:
+            try:
+                size = os.stat(path).st_size
+                target = compress_state_file(path, fmt)
+            except FileNotFoundError:
+                # Pruned by retention in the meantime
+                continue
+            archived.append(ArchivedFile(source, target, size, os.stat(target).st_size))
+        return archived
+
+    def _seal_idle_live_file(self, idle_before: float) -> Path | None:
+        """Rename the live file to the next segment if it is idle.
+
+        Returns:
+            The sealed segment path, or None if there is no idle live file.
+        """
+        lock_fd = None
+        try:
+            if fcntl is not None:
+                lock_fd = open_locked(self.file_path, os.O_RDONLY, fcntl.LOCK_EX)
+                st = os.fstat(lock_fd)
+            else:
+                st = os.stat(self.file_path)
+            if st.st_mtime >= idle_before or st.st_size == 0:
+                return None
+            segments = self.segment_paths()
+            last = parse_state_filename(segments[-1].name)[1] if segments else 0
+            sealed = self.segment_path(last + 1)
+            os.rename(self.file_path, sealed)
+            return sealed
+        except FileNotFoundError:
+            return None
+        finally:
+            if lock_fd is not None:
+                os.close(lock_fd)
 
     def list_sessions(self) -> list[str]:
         """List all available session IDs.
@@ -317,11 +1744,48 @@ class StateFile:
         Returns:
             List of session ID strings
         """
-        sessions = []
-        for file_path in self.STATE_DIR.glob("statusline.*.state"):
-            name = file_path.stem  # statusline.{session_id}
-            if name.startswith("statusline."):
-                session_id = name.removeprefix("statusline.")
-                if session_id:
-                    sessions.append(session_id)
-        return sessions
+        return list(discover_state_files(self.STATE_DIR))
+
+    @classmethod
+    def summarize_sessions(
+        cls, since: float | None = None, workers: int = 1
+    ) -> list[SessionSummary]:
+        """Summarize every session from one sweep of the state directory.
+
+        Stats the newest file of each session and tail-reads only those
+        modified at or after ``since``, without constructing a StateFile per
+        session. Call flush_all first to include write-behind spools.
+
+        Args:
+            since: Skip sessions whose newest file is older than this Unix time.
+            workers: Tail-read with this many threads (1 reads serially).
+                Threads only pay off when reads block on I/O, e.g. a cold
+                or network-mounted state directory.
+
+        Returns:
+            Summaries, most recently modified first.
+        """
+        recent: list[tuple[float, str, list[Path]]] = []
+        for session_id, paths in discover_state_files(cls.STATE_DIR).items():
+            try:
+                mtime = os.stat(paths[-1]).st_mtime
+            except OSError:
+                continue
+            if since is None or mtime >= since:
+                recent.append((mtime, session_id, paths))
+        recent.sort(key=lambda item: item[0], reverse=True)
+
+        def summarize(item: tuple[float, str, list[Path]]) -> SessionSummary:
+            mtime, session_id, paths = item
+            entry = _read_last_line_entry(paths[-1])
+            if entry is None and len(paths) > 1:
+                # Empty live file right after sealing
+                entry = _read_last_line_entry(paths[-2])
+            return SessionSummary(session_id, paths[-1], mtime, entry)
+
+        if workers > 1 and len(recent) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(workers, len(recent))) as pool:
+                return list(pool.map(summarize, recent))
+        return [summarize(item) for item in recent]
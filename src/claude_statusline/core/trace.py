@@ -0,0 +1,219 @@
+"""Opt-in self-timing for claude-statusline refreshes.
+
+With ``trace_metrics=true`` in statusline.conf (or ``CLAUDE_STATUSLINE_TRACE=1``
+in the environment) every refresh appends one JSON line with per-phase
+durations to ``~/.claude/statusline/metrics.jsonl``. The file is trimmed to
+its newest half once it grows past METRICS_MAX_BYTES. ``context-stats perf``
+summarizes it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable
+
+from claude_statusline.core.state import StateFile, open_locked, read_all
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends stay atomic via O_APPEND, trimming is unguarded
+    fcntl = None
+
+TRACE_ENV = "CLAUDE_STATUSLINE_TRACE"
+METRICS_NAME = "metrics.jsonl"
+METRICS_MAX_BYTES = 512 * 1024  # ~3,000 refreshes
+
+# Phases in pipeline order, for display
+PHASES = (
+    "parse",
+    "config",
+    "git",
+    "state_read",
+    "state_write",
+    "zone_mi",
+    "layout",
+    "total",
+)
+
+
+def env_tracing() -> bool:
+    """True if tracing is forced on through the environment."""
+    return os.environ.get(TRACE_ENV, "").lower() not in ("", "0", "false")
+
+
+def metrics_path() -> Path:
+    """Path of the rolling metrics file."""
+    return StateFile.STATE_DIR / METRICS_NAME
+
+
+class PhaseTimer:
+    """Accumulate wall-clock milliseconds per named phase.
+
+    Timing is cheap enough to run on every refresh; whether the result is
+    written is decided at the end, once the config is known.
+    """
+
+    def __init__(self) -> None:
+        """Start the clock for the ``total`` phase."""
+        self.start = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as phase ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, start)
+
+    def wrap(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Return ``fn`` timed as phase ``name`` (for work run on other threads)."""
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            with self.phase(name):
+                return fn(*args, **kwargs)
+
+        return timed
+
+    def _add(self, name: str, start: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def record(self) -> dict[str, Any]:
+        """Return the metrics record for this refresh, closing ``total``."""
+        phases = dict(self.phases)
+        phases["total"] = (time.perf_counter() - self.start) * 1000
+        return {
+            "ts": int(time.time()),
+            "phases": {name: round(ms, 3) for name, ms in phases.items()},
+        }
+
+
+def append_metrics(record: dict[str, Any]) -> None:
+    """Append one record to the metrics file, trimming it when too large.
+
+    Appends hold a shared flock, like state file appends, so they wait for
+    a trim in progress and then land in the trimmed file.
+
+    Args:
+        record: Output of PhaseTimer.record.
+    """
+    path = metrics_path()
+    data = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = open_locked(
+            path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, fcntl.LOCK_SH if fcntl else 0
+        )
+        try:
+            os.write(fd, data)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > METRICS_MAX_BYTES:
+            _trim(path)
+    except OSError as e:
+        sys.stderr.write(f"[statusline] warning: failed to write metrics {path}: {e}\n")
+
+
+def _trim(path: Path) -> None:
+    """Keep the newest half of the metrics file.
+
+    The exclusive flock is held from the read through the replace, so no
+    concurrent append can land in the old file after it was read.
+    """
+    try:
+        fd = open_locked(path, os.O_RDONLY, fcntl.LOCK_EX if fcntl else 0)
+    except FileNotFoundError:
+        return
+    try:
+        data = read_all(fd)
+        # Another refresh may have trimmed it while we waited for the lock
+        if len(data) <= METRICS_MAX_BYTES:
+            return
+        lines = data.splitlines(keepends=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_bytes(b"".join(lines[len(lines) // 2 :]))
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            raise
+    finally:
+        os.close(fd)
+
+
+def load_metrics(limit: int | None = None) -> list[dict[str, Any]]:
+    """Read metrics records, oldest first.
+
+    Args:
+        limit: Only return the newest ``limit`` records.
+
+    Returns:
+        Parsed records; malformed lines are skipped. Empty if the metrics
+        file does not exist.
+
+    Raises:
+        OSError: If the metrics file exists but cannot be read.
+    """
+    try:
+        lines = metrics_path().read_bytes().splitlines()
+    except FileNotFoundError:
+        return []
+    if limit is not None:
+        lines = lines[-limit:]
+    records = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and isinstance(record.get("phases"), dict):
+            records.append(record)
+    return records
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (which must be sorted)."""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * pct // 100))  # ceil without floats
+    return values[min(len(values), int(rank)) - 1]
+
+
+def summarize_phases(records: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    """Compute count, p50, p95, p99 and max per phase.
+
+    Args:
+        records: Metrics records from load_metrics.
+
+    Returns:
+        Mapping of phase name to its statistics, in PHASES order (unknown
+        phases last).
+    """
+    samples: dict[str, list[float]] = {}
+    for record in records:
+        for name, ms in record["phases"].items():
+            if isinstance(ms, (int, float)):
+                samples.setdefault(name, []).append(float(ms))
+    order = [p for p in PHASES if p in samples] + sorted(set(samples) - set(PHASES))
+    summary = {}
+    for name in order:
+        values = sorted(samples[name])
+        summary[name] = {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1],
+        }
+    return summary
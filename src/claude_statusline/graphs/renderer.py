@@ -9,7 +9,11 @@ from dataclasses import dataclass
 from claude_statusline.core.colors import ColorManager
 from claude_statusline.formatters.time import format_duration, format_timestamp
 from claude_statusline.formatters.tokens import format_tokens
-from claude_statusline.graphs.statistics import calculate_stats
+from claude_statusline.graphs.statistics import (
+    CACHE_TTL_SECONDS,
+    calculate_stats,
+    detect_cache_misses,
+)
 
 
 @dataclass
@@ -437,6 +441,16 @@ class GraphRenderer:
                 f"  {self.colors.cyan}{'Cache Read:':<20}{self.colors.reset} "
                 f"{format_tokens(last.cache_read, self.token_detail)}"
             )
+        misses = detect_cache_misses(entries)
+        if misses:
+            miss_tokens = sum(m.tokens for m in misses)
+            miss_cost = sum(m.extra_cost for m in misses)
+            self._emit(
+                f"  {self.colors.red}{'Cache Misses:':<20}{self.colors.reset} "
+                f"{len(misses)} after idle gaps "
+                f"({format_tokens(miss_tokens, self.token_detail)} re-cached, "
+                f"~${miss_cost:.4f} extra)"
+            )
         if graph_type in ("cache", "all"):
             # Show cache TTL countdown after cache stats
             last_cache_ts = None
@@ -448,7 +462,7 @@ class GraphRenderer:
                 import time
 
                 elapsed = int(time.time()) - last_cache_ts
-                ttl_remaining = max(0, 300 - elapsed)
+                ttl_remaining = max(0, CACHE_TTL_SECONDS - elapsed)
                 if ttl_remaining > 0:
                     ttl_text = format_duration(ttl_remaining, precise=True)
                     self._emit(
@@ -2,8 +2,22 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass
 
+# Prompt cache time-to-live: a request after a longer pause re-creates the cache
+CACHE_TTL_SECONDS = 300
+
+# A cache write smaller than this is ordinary prompt growth, not a rebuild
+# (the smallest cacheable prompt prefix is 1,024 tokens)
+CACHE_MISS_MIN_TOKENS = 1024
+
+# USD per million input / output tokens by model family; cache writes cost
+# 1.25x input and cache reads 0.1x input
+MODEL_PRICES = {"opus": (5.0, 25.0), "sonnet": (3.0, 15.0), "haiku": (1.0, 5.0)}
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
 
 @dataclass
 class Stats:
@@ -123,3 +137,148 @@ def calculate_deltas(values: list[int]) -> list[int]:
         deltas.append(max(0, delta))
 
     return deltas
+
+
+def model_price(model_id: str) -> tuple[float, float]:
+    """Return (input, output) USD per million tokens for a model ID.
+
+    Unknown models are priced as Sonnet.
+    """
+    model = model_id.lower()
+    for family, price in MODEL_PRICES.items():
+        if family in model:
+            return price
+    return MODEL_PRICES["sonnet"]
+
+
+def cache_miss_cost(tokens: int, model_id: str) -> float:
+    """Extra USD paid for re-writing ``tokens`` instead of reading them from cache."""
+    price_in = model_price(model_id)[0]
+    return tokens * price_in * (CACHE_WRITE_MULTIPLIER - CACHE_READ_MULTIPLIER) / 1_000_000
+
+
+@dataclass
+class CacheMiss:
+    """A request that likely re-created an expired prompt cache."""
+
+    index: int
+    timestamp: int
+    gap_seconds: int
+    tokens: int  # previously cached tokens written again
+    extra_cost: float
+
+
+class CacheMissDetector:
+    """Streaming cache-miss detector; feed it one row at a time, oldest first.
+
+    Row ``i`` counts as a cache miss when all of these hold:
+
+    - it comes more than ``ttl`` seconds after row ``i - 1``;
+    - it wrote at least CACHE_MISS_MIN_TOKENS to the cache, and more than it
+      read, i.e. the cached prefix was lost rather than extended;
+    - it is a new request (its cache counts differ from row ``i - 1``).
+
+    The re-cached tokens are the part of the write the previous request had
+    cached (``cache_creation + cache_read`` of row ``i - 1``); the rest is
+    new prompt that had to be written anyway.
+
+    Attributes:
+        count: Misses seen so far.
+        tokens: Re-cached tokens summed over all misses.
+    """
+
+    def __init__(self, model_id: str = "", ttl: int = CACHE_TTL_SECONDS) -> None:
+        self.model_id = model_id
+        self.ttl = ttl
+        self.count = 0
+        self.tokens = 0
+        self._index = -1
+        self._prev: tuple[int, int, int] | None = None
+
+    @classmethod
+    def resume(
+        cls,
+        prev_row: tuple[int, int, int] | None,
+        rows_seen: int,
+        count: int,
+        tokens: int,
+        model_id: str = "",
+        ttl: int = CACHE_TTL_SECONDS,
+    ) -> CacheMissDetector:
+        """Continue detection where an earlier detector left off.
+
+        Args:
+            prev_row: That detector's ``prev_row``.
+            rows_seen: Rows it was fed.
+            count: Its ``count``.
+            tokens: Its ``tokens``.
+            model_id: Model used to price misses.
+            ttl: Cache time-to-live in seconds.
+        """
+        detector = cls(model_id, ttl)
+        detector.count = count
+        detector.tokens = tokens
+        detector._index = rows_seen - 1
+        detector._prev = prev_row
+        return detector
+
+    @property
+    def prev_row(self) -> tuple[int, int, int] | None:
+        """The last row fed as (timestamp, cache_creation, cache_read), if any."""
+        return self._prev
+
+    def feed(self, timestamp: int, cache_creation: int, cache_read: int) -> CacheMiss | None:
+        """Process the next row; return a CacheMiss if it is one."""
+        self._index += 1
+        prev = self._prev
+        self._prev = (timestamp, cache_creation, cache_read)
+        if prev is None:
+            return None
+        prev_ts, prev_creation, prev_read = prev
+        gap = timestamp - prev_ts
+        if (
+            gap <= self.ttl
+            or cache_creation < CACHE_MISS_MIN_TOKENS
+            or cache_creation <= cache_read
+            or (cache_creation, cache_read) == (prev_creation, prev_read)
+        ):
+            return None
+        tokens = min(cache_creation, prev_creation + prev_read)
+        if tokens <= 0:
+            return None
+        self.count += 1
+        self.tokens += tokens
+        return CacheMiss(
+            index=self._index,
+            timestamp=timestamp,
+            gap_seconds=gap,
+            tokens=tokens,
+            extra_cost=cache_miss_cost(tokens, self.model_id),
+        )
+
+    @property
+    def extra_cost(self) -> float:
+        """Estimated extra USD over all misses, priced at ``model_id``."""
+        return cache_miss_cost(self.tokens, self.model_id)
+
+
+def detect_cache_misses(entries: Iterable, ttl: int = CACHE_TTL_SECONDS) -> list[CacheMiss]:
+    """Find likely prompt-cache expiries in a session's history.
+
+    Args:
+        entries: StateEntry objects (or anything with ``timestamp``,
+            ``cache_creation``, ``cache_read`` and ``model_id``), oldest first.
+            Iterated once.
+        ttl: Cache time-to-live in seconds (default: 300).
+
+    Returns:
+        One CacheMiss per detected expiry, priced at each entry's model.
+    """
+    detector = CacheMissDetector(ttl=ttl)
+    misses = []
+    for entry in entries:
+        detector.model_id = entry.model_id
+        miss = detector.feed(entry.timestamp, entry.cache_creation, entry.cache_read)
+        if miss is not None:
+            misses.append(miss)
+    return misses
@@ -0,0 +1,162 @@
+"""Tests for compressed archival of idle state files."""
+
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from claude_statusline.analytics import load_all_projects
+from claude_statusline.cli.archive import run_archive
+from claude_statusline.core.colors import ColorManager
+from claude_statusline.core.index import StateIndex
+from claude_statusline.core.state import (
+    MappedStateFile,
+    StateEntry,
+    StateFile,
+    discover_state_files,
+    parse_state_filename,
+    read_first_entry,
+)
+
+DAY = 86400
+
+
+def _entry(n: int, session_id: str = "sess-a") -> StateEntry:
+    return StateEntry(
+        timestamp=1710288000 + n,
+        total_input_tokens=1000 * n,
+        total_output_tokens=100 * n,
+        current_input_tokens=50 * n,
+        current_output_tokens=10,
+        cache_creation=0,
+        cache_read=0,
+        cost_usd=0.01 * n,
+        lines_added=n,
+        lines_removed=0,
+        session_id=session_id,
+        model_id="claude-opus-4-6",
+        workspace_project_dir="/home/user/alpha",
+        context_window_size=200000,
+    )
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
+    monkeypatch.setattr(StateFile, "SPOOL_DIR", tmp_path / "spool")
+    return tmp_path
+
+
+def _age(paths, days: float) -> None:
+    past = time.time() - days * DAY
+    for path in paths:
+        os.utime(path, (past, past))
+
+
+def _write_session(session_id: str, count: int, segments: int = 0) -> StateFile:
+    sf = StateFile(session_id)
+    for n in range(1, count + 1):
+        sf.append_entry(_entry(n, session_id))
+        if segments and n % (count // segments) == 0 and n < count:
+            sf._seal_idle_live_file(time.time() + 1)
+    return sf
+
+
+class TestArchive:
+    def test_idle_session_is_compressed_and_still_readable(self, state_dir):
+        sf = _write_session("sess-a", 30, segments=3)
+        before = sf.read_history()
+        paths = discover_state_files(state_dir)["sess-a"]
+        _age(paths, 10)
+
+        archived = sf.archive(time.time() - 7 * DAY)
+
+        assert len(archived) == len(paths)
+        assert all(a.target.name.endswith(".state.gz") for a in archived)
+        assert all(a.archived_size < a.original_size for a in archived)
+        assert not sf.file_path.exists()
+        assert sf.read_history() == before
+        assert sf.read_history(since=1710288025) == before[24:]
+        assert sf.read_last_entry() == before[-1]
+        # mtime survives, so --since-days and idle checks see the same age
+        assert all(a.target.stat().st_mtime < time.time() - 9 * DAY for a in archived)
+
+    def test_xz_format(self, state_dir):
+        pytest.importorskip("lzma")
+        sf = _write_session("sess-a", 5)
+        _age([sf.file_path], 10)
+        (archived,) = sf.archive(time.time() - DAY, fmt="xz")
+        assert archived.target.name == "statusline.sess-a.1.state.xz"
+        assert read_first_entry(archived.target) == _entry(1)
+        with MappedStateFile(archived.target) as m:
+            assert m.last_entry() == _entry(5)
+
+    def test_recent_files_untouched(self, state_dir):
+        sf = _write_session("sess-a", 5)
+        assert sf.archive(time.time() - 7 * DAY) == []
+        assert sf.file_path.exists()
+
+    def test_resumed_session_keeps_history_order(self, state_dir):
+        sf = _write_session("sess-a", 5)
+        _age([sf.file_path], 10)
+        sf.archive(time.time() - DAY)
+
+        sf.append_entry(_entry(6))
+        assert [e.lines_added for e in sf.read_history()] == [1, 2, 3, 4, 5, 6]
+        assert parse_state_filename("statusline.sess-a.1.state.gz") == ("sess-a", 1)
+        assert parse_state_filename("statusline.sess-a.state.gz") is None
+
+    def test_report_and_index_read_archives(self, state_dir):
+        _write_session("sess-a", 20, segments=2)
+        _write_session("sess-b", 4)
+        expected = load_all_projects(use_index=False)
+        with StateIndex() as index:
+            index.rebuild()
+            _age(discover_state_files(state_dir)["sess-a"], 10)
+            StateFile("sess-a").archive(time.time() - DAY)
+            index.update()
+            rows = {r["session_id"]: r["entry_count"] for r in index.sessions()}
+        assert rows == {"sess-a": 20, "sess-b": 4}
+        assert load_all_projects(use_index=False)[0].sessions[0].entry_count == (
+            expected[0].sessions[0].entry_count
+        )
+
+
+class TestArchiveCommand:
+    def test_archives_idle_sessions(self, state_dir, capsys):
+        sf = _write_session("sess-a", 10)
+        _write_session("sess-b", 10)
+        _age([sf.file_path], 30)
+
+        run_archive(None, ["--days", "7"], ColorManager(enabled=False))
+
+        out = capsys.readouterr().out
+        assert "Archived 1 file(s) from 1 session(s)" in out
+        assert sorted(p.name for p in state_dir.glob("statusline.*")) == [
+            "statusline.sess-a.1.state.gz",
+            "statusline.sess-b.state",
+        ]
+
+    def test_dry_run_changes_nothing(self, state_dir, capsys):
+        sf = _write_session("sess-a", 10)
+        _age([sf.file_path], 30)
+
+        run_archive(None, ["--dry-run"], ColorManager(enabled=False))
+
+        out = capsys.readouterr().out
+        assert "statusline.sess-a.state" in out
+        assert "Would archive 1 file(s)" in out
+        assert sf.file_path.exists()
+
+    def test_nothing_to_do(self, state_dir, capsys):
+        _write_session("sess-a", 3)
+        run_archive("sess-a", [], ColorManager(enabled=False))
+        assert "No state files idle" in capsys.readouterr().out
+
+    def test_negative_days_rejected(self, state_dir):
+        with pytest.raises(SystemExit) as exc:
+            run_archive(None, ["--days", "-1"], ColorManager(enabled=False))
+        assert exc.value.code == 1
@@ -0,0 +1,239 @@
+"""Tests for cache-miss detection and its report/export/summary output."""
+
+from __future__ import annotations
+
+import pytest
+
+from claude_statusline.analytics import ProjectStats, SessionStats, load_all_projects
+from claude_statusline.cli.dev import HistorySpec, generate_session, write_history
+from claude_statusline.cli.export import _generate_markdown
+from claude_statusline.cli.report import generate_report
+from claude_statusline.core.colors import ColorManager
+from claude_statusline.core.config import Config
+from claude_statusline.core.index import StateIndex
+from claude_statusline.core.state import StateEntry, StateFile
+from claude_statusline.graphs.renderer import GraphDimensions, GraphRenderer
+from claude_statusline.graphs.statistics import (
+    CacheMissDetector,
+    cache_miss_cost,
+    detect_cache_misses,
+    model_price,
+)
+
+
+def _entry(ts: int, creation: int, read: int, model_id: str = "claude-sonnet-4-6") -> StateEntry:
+    return StateEntry(
+        timestamp=ts,
+        total_input_tokens=ts,
+        total_output_tokens=0,
+        current_input_tokens=100,
+        current_output_tokens=500,
+        cache_creation=creation,
+        cache_read=read,
+        cost_usd=0.0,
+        lines_added=0,
+        lines_removed=0,
+        session_id="miss",
+        model_id=model_id,
+        workspace_project_dir="/home/user/proj",
+        context_window_size=200_000,
+    )
+
+
+# Active for a few requests, idle 10 minutes, then the whole prompt is re-cached
+SESSION = [
+    _entry(1000, 20_000, 0),
+    _entry(1030, 2_000, 20_000),
+    _entry(1060, 3_000, 22_000),
+    _entry(1660, 26_000, 0),
+    _entry(1690, 1_500, 26_000),
+]
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
+    monkeypatch.setattr(StateFile, "SPOOL_DIR", tmp_path / "spool")
+    return tmp_path
+
+
+class TestDetectCacheMisses:
+    def test_idle_gap_with_rebuild(self):
+        misses = detect_cache_misses(SESSION)
+        assert len(misses) == 1
+        miss = misses[0]
+        assert (miss.index, miss.timestamp, miss.gap_seconds) == (3, 1660, 600)
+        # Only what the previous request had cached counts as re-cached
+        assert miss.tokens == 25_000
+        assert miss.extra_cost == pytest.approx(25_000 * 3.0 * 1.15 / 1_000_000)
+
+    def test_short_gap_is_not_a_miss(self):
+        entries = [_entry(1000, 20_000, 0), _entry(1200, 25_000, 0)]
+        assert detect_cache_misses(entries) == []
+
+    def test_gap_with_cache_read_is_not_a_miss(self):
+        # The cache survived the pause (e.g. kept warm): mostly reads
+        entries = [_entry(1000, 20_000, 0), _entry(2000, 2_000, 20_000)]
+        assert detect_cache_misses(entries) == []
+
+    def test_small_write_is_not_a_miss(self):
+        entries = [_entry(1000, 800, 0), _entry(2000, 900, 0)]
+        assert detect_cache_misses(entries) == []
+
+    def test_repeated_row_is_not_a_new_request(self):
+        entries = [_entry(1000, 20_000, 0), _entry(2000, 20_000, 0)]
+        assert detect_cache_misses(entries) == []
+
+    def test_custom_ttl(self):
+        assert len(detect_cache_misses(SESSION, ttl=3600)) == 0
+
+    def test_priced_per_model(self):
+        opus = [
+            _entry(e.timestamp, e.cache_creation, e.cache_read, "claude-opus-4-6") for e in SESSION
+        ]
+        assert detect_cache_misses(opus)[0].extra_cost == pytest.approx(
+            cache_miss_cost(25_000, "claude-opus-4-6")
+        )
+        assert model_price("claude-opus-4-6") == (5.0, 25.0)
+        assert model_price("unknown") == model_price("claude-sonnet-4-5")
+
+    def test_streaming_detector_totals(self):
+        detector = CacheMissDetector("claude-haiku-4-5")
+        for e in SESSION:
+            detector.feed(e.timestamp, e.cache_creation, e.cache_read)
+        assert (detector.count, detector.tokens) == (1, 25_000)
+        assert detector.extra_cost == pytest.approx(cache_miss_cost(25_000, "claude-haiku-4-5"))
+
+    def test_resumed_detector_matches_one_pass(self):
+        for split in range(len(SESSION) + 1):
+            first = CacheMissDetector()
+            for e in SESSION[:split]:
+                first.feed(e.timestamp, e.cache_creation, e.cache_read)
+            rest = CacheMissDetector.resume(first.prev_row, split, first.count, first.tokens)
+            found = [
+                rest.feed(e.timestamp, e.cache_creation, e.cache_read) for e in SESSION[split:]
+            ]
+            assert (rest.count, rest.tokens) == (1, 25_000)
+            assert [m.index for m in found if m] == ([3] if split <= 3 else [])
+
+    def test_synthetic_idle_gaps_are_found(self):
+        spec = HistorySpec(
+            sessions=1, lines=400, compactions=3, idle_ratio=0.05, seed=7, end=2_000_000_000
+        )
+        entries = list(generate_session(spec, 0))
+        idle = [
+            i
+            for i in range(1, len(entries))
+            if entries[i].timestamp - entries[i - 1].timestamp > 300
+        ]
+        assert idle
+        assert [m.index for m in detect_cache_misses(entries)] == idle
+
+
+class TestSurfacing:
+    def test_render_summary(self):
+        renderer = GraphRenderer(
+            colors=ColorManager(enabled=False),
+            dimensions=GraphDimensions(
+                term_width=120, term_height=40, graph_width=105, graph_height=13
+            ),
+        )
+        renderer.begin_buffering()
+        renderer.render_summary(SESSION, deltas=[])
+        out = renderer.get_buffer()
+        assert "Cache Misses:" in out
+        assert "1 after idle gaps" in out
+
+    def test_render_summary_without_misses(self):
+        renderer = GraphRenderer(
+            colors=ColorManager(enabled=False),
+            dimensions=GraphDimensions(
+                term_width=120, term_height=40, graph_width=105, graph_height=13
+            ),
+        )
+        renderer.begin_buffering()
+        renderer.render_summary(SESSION[:3], deltas=[])
+        assert "Cache Misses" not in renderer.get_buffer()
+
+    def test_export(self):
+        md = _generate_markdown(SESSION, "miss", Config())
+        assert "- **Cache misses:** 1 idle gaps" in md
+        assert "## Cache Misses" in md
+        assert "| 4 | " in md.split("## Cache Misses")[1]
+        assert "## Cache Misses" not in _generate_markdown(SESSION[:3], "miss", Config())
+
+    def test_report(self):
+        session = SessionStats(
+            session_id="abcdef1234",
+            project_dir="/home/user/proj",
+            model_id="claude-sonnet-4-6",
+            total_input_tokens=500_000,
+            cost_usd=4.0,
+            start_time=1000,
+            end_time=5000,
+            entry_count=50,
+            cache_misses=3,
+            cache_miss_tokens=200_000,
+        )
+        project = ProjectStats(
+            project_dir="/home/user/proj", cost_usd=4.0, session_count=1, sessions=[session]
+        )
+        report = generate_report([project])
+        assert "**Cache Misses**: 3 prompt-cache expiries" in report
+        assert "~$0.69 extra (17.2% of real cost)" in report
+        assert "abcdef12... (proj): 3 misses" in report
+
+
+class TestAnalytics:
+    def test_file_and_index_agree(self, state_dir):
+        write_history(HistorySpec(sessions=4, lines=200, seed=5, end=2_000_000_000), state_dir)
+        from_files = {
+            s.session_id: (s.cache_misses, s.cache_miss_tokens)
+            for p in load_all_projects(use_index=False)
+            for s in p.sessions
+        }
+        with StateIndex() as index:
+            index.rebuild()
+        from_index = {
+            s.session_id: (s.cache_misses, s.cache_miss_tokens)
+            for p in load_all_projects(use_index=True)
+            for s in p.sessions
+        }
+        assert from_files == from_index
+        assert sum(count for count, _ in from_files.values()) > 0
+
+        expected = detect_cache_misses(StateFile("synthetic-5-000000").read_history())
+        assert from_files["synthetic-5-000000"] == (len(expected), sum(m.tokens for m in expected))
+
+    def test_index_update_feeds_only_appended_rows(self, state_dir, monkeypatch):
+        sf = StateFile("miss")
+        for e in SESSION[:3]:
+            sf.append_entry(e)
+        with StateIndex() as index:
+            index.rebuild()
+            fed = []
+            feed = CacheMissDetector.feed
+            monkeypatch.setattr(
+                CacheMissDetector, "feed", lambda self, *row: fed.append(row) or feed(self, *row)
+            )
+            for e in SESSION[3:]:
+                sf.append_entry(e)
+            index.update()
+            (row,) = index.sessions()
+        assert fed == [(e.timestamp, e.cache_creation, e.cache_read) for e in SESSION[3:]]
+        assert (row["cache_misses"], row["cache_miss_tokens"]) == (1, 25_000)
+
+    def test_index_update_with_older_rows_redetects(self, state_dir):
+        sf = StateFile("miss")
+        for e in SESSION[:2] + SESSION[3:]:
+            sf.append_entry(e)
+        with StateIndex() as index:
+            index.rebuild()
+            (row,) = index.sessions()
+            assert (row["cache_misses"], row["cache_miss_tokens"]) == (1, 22_000)
+            # A sealed segment holding an earlier row turns up later
+            (state_dir / "statusline.miss.1.state").write_text(f"{SESSION[2].to_csv_line()}\n")
+            index.update()
+            (row,) = index.sessions()
+        assert (row["cache_misses"], row["cache_miss_tokens"]) == (1, 25_000)
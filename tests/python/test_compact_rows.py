@@ -0,0 +1,185 @@
+"""Tests for compact (delta-encoded) state rows."""
+
+from __future__ import annotations
+
+import dataclasses
+import sys
+
+import pytest
+
+from claude_statusline.core.config import Config
+from claude_statusline.core.index import StateIndex
+from claude_statusline.core.state import (
+    DELTA_PREFIX,
+    MappedStateFile,
+    SpoolPolicy,
+    StateEntry,
+    StateFile,
+    seek_timestamp,
+)
+
+
+def _entry(n: int, session_id: str = "sess-a", model: str = "claude-opus-4-6") -> StateEntry:
+    return StateEntry(
+        timestamp=1710288000 + 5 * n,
+        total_input_tokens=1000 * n,
+        total_output_tokens=100 * n,
+        current_input_tokens=50 * n,
+        current_output_tokens=10 + n % 3,
+        cache_creation=0 if n % 2 else 300,
+        cache_read=2000 * n,
+        cost_usd=round(0.0137 * n, 4),
+        lines_added=n,
+        lines_removed=n // 4,
+        session_id=session_id,
+        model_id=model,
+        workspace_project_dir="/home/user/alpha",
+        context_window_size=200000,
+    )
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
+    monkeypatch.setattr(StateFile, "SPOOL_DIR", tmp_path / "spool")
+    return tmp_path
+
+
+def _write(entries, **kwargs) -> StateFile:
+    sf = StateFile("sess-a", compact=True, **kwargs)
+    for entry in entries:
+        sf.append_entry(entry)
+    return sf
+
+
+def _lines(sf: StateFile) -> list[str]:
+    return sf.file_path.read_text().splitlines()
+
+
+class TestCompactRows:
+    def test_round_trip(self, state_dir):
+        entries = [_entry(n) for n in range(1, 41)]
+        sf = _write(entries)
+
+        lines = _lines(sf)
+        assert lines[0] == entries[0].to_csv_line()
+        assert all(line.startswith(DELTA_PREFIX) for line in lines[1:])
+        assert sf.read_history() == entries
+        assert sf.read_last_entry() == entries[-1]
+        assert sf.read_history(since=entries[30].timestamp) == entries[30:]
+        with MappedStateFile(sf.file_path) as m:
+            assert m.last_entry() == entries[-1]
+            assert list(m.rows(("timestamp", "cost_usd"))) == [
+                (e.timestamp, e.cost_usd) for e in entries
+            ]
+
+    def test_seek_matches_linear_filter(self, state_dir, monkeypatch):
+        monkeypatch.setattr(StateFile, "COMPACT_BLOCK_ROWS", 7)
+        entries = [_entry(n) for n in range(1, 51)]
+        sf = _write(entries)
+        for since in range(entries[0].timestamp - 3, entries[-1].timestamp + 4):
+            expected = [e for e in entries if e.timestamp >= since]
+            assert sf.read_history(since=since) == expected
+
+    def test_seek_backs_up_to_block_full_row(self, state_dir, monkeypatch):
+        monkeypatch.setattr(StateFile, "COMPACT_BLOCK_ROWS", 5)
+        entries = [_entry(n) for n in range(1, 18)]
+        sf = _write(entries)
+        data = sf.file_path.read_bytes()
+        starts = [0] + [i + 1 for i, b in enumerate(data[:-1]) if b == ord("\n")]
+        with open(sf.file_path, "rb") as f:
+            # Rows 6..11 form the second block; row 8 is a delta row inside it
+            assert seek_timestamp(f, entries[8].timestamp) == starts[6]
+            assert f.tell() == starts[6]
+            # A full row match still backs up: the block before may tie it
+            assert seek_timestamp(f, entries[6].timestamp) == 0
+            assert seek_timestamp(f, entries[0].timestamp) == 0
+            assert seek_timestamp(f, entries[-1].timestamp + 1) == starts[12]
+        with MappedStateFile(sf.file_path) as m:
+            assert m.seek_timestamp(entries[8].timestamp) == starts[6]
+
+    def test_smaller_than_plain_rows(self, state_dir):
+        entries = [_entry(n) for n in range(1, 201)]
+        sf = _write(entries)
+        plain = sum(len(e.to_csv_line()) + 1 for e in entries)
+        assert sf.file_path.stat().st_size * 2 < plain
+
+    def test_new_block_on_string_change_and_block_size(self, state_dir, monkeypatch):
+        monkeypatch.setattr(StateFile, "COMPACT_BLOCK_ROWS", 3)
+        entries = [_entry(n) for n in range(1, 6)]
+        entries.append(_entry(6, model="claude-sonnet-4-6"))
+        entries.append(_entry(7, model="claude-sonnet-4-6"))
+        sf = _write(entries)
+
+        full = [i for i, line in enumerate(_lines(sf)) if not line.startswith(DELTA_PREFIX)]
+        assert full == [0, 4, 5]
+        assert sf.read_history() == entries
+
+    def test_mixed_with_plain_rows(self, state_dir):
+        plain = StateFile("sess-a")
+        plain.append_entry(_entry(1))
+        plain.append_entry(_entry(2))
+        sf = _write([_entry(3), _entry(4)])
+        plain.append_entry(_entry(5))
+        assert sf.read_history() == [_entry(n) for n in range(1, 6)]
+        assert sf.read_last_entry() == _entry(5)
+
+    def test_malformed_delta_row_is_skipped(self, state_dir):
+        sf = _write([_entry(1), _entry(2)])
+        with open(sf.file_path, "a") as f:
+            f.write("~1,2,3\n")
+        assert sf.read_history() == [_entry(1), _entry(2)]
+        assert sf.read_last_entry() == _entry(2)
+
+    def test_legacy_parser_ignores_delta_rows(self):
+        assert StateEntry.from_csv_line("~5,1000,100,50,1,,2000,0.0137,1,") is None
+
+    def test_sessionless_file_stays_plain(self, state_dir):
+        sf = StateFile(compact=True)
+        sf.append_entry(_entry(1))
+        sf.append_entry(_entry(2))
+        assert not sf.compact
+        assert _lines(sf) == [_entry(1).to_csv_line(), _entry(2).to_csv_line()]
+
+    def test_index_ingests_mid_block(self, state_dir):
+        entries = [_entry(n) for n in range(1, 21)]
+        sf = _write(entries[:10])
+        with StateIndex() as index:
+            index.rebuild()
+            for entry in entries[10:]:
+                sf.append_entry(entry)
+            index.update()
+            (row,) = index.sessions()
+        assert row["entry_count"] == 20
+        assert row["end_time"] == entries[-1].timestamp
+        assert row["cost_usd"] == entries[-1].cost_usd
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="write-behind needs flock")
+    def test_spool_drain_is_compacted(self, state_dir, monkeypatch):
+        monkeypatch.setattr(StateFile, "_start_flush_timer", lambda self: None)
+        entries = [_entry(n) for n in range(1, 7)]
+        sf = _write(entries, spool=SpoolPolicy(max_entries=3, max_age=3600))
+        assert [line[:1] == DELTA_PREFIX for line in _lines(sf)] == [False] + [True] * 5
+        assert sf.read_history() == entries
+
+    def test_delta_round_trip_of_unchanged_entry(self):
+        base = _entry(3)
+        same = dataclasses.replace(base)
+        line = same.to_delta_line(base)
+        assert line == DELTA_PREFIX + "," * 9
+        assert StateEntry.from_delta_line(line, base) == base
+
+
+class TestCompactConfig:
+    def test_default_off(self, tmp_path):
+        config_file = tmp_path / "statusline.conf"
+        config_file.write_text("show_delta=true\n")
+        assert Config.load(config_path=config_file).state_compact_rows is False
+
+    def test_enabled(self, tmp_path):
+        config_file = tmp_path / "statusline.conf"
+        config_file.write_text("state_compact_rows=true\n")
+        config = Config.load(config_path=config_file)
+        assert config.state_compact_rows is True
+        assert config.to_dict()["state_compact_rows"] is True
@@ -3,7 +3,13 @@
 import pytest
 
 from claude_statusline.core.colors import ColorManager
-from claude_statusline.core.state import StateEntry
+from claude_statusline.core.state import (
+    MappedStateFile,
+    StateEntry,
+    StateFile,
+    read_first_entry,
+    seek_timestamp,
+)
 from claude_statusline.graphs.renderer import GraphDimensions, GraphRenderer
 from claude_statusline.graphs.statistics import (
     Stats,
@@ -190,6 +196,175 @@ class TestStateEntryRoundTrip:
         assert "\n" not in csv_line
 
 
+class TestParseMany:
+    """parse_many must agree with from_csv_line line by line."""
+
+    LINES = [
+        _make_entry().to_csv_line(),
+        "1710288000,50000",
+        "",
+        "   ",
+        "garbage",
+        "notatime,1,2,3,4,5,6,0.1,1,1,s,m,/p,200000",
+        "1710288001,1,2,3,4,5,6,bad,1,1,s,m,/p,200000",
+        "1710288002,1,2,3,4,5,6,0.5,1,1,s,m",
+        "  1710288003,1,2,3,4,5,6,0.5,1,1,s,m,/p,200000  ",
+        "1710288004,1,2,3,4,5,6,0.5,1,1,s,m,/p,200000,extra",
+        _make_entry(timestamp=1710288005, session_id="last").to_csv_line(),
+    ]
+
+    def _expected(self, lines):
+        return [e for e in map(StateEntry.from_csv_line, lines) if e is not None]
+
+    def test_matches_per_line_parsing(self):
+        data = "\n".join(self.LINES) + "\n"
+        assert StateEntry.parse_many(data) == self._expected(self.LINES)
+
+    def test_accepts_bytes_and_crlf(self):
+        data = ("\r\n".join(self.LINES) + "\r\n").encode()
+        assert StateEntry.parse_many(data) == self._expected(self.LINES)
+
+    def test_invalid_utf8_does_not_raise(self):
+        data = b"1710288000,1,2,3,4,5,6,0.5,1,1,s\xff,m,/p,200000\n"
+        (entry,) = StateEntry.parse_many(data)
+        assert entry.timestamp == 1710288000
+        assert entry.context_window_size == 200000
+
+    def test_empty_input(self):
+        assert StateEntry.parse_many(b"") == []
+
+    def test_entries_are_slotted(self):
+        entry = StateEntry.parse_many(_make_entry().to_csv_line())[0]
+        assert not hasattr(entry, "__dict__")
+        with pytest.raises(AttributeError):
+            entry.extra = 1
+
+    def test_repeated_strings_are_shared(self):
+        lines = [_make_entry(timestamp=1710288000 + i).to_csv_line() for i in range(3)]
+        lines.append("1710288009,1,2,3,4,5,6,0.5,1,1," + ",".join(lines[0].split(",")[10:13]))
+        entries = StateEntry.parse_many("\n".join(lines).encode())
+        assert len(entries) == 4
+        for attr in ("session_id", "model_id", "workspace_project_dir"):
+            assert len({id(getattr(e, attr)) for e in entries}) == 1
+
+
+class TestMappedStateFile:
+    """Tests for the mmap reader used by history, analytics and rotation."""
+
+    LINES = TestParseMany.LINES
+
+    def _path(self, tmp_path, lines, eol="\n"):
+        path = tmp_path / "statusline.s.state"
+        path.write_bytes((eol.join(lines) + eol).encode())
+        return path
+
+    def test_rows_match_from_csv_line(self, tmp_path):
+        path = self._path(tmp_path, self.LINES)
+        fields = ("timestamp", "total_input_tokens", "cost_usd", "model_id", "context_window_size")
+        expected = [
+            tuple(getattr(e, f) for f in fields)
+            for e in map(StateEntry.from_csv_line, self.LINES)
+            if e is not None
+        ]
+        with MappedStateFile(path) as m:
+            assert list(m.rows(fields)) == expected
+            assert len(list(m.rows(("timestamp",)))) == len(expected)
+
+    def test_rows_legacy_line_defaults(self, tmp_path):
+        path = self._path(tmp_path, ["1710288000,50000", "1710288001,bad"])
+        with MappedStateFile(path) as m:
+            assert list(m.rows(("timestamp", "total_input_tokens", "session_id"))) == [
+                (1710288000, 50000, "")
+            ]
+
+    def test_lines_forward_and_reversed(self, tmp_path):
+        path = self._path(tmp_path, ["a,1", "", "b,2"], eol="\r\n")
+        with MappedStateFile(path) as m:
+            assert [bytes(v) for v in m.lines()] == [b"a,1", b"", b"b,2"]
+            assert [bytes(v) for v in m.reversed_lines()] == [b"b,2", b"", b"a,1"]
+            assert bytes(m.last_line()) == b"b,2"
+
+    def test_first_and_last_entry_skip_invalid(self, tmp_path):
+        path = self._path(tmp_path, ["junk", *self.LINES, "junk"])
+        with MappedStateFile(path) as m:
+            assert m.first_entry() == StateEntry.from_csv_line(self.LINES[0])
+            assert m.last_entry().session_id == "last"
+
+    def test_tail_offset(self, tmp_path):
+        path = self._path(tmp_path, ["1,1", "2,2", "3,3"])
+        with MappedStateFile(path) as m:
+            assert m.tail_offset(3) == 0
+            assert bytes(m.buffer(m.tail_offset(2))) == b"2,2\n3,3\n"
+            assert bytes(m.buffer(m.tail_offset(1))) == b"3,3\n"
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.state"
+        path.write_bytes(b"")
+        with MappedStateFile(path) as m:
+            assert m.size == 0
+            assert list(m.lines()) == []
+            assert list(m.rows(("timestamp",))) == []
+            assert m.last_line() is None
+            assert m.tail_offset(5) == 0
+            assert m.seek_timestamp(0) == 0
+
+    def test_history_and_last_entry_use_mapping(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+        monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
+        self._path(tmp_path, self.LINES)
+        sf = StateFile("s")
+        assert sf.read_history() == StateEntry.parse_many("\n".join(self.LINES))
+        assert sf.read_last_entry().session_id == "last"
+
+
+class TestSeekTimestamp:
+    """Tests for the binary search used by time-windowed history reads."""
+
+    @staticmethod
+    def _write(path, timestamps):
+        path.write_text(
+            "".join(_make_entry(timestamp=ts).to_csv_line() + "\n" for ts in timestamps)
+        )
+
+    @pytest.mark.parametrize("since", [0, 99, 100, 101, 150, 500, 990, 999, 1000, 5000])
+    def test_matches_linear_scan(self, tmp_path, since):
+        path = tmp_path / "statusline.s.state"
+        timestamps = list(range(100, 1000, 10))
+        self._write(path, timestamps)
+        with open(path, "rb") as f:
+            seek_timestamp(f, since)
+            rest = [int(line.split(b",")[0]) for line in f.read().splitlines()]
+        assert rest == [ts for ts in timestamps if ts >= since]
+
+    def test_duplicate_timestamps_returns_first(self, tmp_path):
+        path = tmp_path / "statusline.s.state"
+        self._write(path, [1, 2, 2, 2, 3])
+        with open(path, "rb") as f:
+            offset = seek_timestamp(f, 2)
+        assert offset == len(_make_entry(timestamp=1).to_csv_line()) + 1
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "statusline.s.state"
+        path.write_text("")
+        with open(path, "rb") as f:
+            assert seek_timestamp(f, 10) == 0
+
+    def test_read_history_since(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+        monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
+        sf = StateFile("s")
+        self._write(sf.file_path, [100, 200, 300, 400])
+        assert [e.timestamp for e in sf.read_history(since=250)] == [300, 400]
+        assert [e.timestamp for e in sf.read_history(since=None)] == [100, 200, 300, 400]
+
+    def test_read_first_entry(self, tmp_path):
+        path = tmp_path / "statusline.s.state"
+        path.write_text("\ngarbage\n" + _make_entry(timestamp=42).to_csv_line() + "\n")
+        entry = read_first_entry(path)
+        assert entry is not None and entry.timestamp == 42
+        assert read_first_entry(tmp_path / "missing.state") is None
+
+
 # ---------------------------------------------------------------------------
 # Class 2: StateEntry Properties
 # ---------------------------------------------------------------------------
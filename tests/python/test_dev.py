@@ -0,0 +1,112 @@
+"""Tests for the dev gen-history synthetic state generator."""
+
+from __future__ import annotations
+
+import pytest
+
+from claude_statusline.analytics import load_all_projects
+from claude_statusline.cli.context_stats import _normalize_argv
+from claude_statusline.cli.dev import HistorySpec, generate_session, run_dev, write_history
+from claude_statusline.core.colors import ColorManager
+from claude_statusline.core.state import StateFile
+from claude_statusline.graphs.statistics import detect_compaction_events
+
+END = 1_760_000_000
+
+
+class TestGenerateSession:
+    def test_shape(self):
+        spec = HistorySpec(lines=500, compactions=3, end=END, idle_ratio=0.1)
+        entries = list(generate_session(spec, 0))
+
+        assert len(entries) == 500
+        timestamps = [e.timestamp for e in entries]
+        assert timestamps == sorted(timestamps)
+        assert timestamps[-1] <= END
+        assert len({e.session_id for e in entries}) == 1
+        assert all(e.current_used_tokens <= e.context_window_size for e in entries)
+        assert len(detect_compaction_events([e.current_used_tokens for e in entries])) >= 3
+        # Idle gaps past the TTL re-create the whole cache
+        gaps = [(b.timestamp - a.timestamp, b) for a, b in zip(entries, entries[1:])]
+        assert any(gap > 300 and e.cache_read == 0 for gap, e in gaps)
+        costs = [e.cost_usd for e in entries]
+        assert costs == sorted(costs)
+
+    def test_reproducible(self):
+        spec = HistorySpec(lines=50, end=END, seed=7)
+        assert list(generate_session(spec, 3)) == list(generate_session(spec, 3))
+        assert list(generate_session(spec, 3)) != list(generate_session(spec, 4))
+
+    def test_model_mix_and_projects(self):
+        spec = HistorySpec(lines=2, projects=3, models={"a-opus": 1, "b-haiku": 1}, end=END)
+        firsts = [next(generate_session(spec, i)) for i in range(60)]
+        assert {e.model_id for e in firsts} == {"a-opus", "b-haiku"}
+        assert len({e.workspace_project_dir for e in firsts}) == 3
+
+
+class TestWriteHistory:
+    def test_readable_by_analytics(self, tmp_path, monkeypatch):
+        state_dir = tmp_path / ".claude" / "statusline"
+        monkeypatch.setattr(StateFile, "STATE_DIR", state_dir)
+        monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / ".claude")
+
+        spec = HistorySpec(sessions=12, lines=40, projects=4, end=END)
+        rows, size = write_history(spec, state_dir)
+
+        assert rows == 480
+        assert size == sum(p.stat().st_size for p in state_dir.iterdir())
+        projects = load_all_projects(use_index=False)
+        assert sum(len(p.sessions) for p in projects) == 12
+        history = StateFile("synthetic-0-000005").read_history()
+        assert len(history) == 40
+        path = state_dir / "statusline.synthetic-0-000005.state"
+        assert int(path.stat().st_mtime) == history[-1].timestamp
+
+
+class TestDevCommand:
+    def test_gen_history(self, tmp_path, capsys):
+        run_dev(
+            ["gen-history", "--output", str(tmp_path), "--sessions", "3", "--lines", "5"],
+            ColorManager(enabled=False),
+        )
+        assert "Wrote 3 session(s), 15 rows" in capsys.readouterr().out
+        assert len(list((tmp_path / ".claude" / "statusline").glob("*.state"))) == 3
+
+    def test_refuses_existing_state(self, tmp_path, capsys):
+        state_dir = tmp_path / ".claude" / "statusline"
+        state_dir.mkdir(parents=True)
+        (state_dir / "statusline.real.state").write_text("1,2\n")
+        with pytest.raises(SystemExit) as exc:
+            run_dev(["gen-history", "--output", str(tmp_path)], ColorManager(enabled=False))
+        assert exc.value.code == 1
+        assert "already contains state files" in capsys.readouterr().err
+
+    @pytest.mark.parametrize(
+        "flags", [["--sessions", "0"], ["--idle-ratio", "2"], ["--models", "x:-1"]]
+    )
+    def test_invalid_flags(self, tmp_path, flags):
+        with pytest.raises(SystemExit) as exc:
+            run_dev(["gen-history", "--output", str(tmp_path), *flags], ColorManager(enabled=False))
+        assert exc.value.code != 0
+
+    def test_unknown_subcommand(self, capsys):
+        with pytest.raises(SystemExit):
+            run_dev(["nope"], ColorManager(enabled=False))
+        assert "invalid choice: 'nope'" in capsys.readouterr().err
+
+    def test_global_flag_before_subcommand(self, tmp_path, capsys):
+        run_dev(
+            ["--no-color", "gen-history", "--output", str(tmp_path), "--lines", "5"],
+            ColorManager(enabled=False),
+        )
+        assert "rows" in capsys.readouterr().out
+
+    def test_subcommand_options_follow_subcommand(self, tmp_path, capsys):
+        with pytest.raises(SystemExit):
+            run_dev(["--output", str(tmp_path), "gen-history"], ColorManager(enabled=False))
+        err = capsys.readouterr().err
+        assert "usage: context-stats dev" in err
+        assert "Unknown dev subcommand" not in err
+
+    def test_action_registered(self):
+        assert _normalize_argv(["dev", "gen-history"])[:2] == ("dev", None)
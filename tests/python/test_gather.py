@@ -0,0 +1,237 @@
+"""Tests for concurrent segment gathering in the statusline."""
+
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from claude_statusline.cli import statusline
+from claude_statusline.core.config import Config
+from claude_statusline.core.gather import (
+    SegmentGatherer,
+    load_render_cache,
+    record_timeouts,
+    save_render_cache,
+)
+from claude_statusline.core.git import get_git_status
+from claude_statusline.core.state import StateFile
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path / ".claude" / "statusline")
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / ".claude")
+    monkeypatch.setattr(StateFile, "SPOOL_DIR", tmp_path / "spool")
+    (tmp_path / ".claude").mkdir()
+    return tmp_path
+
+
+def _run_main(monkeypatch, capsys, data: dict) -> str:
+    monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps(data)))
+    statusline.main()
+    return capsys.readouterr().out
+
+
+class TestSegmentGatherer:
+    def test_collects_results(self):
+        gather = SegmentGatherer(budget_ms=1000)
+        gather.submit("a", lambda x: x * 2, 21)
+        assert gather.result("a") == 42
+        assert gather.result("missing", "dflt") == "dflt"
+        assert gather.missed == []
+        gather.close()
+
+    def test_late_segment_returns_default(self):
+        release = threading.Event()
+        gather = SegmentGatherer(budget_ms=50)
+        gather.submit("slow", release.wait)
+        start = time.monotonic()
+        assert gather.result("slow", "cached") == "cached"
+        assert time.monotonic() - start < 1
+        assert gather.missed == ["slow"]
+        release.set()
+        gather.close()
+
+    def test_failed_segment_returns_default(self, capsys):
+        gather = SegmentGatherer(budget_ms=1000)
+        gather.submit("bad", lambda: 1 / 0)
+        assert gather.result("bad") is None
+        assert "bad segment failed" in capsys.readouterr().err
+        gather.close()
+
+    def test_segment_budget_caps_wait(self):
+        release = threading.Event()
+        gather = SegmentGatherer(budget_ms=5000, segment_budgets={"slow": 30, "unset": 0})
+        assert gather.remaining("slow") <= 0.03
+        assert gather.remaining("unset") == pytest.approx(gather.remaining(), abs=0.01)
+        gather.submit("slow", release.wait)
+        start = time.monotonic()
+        assert gather.result("slow") is None
+        assert time.monotonic() - start < 1
+        release.set()
+        gather.close()
+
+    def test_record_timeouts(self):
+        cache: dict = {}
+        assert record_timeouts(cache, []) is False
+        assert record_timeouts(cache, ["git"]) is True
+        record_timeouts(cache, ["git", "state"])
+        assert cache["timeouts"]["git"]["count"] == 2
+        assert cache["timeouts"]["state"]["count"] == 1
+        assert cache["timeouts"]["git"]["last"] > 0
+
+    def test_render_cache_round_trip(self, home):
+        assert load_render_cache() == {}
+        save_render_cache({"git": {"/p": ["main", 2]}})
+        assert load_render_cache() == {"git": {"/p": ["main", 2]}}
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+class TestGitStatus:
+    def test_branch_and_changes(self, tmp_path):
+        git = ["git", "-C", str(tmp_path), "-c", "user.name=t", "-c", "user.email=t@t"]
+        subprocess.run([*git, "init", "-q", "-b", "trunk"], check=True)
+        subprocess.run([*git, "commit", "-q", "--allow-empty", "-m", "init"], check=True)
+        (tmp_path / "a.txt").write_text("x")
+        assert get_git_status(tmp_path) == ("trunk", 1)
+
+    def test_not_a_repo(self, tmp_path):
+        assert get_git_status(tmp_path) is None
+
+    def test_timeout_is_not_not_a_repo(self, tmp_path, monkeypatch):
+        subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+
+        def hang(self, timeout=None):
+            raise subprocess.TimeoutExpired(self.args, timeout)
+
+        monkeypatch.setattr(subprocess.Popen, "communicate", hang)
+        with pytest.raises(TimeoutError):
+            get_git_status(tmp_path, timeout=0.1)
+
+
+class TestConcurrentRender:
+    def _input(self, project_dir: str) -> dict:
+        return {
+            "model": {"display_name": "Opus"},
+            "session_id": "sess-a",
+            "workspace": {"current_dir": project_dir, "project_dir": project_dir},
+            "context_window": {
+                "context_window_size": 200000,
+                "current_usage": {
+                    "input_tokens": 10000,
+                    "cache_creation_input_tokens": 500,
+                    "cache_read_input_tokens": 200,
+                },
+            },
+        }
+
+    def test_config_key(self, tmp_path):
+        config_file = tmp_path / "statusline.conf"
+        config_file.write_text("concurrent_render=true\n")
+        assert Config.load(config_path=config_file).concurrent_render is True
+        config_file.write_text("")
+        assert Config.load(config_path=config_file).concurrent_render is False
+
+    def test_budget_keys(self, tmp_path, capsys):
+        config_file = tmp_path / "statusline.conf"
+        config_file.write_text(
+            "render_budget_ms=50\nrender_budget_git_ms=30\nrender_budget_state_ms=-5\n"
+        )
+        config = Config.load(config_path=config_file)
+        assert config.render_budget_ms == 50
+        assert config.render_budget_git_ms == 30
+        assert config.render_budget_state_ms == 0
+        assert "render_budget_state_ms must be non-negative" in capsys.readouterr().err
+
+    def test_documented_zero_segment_budget(self, tmp_path, capsys):
+        config_file = tmp_path / "statusline.conf"
+        config_file.write_text("render_budget_git_ms=0\nrender_budget_state_ms=0\n")
+        config = Config.load(config_path=config_file)
+        assert (config.render_budget_git_ms, config.render_budget_state_ms) == (0, 0)
+        assert capsys.readouterr().err == ""
+
+    def test_git_and_state_gathered(self, home, monkeypatch, capsys):
+        (home / ".claude" / "statusline.conf").write_text("concurrent_render=true\n")
+        monkeypatch.setattr(statusline, "get_git_status", lambda project_dir, timeout: ("dev", 3))
+
+        out = _run_main(monkeypatch, capsys, self._input("/work/proj"))
+
+        assert "dev" in out and "[3]" in out
+        assert StateFile("sess-a").read_last_entry().current_used_tokens == 10700
+        assert load_render_cache()["git"] == {"/work/proj": ["dev", 3]}
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="write-behind needs flock")
+    def test_spool_flush_timer_forked_on_main_thread(self, home, monkeypatch, capsys):
+        (home / ".claude" / "statusline.conf").write_text(
+            "concurrent_render=true\nstate_write_behind=true\n"
+        )
+        monkeypatch.setattr(statusline, "get_git_status", lambda project_dir, timeout: ("dev", 0))
+        threads = []
+        monkeypatch.setattr(
+            StateFile, "_start_flush_timer", lambda self: threads.append(threading.current_thread())
+        )
+
+        _run_main(monkeypatch, capsys, self._input("/work/proj"))
+
+        assert threads == [threading.main_thread()]
+
+    def test_late_git_served_from_cache(self, home, monkeypatch, capsys):
+        (home / ".claude" / "statusline.conf").write_text("render_budget_ms=20\n")
+        save_render_cache({"git": {"/work/proj": ["cached-branch", 0]}})
+        release = threading.Event()
+
+        def slow_git(project_dir, timeout):
+            release.wait(5)
+            return ("fresh", 0)
+
+        monkeypatch.setattr(statusline, "get_git_status", slow_git)
+        start = time.monotonic()
+        out = _run_main(monkeypatch, capsys, self._input("/work/proj"))
+        release.set()
+
+        assert time.monotonic() - start < 2
+        assert "cached-branch" in out
+        assert "fresh" not in out
+        assert load_render_cache()["timeouts"]["git"]["count"] == 1
+
+    def test_git_timing_out_itself_served_from_cache(self, home, monkeypatch, capsys):
+        (home / ".claude" / "statusline.conf").write_text("render_budget_ms=2000\n")
+        save_render_cache({"git": {"/work/proj": ["cached-branch", 0]}})
+
+        def timed_out_git(project_dir, timeout):
+            raise TimeoutError("git did not answer")
+
+        monkeypatch.setattr(statusline, "get_git_status", timed_out_git)
+        out = _run_main(monkeypatch, capsys, self._input("/work/proj"))
+
+        assert "cached-branch" in out
+        assert load_render_cache()["timeouts"]["git"]["count"] == 1
+
+    def test_per_segment_deadline(self, home, monkeypatch, capsys):
+        (home / ".claude" / "statusline.conf").write_text(
+            "render_budget_ms=2000\nrender_budget_git_ms=20\n"
+        )
+        release = threading.Event()
+
+        def slow_git(project_dir, timeout):
+            assert timeout <= 0.02
+            release.wait(5)
+            return ("fresh", 0)
+
+        monkeypatch.setattr(statusline, "get_git_status", slow_git)
+        start = time.monotonic()
+        out = _run_main(monkeypatch, capsys, self._input("/work/proj"))
+        release.set()
+
+        assert time.monotonic() - start < 1
+        assert "fresh" not in out
+        # The state segment had the full budget and made it
+        assert "state" not in load_render_cache()["timeouts"]
@@ -0,0 +1,244 @@
+"""Tests for the SQLite state index and the index subcommand."""
+
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from claude_statusline.analytics import load_all_projects
+from claude_statusline.cli.context_stats import run_sessions
+from claude_statusline.cli.index import run_index
+from claude_statusline.core.colors import ColorManager
+from claude_statusline.core.index import StateIndex
+from claude_statusline.core.state import StateEntry, StateFile
+
+
+def _entry(ts: int, session_id: str, project: str, model: str = "claude-opus-4-6", n: int = 1):
+    return StateEntry(
+        timestamp=ts,
+        total_input_tokens=1000 * n,
+        total_output_tokens=100 * n,
+        current_input_tokens=50,
+        current_output_tokens=10,
+        cache_creation=200 * n,
+        cache_read=300 * n,
+        cost_usd=0.01 * n,
+        lines_added=n,
+        lines_removed=0,
+        session_id=session_id,
+        model_id=model,
+        workspace_project_dir=project,
+        context_window_size=200000,
+    )
+
+
+def _write_session(state_dir, session_id, project, count=3, start=None, model="claude-opus-4-6"):
+    start = start if start is not None else int(time.time()) - 3600
+    path = state_dir / f"statusline.{session_id}.state"
+    lines = [
+        _entry(start + i * 60, session_id, project, model, i + 1).to_csv_line()
+        for i in range(count)
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
+    return tmp_path
+
+
+def _summary(projects):
+    return sorted(
+        (
+            s.session_id,
+            s.project_dir,
+            s.model_id,
+            s.start_time,
+            s.end_time,
+            s.entry_count,
+            s.total_input_tokens,
+            s.total_cache_read,
+            round(s.cost_usd, 6),
+        )
+        for p in projects
+        for s in p.sessions
+    )
+
+
+class TestStateIndex:
+    def test_index_matches_csv_parsing(self, state_dir):
+        _write_session(state_dir, "sess-a", "/home/user/alpha", count=4)
+        _write_session(state_dir, "sess-b", "/home/user/beta", count=2, model="claude-sonnet-4")
+        _write_session(state_dir, "sess-c", "/home/user/alpha", count=1)
+
+        from_csv = load_all_projects(use_index=False)
+        from_index = load_all_projects(use_index=True)
+
+        assert _summary(from_index) == _summary(from_csv)
+        assert [p.project_dir for p in from_index] == [p.project_dir for p in from_csv]
+
+    def test_not_used_until_built(self, state_dir):
+        _write_session(state_dir, "sess-a", "/home/user/alpha")
+        load_all_projects()
+        assert not (state_dir / "index.db").exists()
+
+    def test_used_automatically_once_built(self, state_dir):
+        _write_session(state_dir, "sess-a", "/home/user/alpha")
+        with StateIndex() as index:
+            index.rebuild()
+        _write_session(state_dir, "sess-b", "/home/user/beta")
+        projects = load_all_projects()
+        assert {s.session_id for p in projects for s in p.sessions} == {"sess-a", "sess-b"}
+
+    def test_incremental_update_only_reads_appended_lines(self, state_dir):
+        path = _write_session(state_dir, "sess-a", "/home/user/alpha", count=3)
+        with StateIndex() as index:
+            assert index.rebuild().entries_added == 3
+            assert index.update().files_ingested == 0
+
+            with open(path, "a") as f:
+                f.write(_entry(int(time.time()), "sess-a", "/home/user/alpha", n=9).to_csv_line())
+                f.write("\n")
+            result = index.update()
+            assert result.files_ingested == 1
+            assert result.entries_added == 1
+
+            (row,) = index.sessions()
+            assert row["entry_count"] == 4
+            assert row["total_input_tokens"] == 9000
+            assert row["project_dir"] == "/home/user/alpha"
+
+    def test_partial_trailing_line_deferred(self, state_dir):
+        path = _write_session(state_dir, "sess-a", "/home/user/alpha", count=2)
+        line = _entry(int(time.time()), "sess-a", "/home/user/alpha", n=5).to_csv_line()
+        with open(path, "a") as f:
+            f.write(line[:10])
+        with StateIndex() as index:
+            assert index.rebuild().entries_added == 2
+            with open(path, "a") as f:
+                f.write(line[10:] + "\n")
+            assert index.update().entries_added == 1
+            assert index.sessions()[0]["entry_count"] == 3
+
+    def test_replaced_file_is_reingested(self, state_dir):
+        path = _write_session(state_dir, "sess-a", "/home/user/alpha", count=5)
+        with StateIndex() as index:
+            index.rebuild()
+            # Simulate rotation: atomic replace with a shorter file
+            tmp = state_dir / "rotate.tmp"
+            tmp.write_text(path.read_text().splitlines(keepends=True)[-1])
+            os.replace(tmp, path)
+            index.update()
+            (row,) = index.sessions()
+            assert row["entry_count"] == 1
+
+    def test_deleted_file_is_forgotten(self, state_dir):
+        _write_session(state_dir, "sess-a", "/home/user/alpha")
+        path = _write_session(state_dir, "sess-b", "/home/user/beta")
+        with StateIndex() as index:
+            index.rebuild()
+            path.unlink()
+            assert index.update().files_removed == 1
+            assert [r["session_id"] for r in index.sessions()] == ["sess-a"]
+            assert index.status()["files"] == 1
+
+    def test_sealed_segment_not_reingested(self, state_dir, monkeypatch):
+        path = _write_session(state_dir, "sess-a", "/home/user/alpha", count=3)
+        with StateIndex() as index:
+            index.rebuild()
+            # Seal the live file and start a new one, as StateFile does when full
+            monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", 1)
+            sf = StateFile("sess-a")
+            sf._maybe_rotate()
+            sf.append_entry(_entry(int(time.time()), "sess-a", "/home/user/alpha", n=7))
+
+            result = index.update()
+            assert result.files_ingested == 1
+            assert result.entries_added == 1
+            assert not path.exists()
+
+            (row,) = index.sessions()
+            assert row["entry_count"] == 4
+            assert row["total_input_tokens"] == 7000
+            assert index.status()["files"] == 2
+            assert _summary(load_all_projects(use_index=True)) == _summary(
+                load_all_projects(use_index=False)
+            )
+
+    def test_pruned_segment_drops_its_entries(self, state_dir, monkeypatch):
+        _write_session(state_dir, "sess-a", "/home/user/alpha", count=2)
+        monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", 1)
+        StateFile("sess-a")._maybe_rotate()
+        sf = StateFile("sess-a", keep_segments=1)
+        with StateIndex() as index:
+            sf.append_entry(_entry(int(time.time()), "sess-a", "/home/user/alpha", n=5))
+            index.rebuild()
+            assert index.sessions()[0]["entry_count"] == 1
+            assert [p.name for p in sf.segment_paths()] == ["statusline.sess-a.2.state"]
+
+    def test_old_schema_is_rebuilt(self, state_dir):
+        _write_session(state_dir, "sess-a", "/home/user/alpha", count=2)
+        with StateIndex() as index:
+            conn = index.connect()
+            conn.execute("DROP TABLE entries")
+            conn.execute("CREATE TABLE entries (session_id TEXT NOT NULL)")
+            conn.execute("UPDATE meta SET value = '1' WHERE key = 'schema_version'")
+            conn.commit()
+        with StateIndex() as index:
+            assert index.update().entries_added == 2
+
+    def test_uses_wal_and_indexes(self, state_dir):
+        with StateIndex() as index:
+            conn = index.connect()
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+        assert {
+            "idx_entries_timestamp",
+            "idx_entries_project",
+            "idx_entries_model",
+        } <= names
+
+
+class TestIndexCommand:
+    def test_rebuild_and_status(self, state_dir, capsys):
+        _write_session(state_dir, "sess-a", "/home/user/alpha", count=3)
+        colors = ColorManager(enabled=False)
+
+        run_index(["rebuild"], colors)
+        out = capsys.readouterr().out
+        assert "Index rebuilt: 1 file(s), 3 entries" in out
+
+        run_index(["status"], colors)
+        out = capsys.readouterr().out
+        assert "Sessions:" in out
+        assert any(line.split() == ["Entries:", "3"] for line in out.splitlines())
+
+    def test_status_without_index(self, state_dir, capsys):
+        run_index(["status"], ColorManager(enabled=False))
+        assert "No index found" in capsys.readouterr().out
+
+    def test_unknown_subcommand(self, state_dir):
+        with pytest.raises(SystemExit) as exc:
+            run_index(["bogus"], ColorManager(enabled=False))
+        assert exc.value.code == 1
+
+    def test_sessions_listing_reads_index(self, state_dir, capsys, monkeypatch):
+        _write_session(state_dir, "sess-a", "/home/user/alpha", start=int(time.time()) - 30)
+        with StateIndex() as index:
+            index.rebuild()
+
+        def fail(_self):
+            raise AssertionError("state file should not be re-read when indexed")
+
+        monkeypatch.setattr(StateFile, "read_last_entry", fail)
+        run_sessions(5, ColorManager(enabled=False))
+
+        out = capsys.readouterr().out
+        assert "sess-a" in out
+        assert "alpha" in out
+        assert "claude-opus-4-6" in out
@@ -0,0 +1,208 @@
+"""Tests for chunked history reads, spilling and peak-memory bounds.
+
+The tracemalloc bounds run on 10k-row histories by default. Set
+CONTEXT_STATS_SLOW_TESTS=1 to also run them on 1M rows; tracemalloc slows
+allocation-heavy code ~20x, so that takes several minutes.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from claude_statusline.analytics import load_all_projects
+from claude_statusline.cli import export
+from claude_statusline.cli.export import _generate_markdown, _iter_markdown, run_export
+from claude_statusline.core.config import Config
+from claude_statusline.core.spill import SpilledHistory
+from claude_statusline.core.state import StateEntry, StateFile
+
+MIB = 1024 * 1024
+
+slow = pytest.mark.skipif(
+    not os.environ.get("CONTEXT_STATS_SLOW_TESTS"),
+    reason="1M-row tracemalloc run; set CONTEXT_STATS_SLOW_TESTS=1",
+)
+ROW_COUNTS = [10_000, pytest.param(1_000_000, marks=slow, id="1M")]
+
+
+def _entry(n: int, session_id: str = "big", model: str = "claude-opus-4-6") -> StateEntry:
+    return StateEntry(
+        timestamp=1710288000 + 30 * n,
+        total_input_tokens=50000 + 900 * n,
+        total_output_tokens=4000 + 70 * n,
+        current_input_tokens=120 + n % 500,
+        current_output_tokens=800 + n % 300,
+        cache_creation=n % 7 * 1500,
+        cache_read=40000 + n % 150000,
+        cost_usd=round(0.012 * n, 4),
+        lines_added=n // 3,
+        lines_removed=n // 7,
+        session_id=session_id,
+        model_id=model,
+        workspace_project_dir="/home/user/alpha",
+        context_window_size=200000,
+    )
+
+
+def _write_rows(path: Path, rows: int) -> None:
+    """Write ``rows`` full rows quickly, 10k at a time."""
+    with open(path, "w") as f:
+        for start in range(0, rows, 10_000):
+            stop = min(rows, start + 10_000)
+            f.write("".join(f"{_entry(n).to_csv_line()}\n" for n in range(start, stop)))
+
+
+def _peak(fn):
+    """Run fn under tracemalloc; return (result, peak bytes)."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
+    monkeypatch.setattr(StateFile, "SPOOL_DIR", tmp_path / "spool")
+    return tmp_path
+
+
+class TestSpilledHistory:
+    def test_behaves_like_list(self):
+        entries = [_entry(n, model=f"m{n % 3}") for n in range(25)]
+        history = SpilledHistory.collect(entries, memory_cap=10)
+
+        assert history.spilled == 20
+        assert len(history) == 25
+        assert list(history) == entries
+        assert history[0] == entries[0]
+        assert history[13] == entries[13]
+        assert history[-1] == entries[-1]
+        assert history[3:6] == entries[3:6]
+        with pytest.raises(IndexError):
+            history[25]
+        history.close()
+        assert len(history) == 0
+
+    def test_no_spill_under_cap(self):
+        with SpilledHistory.collect([_entry(n) for n in range(5)], memory_cap=10) as history:
+            assert history.spilled == 0
+            assert history._file is None
+
+    def test_iterates_twice(self):
+        history = SpilledHistory.collect((_entry(n) for n in range(3000)), memory_cap=100)
+        assert sum(1 for _ in history) == sum(1 for _ in history) == 3000
+
+    def test_out_of_range_values_kept_in_memory(self):
+        entries = [_entry(n) for n in range(25)]
+        entries[4] = dataclasses.replace(entries[4], total_input_tokens=2**70)
+        entries[12] = dataclasses.replace(entries[12], context_window_size=-(2**64))
+        with SpilledHistory.collect(entries, memory_cap=10) as history:
+            assert history.spilled == 20
+            assert list(history) == entries
+            assert history[4] == entries[4]
+            assert history[5] == entries[5]
+
+
+class TestIterHistory:
+    def test_matches_read_history(self, state_dir):
+        _write_rows(state_dir / "statusline.big.state", 3000)
+        sf = StateFile("big")
+        assert list(sf.iter_history(chunk_bytes=4096)) == sf.read_history()
+
+    def test_compact_blocks_not_split(self, state_dir):
+        sf = StateFile("big", compact=True)
+        for n in range(500):
+            sf.append_entry(_entry(n))
+        expected = [_entry(n) for n in range(500)]
+        assert list(sf.iter_history(chunk_bytes=200)) == expected
+        assert list(sf.iter_history(since=_entry(250).timestamp, chunk_bytes=200)) == expected[250:]
+
+
+class TestMemoryBounds:
+    @pytest.mark.parametrize("rows", ROW_COUNTS)
+    def test_spilled_read(self, state_dir, rows):
+        _write_rows(state_dir / "statusline.big.state", rows)
+
+        def load():
+            return SpilledHistory.collect(StateFile("big").iter_history(chunk_bytes=64 * 1024), 500)
+
+        history, peak = _peak(load)
+
+        assert len(history) == rows
+        assert history[-1] == _entry(rows - 1)
+        # A plain read_history of 10k rows alone is ~4.5 MiB
+        assert peak < 2 * MIB
+
+    @pytest.mark.parametrize("rows", ROW_COUNTS)
+    def test_load_all_projects(self, state_dir, rows):
+        _write_rows(state_dir / "statusline.big.state", rows)
+
+        projects, peak = _peak(lambda: load_all_projects(use_index=False))
+
+        assert projects[0].sessions[0].entry_count == rows
+        assert peak < 1 * MIB
+
+    @pytest.mark.parametrize("rows", [4_000, pytest.param(1_000_000, marks=slow, id="1M")])
+    def test_streamed_markdown(self, rows):
+        history = SpilledHistory.collect((_entry(n) for n in range(rows)), memory_cap=500)
+
+        count, peak = _peak(lambda: sum(1 for _ in _iter_markdown(history, "big", Config())))
+
+        assert count > 2 * rows
+        assert peak < 1.5 * MIB
+
+    def test_streamed_markdown_matches_joined(self):
+        entries = [_entry(n) for n in range(300)]
+        history = SpilledHistory.collect(entries, memory_cap=50)
+        assert "\n".join(_iter_markdown(history, "big", Config())) == _generate_markdown(
+            entries, "big", Config()
+        )
+
+
+class TestExportMemoryCap:
+    def test_config_key(self, tmp_path, capsys):
+        config_file = tmp_path / "statusline.conf"
+        config_file.write_text("history_memory_cap=5000\n")
+        assert Config.load(config_path=config_file).history_memory_cap == 5000
+        config_file.write_text("history_memory_cap=-1\n")
+        assert Config.load(config_path=config_file).history_memory_cap == 0
+        assert "history_memory_cap must be non-negative" in capsys.readouterr().err
+
+    def test_capped_export_is_identical(self, state_dir, tmp_path, monkeypatch, capsys):
+        _write_rows(state_dir / "statusline.big.state", 1200)
+        out_plain = tmp_path / "plain.md"
+        out_capped = tmp_path / "capped.md"
+
+        run_export(["big", "--output", str(out_plain)])
+        monkeypatch.setattr(
+            Config, "load", classmethod(lambda cls, *a, **k: cls(history_memory_cap=100))
+        )
+        run_export(["big", "--output", str(out_capped)])
+
+        assert out_capped.read_text() == out_plain.read_text()
+        assert "Interactions: 1200" in capsys.readouterr().out
+
+    def test_failed_export_keeps_previous_file(self, state_dir, tmp_path, monkeypatch):
+        _write_rows(state_dir / "statusline.big.state", 10)
+        out = tmp_path / "report.md"
+        out.write_text("previous report")
+
+        def failing_markdown(entries, session_id, config):
+            yield "# Context Stats Report"
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(export, "_iter_markdown", failing_markdown)
+        with pytest.raises(SystemExit):
+            run_export(["big", "--output", str(out)])
+
+        assert out.read_text() == "previous report"
+        assert [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
@@ -0,0 +1,83 @@
+"""Tests for the global --profile flag of context-stats."""
+
+from __future__ import annotations
+
+import pstats
+import sys
+import tracemalloc
+
+import pytest
+
+from claude_statusline.cli import context_stats
+from claude_statusline.cli.profile import pop_profile_flag, run_profiled
+from claude_statusline.core.state import StateFile
+
+
+class TestPopProfileFlag:
+    def test_default_mode(self):
+        assert pop_profile_flag(["--profile", "report"]) == ("cprofile", ["report"])
+
+    def test_explicit_mode(self):
+        mode, rest = pop_profile_flag(["abc", "export", "--profile=TraceMalloc"])
+        assert mode == "tracemalloc"
+        assert rest == ["abc", "export"]
+
+    def test_absent(self):
+        assert pop_profile_flag(["report", "--output", "x.md"]) == (
+            None,
+            ["report", "--output", "x.md"],
+        )
+
+    def test_unknown_mode(self, capsys):
+        with pytest.raises(SystemExit) as exc:
+            pop_profile_flag(["--profile=perf"])
+        assert exc.value.code == 1
+        assert "Unknown profiler 'perf'" in capsys.readouterr().err
+
+
+def _work() -> None:
+    sorted(str(i) for i in range(20000))
+
+
+class TestRunProfiled:
+    def test_cprofile(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        path = run_profiled("cprofile", "report", _work)
+        assert path.parent == tmp_path
+        assert path.name.startswith("context-stats-report-") and path.suffix == ".pstats"
+        assert pstats.Stats(str(path)).total_calls > 0
+        err = capsys.readouterr().err
+        assert "by cumulative time" in err
+        assert "_work" in err
+
+    def test_tracemalloc(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        path = run_profiled("tracemalloc", "export", _work)
+        assert path.suffix == ".tracemalloc"
+        assert isinstance(tracemalloc.Snapshot.load(str(path)), tracemalloc.Snapshot)
+        assert "[profile] peak" in capsys.readouterr().err
+        assert not tracemalloc.is_tracing()
+
+    def test_written_on_exit(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        def bail() -> None:
+            sys.exit(3)
+
+        with pytest.raises(SystemExit):
+            run_profiled("cprofile", "graph", bail)
+        assert len(list(tmp_path.glob("*.pstats"))) == 1
+
+
+class TestMainIntegration:
+    def test_profiles_sessions(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path / "state")
+        monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path)
+        monkeypatch.setattr(sys, "argv", ["context-stats", "--profile", "sessions", "--no-color"])
+
+        context_stats.main()
+
+        assert "--profile" not in sys.argv
+        assert len(list(tmp_path.glob("context-stats-sessions-*.pstats"))) == 1
+        assert "[profile] wrote" in capsys.readouterr().err
@@ -1,13 +1,16 @@
 """Tests for the report command."""
 
+import os
 from datetime import datetime, timedelta
 
 from claude_statusline.analytics import (
     ProjectStats,
     SessionStats,
     _group_sessions_by_project,
+    load_all_projects,
 )
 from claude_statusline.cli.report import generate_report
+from claude_statusline.core.state import StateFile
 
 
 def _make_session(
@@ -185,3 +188,62 @@ def test_since_days_does_not_filter_by_end_time():
 
     assert "included" in session_ids
     assert "excluded" not in session_ids
+
+
+def _write_state_file(state_dir, session_id, start_ts, count=3, mtime=None):
+    path = state_dir / f"statusline.{session_id}.state"
+    lines = [
+        f"{start_ts + i * 60},{1000 * (i + 1)},100,50,10,200,300,0.0{i + 1},1,0,"
+        f"{session_id},claude-opus-4-6,/home/user/proj,200000"
+        for i in range(count)
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_since_days_skips_old_files_by_mtime(tmp_path, monkeypatch):
+    """Files last modified before the cutoff must not be opened at all."""
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+    now = int(datetime.now().timestamp())
+    old = _write_state_file(tmp_path, "old-session", now - 40 * 86400, mtime=now - 39 * 86400)
+    _write_state_file(tmp_path, "recent-session", now - 2 * 86400)
+
+    opened = []
+    real_open = open
+
+    def tracking_open(file, *args, **kwargs):
+        opened.append(str(file))
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", tracking_open)
+    projects = load_all_projects(since_days=7, use_index=False)
+
+    session_ids = [s.session_id for p in projects for s in p.sessions]
+    assert session_ids == ["recent-session"]
+    assert str(old) not in opened
+
+
+def test_since_days_rejects_old_session_after_first_line(tmp_path, monkeypatch):
+    """A recently touched session that started before the cutoff is still excluded."""
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+    now = int(datetime.now().timestamp())
+    _write_state_file(tmp_path, "long-session", now - 40 * 86400, count=5)
+
+    projects = load_all_projects(since_days=7, use_index=False)
+    assert projects == []
+    assert load_all_projects(use_index=False)[0].sessions[0].session_id == "long-session"
+
+
+def test_since_days_pushdown_matches_index(tmp_path, monkeypatch):
+    """The CSV and index paths apply the same since_days window."""
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+    now = int(datetime.now().timestamp())
+    _write_state_file(tmp_path, "old", now - 40 * 86400)
+    _write_state_file(tmp_path, "recent", now - 86400)
+
+    from_csv = load_all_projects(since_days=7, use_index=False)
+    from_index = load_all_projects(since_days=7, use_index=True)
+    assert [s.session_id for p in from_csv for s in p.sessions] == ["recent"]
+    assert [s.session_id for p in from_index for s in p.sessions] == ["recent"]
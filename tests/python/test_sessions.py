@@ -202,3 +202,81 @@ class TestRunSessions:
         pos_c = output.find("session-c")
         pos_a = output.find("session-a")
         assert pos_c < pos_a, "Most recent session should appear first"
+
+
+def _entry(session_id: str, timestamp: int, project: str = "/home/user/project") -> StateEntry:
+    return StateEntry(
+        timestamp=timestamp,
+        total_input_tokens=1000,
+        total_output_tokens=500,
+        current_input_tokens=100,
+        current_output_tokens=50,
+        cache_creation=200,
+        cache_read=300,
+        cost_usd=0.01,
+        lines_added=10,
+        lines_removed=5,
+        session_id=session_id,
+        model_id="claude-opus-4-6",
+        workspace_project_dir=project,
+        context_window_size=200000,
+    )
+
+
+class TestSummarizeSessions:
+    """Test StateFile.summarize_sessions batch listing."""
+
+    def _write(self, tmp_path, sid: str, age: float, name: str | None = None) -> StateEntry:
+        import os
+
+        now = time.time()
+        entry = _entry(sid, int(now - age), f"/home/user/{sid}")
+        path = tmp_path / (name or f"statusline.{sid}.state")
+        path.write_text(entry.to_csv_line() + "\n")
+        os.utime(path, (now - age, now - age))
+        return entry
+
+    def test_filters_sorts_and_reads_last_entry(self, tmp_path):
+        a = self._write(tmp_path, "session-a", 60)
+        b = self._write(tmp_path, "session-b", 10)
+        self._write(tmp_path, "session-c", 3600)
+
+        with patch.object(StateFile, "STATE_DIR", tmp_path):
+            summaries = StateFile.summarize_sessions(since=time.time() - 300)
+
+        assert [s.session_id for s in summaries] == ["session-b", "session-a"]
+        assert [s.last_entry for s in summaries] == [b, a]
+        assert summaries[0].path == tmp_path / "statusline.session-b.state"
+
+    def test_sealed_session_with_empty_live_file(self, tmp_path):
+        entry = self._write(tmp_path, "session-a", 30, "statusline.session-a.1.state")
+        (tmp_path / "statusline.session-a.state").write_text("")
+
+        with patch.object(StateFile, "STATE_DIR", tmp_path):
+            (summary,) = StateFile.summarize_sessions()
+        assert summary.last_entry == entry
+
+    def test_parallel_matches_serial(self, tmp_path):
+        for i in range(12):
+            self._write(tmp_path, f"session-{i}", i * 5)
+
+        with patch.object(StateFile, "STATE_DIR", tmp_path):
+            serial = StateFile.summarize_sessions()
+            parallel = StateFile.summarize_sessions(workers=4)
+        assert parallel == serial
+        assert len(serial) == 12
+
+    def test_run_sessions_does_not_open_state_files_per_session(self, tmp_path, capsys):
+        self._write(tmp_path, "session-a", 10)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("StateFile constructed per session")
+
+        with (
+            patch.object(StateFile, "STATE_DIR", tmp_path),
+            patch.object(StateFile, "__init__", fail),
+        ):
+            run_sessions(5, ColorManager(enabled=False))
+        output = capsys.readouterr().out
+        assert "session-a" in output
+        assert "claude-opus-4-6" in output
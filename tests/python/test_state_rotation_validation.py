@@ -6,7 +6,14 @@ import sys
 
 import pytest
 
-from claude_statusline.core.state import StateFile, _validate_session_id
+from claude_statusline.core.config import Config
+from claude_statusline.core.state import (
+    StateEntry,
+    StateFile,
+    _validate_session_id,
+    discover_state_files,
+    parse_state_filename,
+)
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -26,62 +33,132 @@ def _make_csv_line(index: int) -> str:
 # ---------------------------------------------------------------------------
 
 
-class TestStateFileRotation:
-    """Tests for _maybe_rotate() in StateFile."""
-
-    def test_below_threshold_no_rotation(self, tmp_path, monkeypatch):
-        """File with fewer than 10,000 lines is not rotated."""
-        monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
-        monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
-        (tmp_path / "old").mkdir()
+def _entry(index: int, session_id: str = "test-session") -> StateEntry:
+    return StateEntry(
+        timestamp=1710288000 + index,
+        total_input_tokens=100,
+        total_output_tokens=200,
+        current_input_tokens=300,
+        current_output_tokens=400,
+        cache_creation=500,
+        cache_read=600,
+        cost_usd=0.01,
+        lines_added=index,
+        lines_removed=5,
+        session_id=session_id,
+        model_id="model",
+        workspace_project_dir="/tmp/proj",
+        context_window_size=200000,
+    )
 
-        sf = StateFile("test-session")
-        # Write 9,999 lines
-        lines = [_make_csv_line(i) + "\n" for i in range(9_999)]
-        sf.file_path.write_text("".join(lines))
 
-        sf._maybe_rotate()
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
+    (tmp_path / "old").mkdir()
+    return tmp_path
 
-        result_lines = sf.file_path.read_text().splitlines()
-        assert len(result_lines) == 9_999
 
-    def test_at_threshold_no_rotation(self, tmp_path, monkeypatch):
-        """File with exactly 10,000 lines is not rotated."""
-        monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
-        monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
-        (tmp_path / "old").mkdir()
+class TestStateFileRotation:
+    """Tests for _maybe_rotate() in StateFile."""
 
+    def test_below_cap_no_rotation(self, state_dir, monkeypatch):
+        """A live file smaller than SEGMENT_MAX_BYTES is left alone."""
         sf = StateFile("test-session")
-        lines = [_make_csv_line(i) + "\n" for i in range(10_000)]
-        sf.file_path.write_text("".join(lines))
+        sf.file_path.write_text(_make_csv_line(0) + "\n")
+        monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", sf.file_path.stat().st_size + 1)
 
         sf._maybe_rotate()
 
-        result_lines = sf.file_path.read_text().splitlines()
-        assert len(result_lines) == 10_000
-
-    def test_exceeds_threshold_truncates_to_5000(self, tmp_path, monkeypatch):
-        """File with 10,001 lines is truncated to 5,000."""
-        monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
-        monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
-        (tmp_path / "old").mkdir()
+        assert sf.file_path.exists()
+        assert sf.segment_paths() == []
 
+    def test_full_file_is_sealed_unchanged(self, state_dir, monkeypatch):
+        """At the cap the live file is renamed to segment 1, byte for byte."""
         sf = StateFile("test-session")
-        lines = [_make_csv_line(i) + "\n" for i in range(10_001)]
-        sf.file_path.write_text("".join(lines))
+        content = "".join(_make_csv_line(i) + "\n" for i in range(100))
+        sf.file_path.write_text(content)
+        monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", len(content))
 
         sf._maybe_rotate()
 
-        result_lines = sf.file_path.read_text().splitlines()
-        assert len(result_lines) == 5_000
+        assert not sf.file_path.exists()
+        assert sf.segment_paths() == [state_dir / "statusline.test-session.1.state"]
+        assert sf.segment_path(1).read_text() == content
 
-    def test_retained_lines_are_most_recent(self, tmp_path, monkeypatch):
-        """After rotation, the retained lines are the last 5,000 of the original."""
-        monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
-        monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
-        (tmp_path / "old").mkdir()
+    def test_history_spans_segments(self, state_dir, monkeypatch):
+        """Readers see every entry, sealed or live, in order."""
+        monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", 1000)
+        sf = StateFile("test-session")
+        for i in range(50):
+            sf.append_entry(_entry(i))
+
+        assert len(sf.segment_paths()) > 1
+        assert [e.lines_added for e in sf.read_history()] == list(range(50))
+        assert [e.lines_added for e in sf.read_history(since=1710288040)] == list(range(40, 50))
+        assert sf.read_last_entry() == _entry(49)
 
+    def test_last_entry_right_after_seal(self, state_dir, monkeypatch):
+        """With no live file yet, the newest segment supplies the last entry."""
         sf = StateFile("test-session")
+        sf.append_entry(_entry(1))
+        monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", 1)
+        sf.append_entry(_entry(2))
+
+        assert not sf.file_path.exists()
+        assert sf.read_last_entry() == _entry(2)
+        assert StateFile().read_last_entry() == _entry(2)
+        assert sf.find_latest_state_file() == sf.segment_path(1)
+
+    def test_oldest_segments_pruned(self, state_dir, monkeypatch):
+        """Only keep_segments sealed segments are retained."""
+        monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", 1)
+        sf = StateFile("test-session", keep_segments=3)
+        for i in range(6):
+            sf.append_entry(_entry(i))
+
+        assert [p.name for p in sf.segment_paths()] == [
+            f"statusline.test-session.{n}.state" for n in (4, 5, 6)
+        ]
+        assert [e.lines_added for e in sf.read_history()] == [3, 4, 5]
+
+    def test_keep_zero_retains_everything(self, state_dir, monkeypatch):
+        monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", 1)
+        sf = StateFile("test-session", keep_segments=0)
+        for i in range(15):
+            sf.append_entry(_entry(i))
+        assert len(sf.segment_paths()) == 15
+
+    def test_segments_listed_as_one_session(self, state_dir, monkeypatch):
+        monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", 1)
+        StateFile("test-session").append_entry(_entry(1))
+        StateFile("other").append_entry(_entry(1, "other"))
+        StateFile("test-session").append_entry(_entry(2))
+        assert sorted(StateFile().list_sessions()) == ["other", "test-session"]
+        assert discover_state_files(state_dir)["test-session"] == [
+            state_dir / "statusline.test-session.1.state",
+            state_dir / "statusline.test-session.2.state",
+        ]
+
+    def test_keep_segments_config(self, tmp_path, capsys):
+        config_file = tmp_path / "statusline.conf"
+        config_file.write_text("state_keep_segments=0\n")
+        assert Config.load(config_path=config_file).state_keep_segments == 0
+        config_file.write_text("state_keep_segments=-2\n")
+        assert Config.load(config_path=config_file).state_keep_segments == 10
+        assert "must be non-negative" in capsys.readouterr().err
+
+    def test_parse_state_filename(self):
+        assert parse_state_filename("statusline.abc-1.state") == ("abc-1", 0)
+        assert parse_state_filename("statusline.abc-1.12.state") == ("abc-1", 12)
+        assert parse_state_filename("statusline.state") is None
+        assert parse_state_filename("statusline..state") is None
+        assert parse_state_filename("other.abc.state") is None
+
+    def test_sessionless_file_exceeding_threshold_truncates(self, state_dir):
+        """The legacy statusline.state keeps its newest 5,000 of 10,001 lines."""
+        sf = StateFile()
         total = 10_001
         lines = [_make_csv_line(i) + "\n" for i in range(total)]
         sf.file_path.write_text("".join(lines))
@@ -89,61 +166,141 @@ class TestStateFileRotation:
         sf._maybe_rotate()
 
         result_lines = sf.file_path.read_text().splitlines()
-        # First retained line should be the one at index (total - 5000) = 5001
+        assert len(result_lines) == 5_000
         assert f"sess-{total - 5000}" in result_lines[0]
-        # Last retained line should be the last original line
         assert f"sess-{total - 1}" in result_lines[-1]
+        assert list(state_dir.glob("*.tmp")) == []
 
-    def test_rotation_via_append_entry(self, tmp_path, monkeypatch):
-        """append_entry triggers rotation when threshold is exceeded."""
-        monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
-        monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
-        (tmp_path / "old").mkdir()
-
-        sf = StateFile("test-session")
-        # Write exactly 10,000 lines (at threshold, no rotation yet)
+    def test_sessionless_file_at_threshold_not_truncated(self, state_dir):
+        sf = StateFile()
         lines = [_make_csv_line(i) + "\n" for i in range(10_000)]
         sf.file_path.write_text("".join(lines))
 
-        # Import StateEntry to create a valid entry
-        from claude_statusline.core.state import StateEntry
-
-        entry = StateEntry(
-            timestamp=1710298000,
-            total_input_tokens=100,
-            total_output_tokens=200,
-            current_input_tokens=300,
-            current_output_tokens=400,
-            cache_creation=500,
-            cache_read=600,
-            cost_usd=0.01,
-            lines_added=10,
-            lines_removed=5,
-            session_id="test-session",
-            model_id="model",
-            workspace_project_dir="/tmp/proj",
-            context_window_size=200000,
-        )
-        sf.append_entry(entry)
+        sf._maybe_rotate()
 
-        # Now file had 10,001 lines -> should have been rotated to 5,000
-        result_lines = sf.file_path.read_text().splitlines()
-        assert len(result_lines) == 5_000
+        assert len(sf.file_path.read_text().splitlines()) == 10_000
 
-    def test_no_temp_files_left_after_rotation(self, tmp_path, monkeypatch):
-        """No .tmp files remain after successful rotation."""
-        monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path)
-        monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
+
+# ---------------------------------------------------------------------------
+# Concurrent Writers (subprocess stress test)
+# ---------------------------------------------------------------------------
+
+_WRITER = """
+import sys, time
+from pathlib import Path
+from claude_statusline.core.state import StateEntry, StateFile
+
+state_dir, writer, count, max_bytes = sys.argv[1:]
+StateFile.STATE_DIR = Path(state_dir)
+StateFile.OLD_STATE_DIR = Path(state_dir) / "old"
+StateFile.SEGMENT_MAX_BYTES = int(max_bytes)
+sf = StateFile("stress", keep_segments=0)
+while not (Path(state_dir) / "go").exists():
+    time.sleep(0.001)
+for seq in range(int(count)):
+    sf.append_entry(StateEntry(
+        1710288000 + seq, seq, 0, 0, 0, 0, 0, 0.0, seq, 0,
+        "stress", "writer-" + writer, "/tmp/" + "x" * 200, 200000,
+    ))
+"""
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="flock is POSIX-only")
+class TestConcurrentAppend:
+    """Many processes appending (and rotating) the same state file."""
+
+    WRITERS = 8
+
+    def _run(self, tmp_path, count, max_bytes):
         (tmp_path / "old").mkdir()
+        procs = [
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    "-c",
+                    _WRITER,
+                    str(tmp_path),
+                    str(w),
+                    str(count),
+                    str(max_bytes),
+                ]
+            )
+            for w in range(self.WRITERS)
+        ]
+        (tmp_path / "go").touch()
+        for proc in procs:
+            assert proc.wait(timeout=120) == 0
+
+        lines = [
+            line
+            for path in discover_state_files(tmp_path)["stress"]
+            for line in path.read_text().splitlines()
+        ]
+        seqs: dict[str, list[int]] = {}
+        for line in lines:
+            entry = StateEntry.from_csv_line(line)
+            # A torn or interleaved record would not round-trip
+            assert entry is not None and entry.to_csv_line() == line
+            seqs.setdefault(entry.model_id, []).append(entry.lines_added)
+        return lines, seqs
+
+    def test_no_lost_or_torn_records(self, tmp_path):
+        count = 150
+        lines, seqs = self._run(tmp_path, count, max_bytes=10_000_000)
+        assert len(lines) == self.WRITERS * count
+        for w in range(self.WRITERS):
+            assert seqs[f"writer-{w}"] == list(range(count))
+
+    def test_sealing_does_not_drop_concurrent_appends(self, tmp_path):
+        count = 300
+        lines, seqs = self._run(tmp_path, count, max_bytes=20_000)
+        assert len(list(tmp_path.glob("statusline.stress.*.state"))) > 10
+        # Sealing renames, it never rewrites: every record of every writer
+        # survives, in order
+        assert len(lines) == self.WRITERS * count
+        for w in range(self.WRITERS):
+            assert seqs[f"writer-{w}"] == list(range(count))
 
-        sf = StateFile("test-session")
-        lines = [_make_csv_line(i) + "\n" for i in range(10_001)]
-        sf.file_path.write_text("".join(lines))
 
-        sf._maybe_rotate()
+# ---------------------------------------------------------------------------
+# Legacy Migration
+# ---------------------------------------------------------------------------
+
 
-        tmp_files = list(tmp_path.glob("*.tmp"))
-        assert tmp_files == []
+class TestLegacyMigration:
+    """Tests for the one-time move of ~/.claude/statusline*.state files."""
+
+    def test_old_files_moved_once(self, state_dir):
+        old = state_dir / "old" / "statusline.abc.state"
+        old.write_text(_make_csv_line(0) + "\n")
+        StateFile("abc")
+        assert (state_dir / "statusline.abc.state").exists()
+        assert not old.exists()
+        assert (state_dir / StateFile.MIGRATION_MARKER).exists()
+
+        # Marker present: a new process does not scan the old directory again
+        StateFile._prepared.clear()
+        old.write_text(_make_csv_line(1) + "\n")
+        StateFile("abc")
+        assert old.exists()
+
+    def test_directory_prepared_once_per_process(self, state_dir, monkeypatch):
+        calls = []
+        monkeypatch.setattr(StateFile, "_migrate_old_files", lambda self: calls.append(self))
+        StateFile("abc")
+        StateFile("def")
+        assert len(calls) == 1
+
+    def test_removed_directory_recreated_on_append(self, state_dir, monkeypatch):
+        sub = state_dir / "state"
+        monkeypatch.setattr(StateFile, "STATE_DIR", sub)
+        sf = StateFile("abc")
+        sf.file_path.unlink(missing_ok=True)
+        for path in sub.iterdir():
+            path.unlink()
+        sub.rmdir()
+        StateFile("abc").append_entry(_entry(1, "abc"))
+        assert sf.read_last_entry() == _entry(1, "abc")
 
 
 # ---------------------------------------------------------------------------
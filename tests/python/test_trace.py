@@ -0,0 +1,214 @@
+"""Tests for statusline self-timing and the perf subcommand."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from claude_statusline.cli import statusline
+from claude_statusline.cli.context_stats import _normalize_argv
+from claude_statusline.cli.perf import run_perf
+from claude_statusline.core import trace
+from claude_statusline.core.colors import ColorManager
+from claude_statusline.core.config import Config
+from claude_statusline.core.state import StateFile
+from claude_statusline.core.trace import (
+    PhaseTimer,
+    append_metrics,
+    load_metrics,
+    metrics_path,
+    percentile,
+    summarize_phases,
+)
+
+INPUT = {
+    "model": {"display_name": "Opus"},
+    "session_id": "sess-a",
+    "workspace": {"current_dir": "/work/proj", "project_dir": "/work/proj"},
+    "context_window": {
+        "context_window_size": 200000,
+        "current_usage": {
+            "input_tokens": 10000,
+            "cache_creation_input_tokens": 500,
+            "cache_read_input_tokens": 200,
+        },
+    },
+}
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv(trace.TRACE_ENV, raising=False)
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path / ".claude" / "statusline")
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / ".claude")
+    monkeypatch.setattr(StateFile, "SPOOL_DIR", tmp_path / "spool")
+    (tmp_path / ".claude").mkdir()
+    return tmp_path
+
+
+def _run_statusline(monkeypatch, capsys) -> None:
+    monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps(INPUT)))
+    statusline.main()
+    capsys.readouterr()
+
+
+class TestPhaseTimer:
+    def test_phases_accumulate(self):
+        timer = PhaseTimer()
+        with timer.phase("a"):
+            pass
+        with timer.phase("a"):
+            pass
+        assert timer.wrap("b", lambda x: x + 1)(1) == 2
+        record = timer.record()
+        assert set(record["phases"]) == {"a", "b", "total"}
+        assert record["phases"]["total"] >= record["phases"]["a"]
+
+    def test_percentile_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile([7.0], 99) == 7
+        assert percentile([], 50) == 0
+
+    def test_summary_orders_phases(self):
+        records = [{"phases": {"total": 3.0, "zz": 1.0, "parse": 0.5}}] * 4
+        summary = summarize_phases(records)
+        assert list(summary) == ["parse", "total", "zz"]
+        assert summary["total"]["count"] == 4
+
+
+class TestMetricsFile:
+    def test_rolls_over(self, home, monkeypatch):
+        monkeypatch.setattr(trace, "METRICS_MAX_BYTES", 2000)
+        for n in range(100):
+            append_metrics({"ts": n, "phases": {"total": 1.0}})
+        assert metrics_path().stat().st_size <= 2000
+        records = load_metrics()
+        assert records[-1]["ts"] == 99
+        assert len(load_metrics(5)) == 5
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="trim is only locked with flock")
+    def test_trim_keeps_concurrent_appends(self, home, monkeypatch):
+        for n in range(100):
+            append_metrics({"ts": n, "phases": {"total": 1.0}})
+        monkeypatch.setattr(trace, "METRICS_MAX_BYTES", 2000)
+        replace = os.replace
+        writers = []
+
+        def replace_after_concurrent_append(src, dst):
+            # Another refresh appends between trim's read and its replace
+            writers.append(
+                subprocess.Popen(
+                    [
+                        sys.executable,
+                        "-c",
+                        "from claude_statusline.core.trace import append_metrics; "
+                        "append_metrics({'ts': 1000, 'phases': {'total': 1.0}})",
+                    ],
+                    env={**os.environ, "HOME": str(home)},
+                )
+            )
+            time.sleep(0.5)
+            replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", replace_after_concurrent_append)
+        trace._trim(metrics_path())
+        monkeypatch.setattr(os, "replace", replace)
+        assert writers[0].wait(timeout=10) == 0
+
+        assert load_metrics()[-1]["ts"] == 1000
+
+    def test_failed_trim_removes_temp_file(self, home, monkeypatch, capsys):
+        for n in range(100):
+            append_metrics({"ts": n, "phases": {"total": 1.0}})
+        monkeypatch.setattr(trace, "METRICS_MAX_BYTES", 2000)
+
+        def failing_replace(src, dst):
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(os, "replace", failing_replace)
+        append_metrics({"ts": 100, "phases": {"total": 1.0}})
+
+        assert "failed to write metrics" in capsys.readouterr().err
+        assert sorted(p.name for p in metrics_path().parent.iterdir()) == ["metrics.jsonl"]
+        assert load_metrics()[-1]["ts"] == 100
+
+    def test_malformed_lines_skipped(self, home):
+        append_metrics({"ts": 1, "phases": {"total": 1.0}})
+        with open(metrics_path(), "a") as f:
+            f.write("not json\n{}\n")
+        assert [r["ts"] for r in load_metrics()] == [1]
+
+
+class TestStatuslineTracing:
+    def test_off_by_default(self, home, monkeypatch, capsys):
+        _run_statusline(monkeypatch, capsys)
+        assert not metrics_path().exists()
+
+    def test_config_key_records_phases(self, home, monkeypatch, capsys):
+        (home / ".claude" / "statusline.conf").write_text("trace_metrics=true\n")
+        _run_statusline(monkeypatch, capsys)
+        _run_statusline(monkeypatch, capsys)
+
+        records = load_metrics()
+        assert len(records) == 2
+        phases = records[0]["phases"]
+        for name in ("parse", "config", "git", "state_read", "state_write", "zone_mi", "layout"):
+            assert name in phases
+        assert phases["total"] >= phases["config"]
+        # Second refresh has the same usage, so nothing is appended
+        assert "state_write" not in records[1]["phases"]
+
+    def test_env_var_enables(self, home, monkeypatch, capsys):
+        monkeypatch.setenv(trace.TRACE_ENV, "1")
+        _run_statusline(monkeypatch, capsys)
+        assert len(load_metrics()) == 1
+
+    def test_config_parse(self, tmp_path):
+        config_file = tmp_path / "statusline.conf"
+        config_file.write_text("trace_metrics=true\n")
+        assert Config.load(config_path=config_file).trace_metrics is True
+
+
+class TestPerfCommand:
+    def test_summary_table(self, home, capsys):
+        for n in range(1, 101):
+            append_metrics({"ts": n, "phases": {"git": float(n), "total": float(n) * 2}})
+
+        run_perf([], ColorManager(enabled=False))
+
+        out = capsys.readouterr().out
+        assert "last 100 refreshes" in out
+        git_line = next(line for line in out.splitlines() if line.strip().startswith("git"))
+        assert git_line.split()[1:] == ["100", "50.00", "95.00", "99.00", "100.00"]
+
+    def test_last_limits_records(self, home, capsys):
+        for n in range(10):
+            append_metrics({"ts": n, "phases": {"total": 1.0}})
+        run_perf(["--last", "3"], ColorManager(enabled=False))
+        assert "last 3 refreshes" in capsys.readouterr().out
+
+    def test_no_metrics(self, home, capsys):
+        run_perf([], ColorManager(enabled=False))
+        out = capsys.readouterr().out
+        assert "No statusline metrics" in out
+        assert "trace_metrics=true" in out
+
+    def test_unreadable_metrics(self, home, capsys):
+        metrics_path().mkdir(parents=True)
+        with pytest.raises(SystemExit) as exc:
+            run_perf([], ColorManager(enabled=False))
+        assert exc.value.code == 1
+        assert "Error: Failed to read" in capsys.readouterr().err
+
+    def test_action_registered(self):
+        assert _normalize_argv(["perf"])[0] == "perf"
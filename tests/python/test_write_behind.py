@@ -0,0 +1,196 @@
+"""Tests for the write-behind spool in StateFile."""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from claude_statusline.analytics import load_all_projects
+from claude_statusline.core.config import Config
+from claude_statusline.core.state import SpoolPolicy, StateEntry, StateFile
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="write-behind needs flock")
+
+
+def _entry(n: int, session_id: str = "sess-a") -> StateEntry:
+    return StateEntry(
+        timestamp=1710288000 + n,
+        total_input_tokens=1000 * n,
+        total_output_tokens=100 * n,
+        current_input_tokens=50 * n,
+        current_output_tokens=10,
+        cache_creation=0,
+        cache_read=0,
+        cost_usd=0.01 * n,
+        lines_added=n,
+        lines_removed=0,
+        session_id=session_id,
+        model_id="claude-opus-4-6",
+        workspace_project_dir="/home/user/alpha",
+        context_window_size=200000,
+    )
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(StateFile, "STATE_DIR", tmp_path / "state")
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", tmp_path / "old")
+    monkeypatch.setattr(StateFile, "SPOOL_DIR", tmp_path / "spool")
+    return tmp_path
+
+
+@pytest.fixture
+def timers(monkeypatch):
+    started = []
+    monkeypatch.setattr(StateFile, "_start_flush_timer", lambda self: started.append(self))
+    return started
+
+
+def _state_lines(sf: StateFile) -> list[str]:
+    if not sf.file_path.exists():
+        return []
+    return sf.file_path.read_text().splitlines()
+
+
+class TestWriteBehind:
+    def test_entries_held_until_batch_is_full(self, dirs, timers):
+        sf = StateFile("sess-a", spool=SpoolPolicy(max_entries=3, max_age=3600))
+        sf.append_entry(_entry(1))
+        sf.append_entry(_entry(2))
+        assert _state_lines(sf) == []
+        assert sf.spool_path.exists()
+        assert len(timers) == 1
+
+        sf.append_entry(_entry(3))
+        assert _state_lines(sf) == [_entry(n).to_csv_line() for n in (1, 2, 3)]
+        assert not sf.spool_path.exists()
+
+        # A new batch starts a new spool and a new timer
+        sf.append_entry(_entry(4))
+        assert len(timers) == 2
+        assert len(_state_lines(sf)) == 3
+
+    def test_timer_deferred_from_worker_thread(self, dirs, timers):
+        sf = StateFile("sess-a", spool=SpoolPolicy(max_entries=3, max_age=3600))
+        worker = threading.Thread(target=sf.append_entry, args=(_entry(1),))
+        worker.start()
+        worker.join()
+        assert sf.spool_path.exists()
+        assert timers == []
+
+        sf.start_pending_flush_timer()
+        sf.start_pending_flush_timer()
+        assert timers == [sf]
+
+    def test_flush_when_oldest_entry_is_too_old(self, dirs, timers):
+        sf = StateFile("sess-a", spool=SpoolPolicy(max_entries=100, max_age=30))
+        sf.SPOOL_DIR.mkdir(mode=0o700)
+        sf.spool_path.write_text(f"#{int(time.time()) - 60}\n{_entry(1).to_csv_line()}\n")
+        sf.append_entry(_entry(2))
+        assert _state_lines(sf) == [_entry(1).to_csv_line(), _entry(2).to_csv_line()]
+
+    def test_last_entry_sees_spool(self, dirs, timers):
+        sf = StateFile("sess-a", spool=SpoolPolicy(max_entries=10, max_age=3600))
+        sf.append_entry(_entry(1))
+        sf.append_entry(_entry(2))
+        assert StateFile("sess-a").read_last_entry() == _entry(2)
+        assert _state_lines(sf) == []
+
+    def test_readers_flush_for_consistency(self, dirs, timers):
+        writer = StateFile("sess-a", spool=SpoolPolicy(max_entries=10, max_age=3600))
+        writer.append_entry(_entry(1))
+        writer.append_entry(_entry(2))
+
+        assert StateFile("sess-a").read_history() == [_entry(1), _entry(2)]
+        assert not writer.spool_path.exists()
+
+    def test_report_flushes_every_session(self, dirs, timers):
+        policy = SpoolPolicy(max_entries=10, max_age=3600)
+        StateFile("sess-a", spool=policy).append_entry(_entry(1, "sess-a"))
+        StateFile("sess-b", spool=policy).append_entry(_entry(1, "sess-b"))
+
+        projects = load_all_projects(use_index=False)
+        assert {s.session_id for p in projects for s in p.sessions} == {"sess-a", "sess-b"}
+        assert list(StateFile.SPOOL_DIR.glob("*.spool")) == []
+
+    def test_reader_flush_keeps_writer_retention(self, dirs, timers, monkeypatch):
+        writer = StateFile(
+            "sess-a", spool=SpoolPolicy(max_entries=10, max_age=3600), keep_segments=0
+        )
+        for n in range(1, 16):
+            writer.segment_path(n).write_text(f"{_entry(n).to_csv_line()}\n")
+        writer.append_entry(_entry(16))
+        monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", 1)
+
+        assert StateFile.flush_all() == 1
+        assert len(writer.segment_paths()) == 16
+
+    def test_reader_flush_keeps_compact_rows(self, dirs, timers):
+        writer = StateFile("sess-a", spool=SpoolPolicy(max_entries=10, max_age=3600), compact=True)
+        for n in range(1, 4):
+            writer.append_entry(_entry(n))
+
+        assert StateFile("sess-a").read_history() == [_entry(n) for n in range(1, 4)]
+        assert sum(line.startswith("~") for line in _state_lines(writer)) == 2
+
+    def test_spool_without_policy_prunes_nothing(self, dirs, timers, monkeypatch):
+        sf = StateFile("sess-a")
+        for n in range(1, 13):
+            sf.segment_path(n).write_text(f"{_entry(n).to_csv_line()}\n")
+        sf.SPOOL_DIR.mkdir(mode=0o700)
+        sf.spool_path.write_text(f"#{int(time.time())}\n{_entry(13).to_csv_line()}\n")
+        monkeypatch.setattr(StateFile, "SEGMENT_MAX_BYTES", 1)
+
+        assert sf.flush() == 1
+        assert len(sf.segment_paths()) == 13
+
+    def test_untrusted_spool_dir_falls_back_to_direct_writes(self, dirs, timers):
+        target = dirs / "elsewhere"
+        target.mkdir()
+        os.symlink(target, dirs / "spool")
+        sf = StateFile("sess-a", spool=SpoolPolicy(max_entries=10, max_age=3600))
+        sf.append_entry(_entry(1))
+        assert _state_lines(sf) == [_entry(1).to_csv_line()]
+        assert list(target.iterdir()) == []
+
+    def test_disabled_by_default(self, dirs):
+        sf = StateFile("sess-a")
+        sf.append_entry(_entry(1))
+        assert _state_lines(sf) == [_entry(1).to_csv_line()]
+        assert not (dirs / "spool").exists()
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="flush timer forks")
+    def test_background_timer_flushes(self, dirs):
+        sf = StateFile("sess-a", spool=SpoolPolicy(max_entries=10, max_age=1))
+        sf.append_entry(_entry(1))
+        assert _state_lines(sf) == []
+        deadline = time.time() + 10
+        while not _state_lines(sf) and time.time() < deadline:
+            time.sleep(0.05)
+        assert _state_lines(sf) == [_entry(1).to_csv_line()]
+
+
+class TestWriteBehindConfig:
+    def test_defaults(self, tmp_path):
+        config_file = tmp_path / "statusline.conf"
+        config_file.write_text("show_delta=true\n")
+        config = Config.load(config_path=config_file)
+        assert config.state_write_behind is False
+        assert config.state_flush_entries == 20
+        assert config.state_flush_seconds == 60
+
+    def test_keys_parsed(self, tmp_path, capsys):
+        config_file = tmp_path / "statusline.conf"
+        config_file.write_text(
+            "state_write_behind=true\nstate_flush_entries=5\nstate_flush_seconds=-1\n"
+        )
+        config = Config.load(config_path=config_file)
+        assert config.state_write_behind is True
+        assert config.state_flush_entries == 5
+        assert config.state_flush_seconds == 60
+        assert "state_flush_seconds must be positive" in capsys.readouterr().err
+        assert config.to_dict()["state_flush_entries"] == 5
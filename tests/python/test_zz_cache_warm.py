@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import os
 import shutil
+import socket
 import sys
 import tempfile
+import threading
 import time
 from pathlib import Path
 from types import SimpleNamespace
@@ -13,19 +15,31 @@ from unittest.mock import patch
 
 import pytest
 
+from claude_statusline.cli.dev import HistorySpec, write_history
+from claude_statusline.core.state import StateEntry, StateFile
+from claude_statusline.graphs.statistics import detect_cache_misses
+
 # Tests that simulate os.fork() behavior are Unix-only — on Windows the
 # cmd_cache_warm_on function exits before reaching the fork code path.
 unix_only = pytest.mark.skipif(sys.platform == "win32", reason="os.fork not available on Windows")
 
 from claude_statusline.cli.cache_warm import (
+    _SCHEDULER_PID,
+    _SCHEDULER_SOCKET,
+    HeartbeatScheduler,
+    SimulationResult,
     _clear_warm_state,
+    _notify_scheduler,
     _parse_duration,
     _save_warm_state,
     cmd_cache_warm_off,
     cmd_cache_warm_on,
+    cmd_cache_warm_simulate,
     is_cache_warm_active,
     load_warm_state,
     run_cache_warm,
+    simulate_policy,
+    simulate_session,
 )
 
 
@@ -40,6 +54,9 @@ def tmp_dir(monkeypatch):
     d = tempfile.mkdtemp(prefix="test_cache_warm_")
     path = Path(d)
     monkeypatch.setattr("claude_statusline.cli.cache_warm._STATE_DIR", path)
+    monkeypatch.setattr(StateFile, "STATE_DIR", path)
+    monkeypatch.setattr(StateFile, "OLD_STATE_DIR", path / "old")
+    monkeypatch.setattr(StateFile, "SPOOL_DIR", path / "spool")
     yield path
     shutil.rmtree(d, ignore_errors=True)
 
@@ -51,7 +68,7 @@ def tmp_dir(monkeypatch):
 
 def _mock_colors():
     c = SimpleNamespace()
-    for attr in ("green", "yellow", "red", "dim", "bold", "reset", "cyan"):
+    for attr in ("green", "yellow", "red", "dim", "bold", "reset", "cyan", "magenta"):
         setattr(c, attr, "")
     return c
 
@@ -209,6 +226,32 @@ class TestCacheWarmOn:
         err = capsys.readouterr().err
         assert "fork" in err.lower()
 
+    @unix_only
+    def test_reuses_running_scheduler(self, tmp_dir):
+        colors = _mock_colors()
+        (tmp_dir / _SCHEDULER_PID).write_text(str(os.getpid()))
+
+        with patch("os.fork", create=True) as fork:
+            cmd_cache_warm_on("a", "10m", colors)
+            cmd_cache_warm_on("b", "10m", colors)
+
+        fork.assert_not_called()
+        assert load_warm_state("a")["pid"] == load_warm_state("b")["pid"] == os.getpid()
+
+    @unix_only
+    def test_starts_one_scheduler(self, tmp_dir):
+        colors = _mock_colors()
+
+        with (
+            patch("os.fork", return_value=os.getpid(), create=True) as fork,
+            patch("os.kill"),
+        ):
+            cmd_cache_warm_on("a", "10m", colors)
+            cmd_cache_warm_on("b", "10m", colors)
+
+        assert fork.call_count == 1
+        assert (tmp_dir / _SCHEDULER_PID).read_text() == str(os.getpid())
+
     @unix_only
     def test_already_active_refreshes(self, tmp_dir, capsys):
         colors = _mock_colors()
@@ -247,6 +290,35 @@ class TestCacheWarmOff:
         assert "stopped" in out.lower()
         assert load_warm_state("sess") is None
 
+    def test_keeps_shared_scheduler_running(self, tmp_dir):
+        colors = _mock_colors()
+        future = int(time.time()) + 600
+        (tmp_dir / _SCHEDULER_PID).write_text(str(os.getpid()))
+        _save_warm_state("sess", {"pid": os.getpid(), "expiry_time": future, "interval": 240})
+
+        with patch("claude_statusline.cli.cache_warm.os.kill") as kill:
+            cmd_cache_warm_off("sess", colors)
+
+        # Only liveness probes (signal 0), never SIGTERM
+        assert all(call.args[1] == 0 for call in kill.call_args_list)
+        assert load_warm_state("sess") is None
+
+    def test_reports_heartbeat_counts(self, tmp_dir, capsys):
+        future = int(time.time()) + 600
+        _save_warm_state(
+            "sess",
+            {
+                "pid": 9999999,
+                "expiry_time": future,
+                "interval": 240,
+                "heartbeats_sent": 2,
+                "heartbeats_skipped": 7,
+            },
+        )
+        with patch("claude_statusline.cli.cache_warm._is_process_alive", return_value=False):
+            cmd_cache_warm_off("sess", _mock_colors())
+        assert "2 heartbeats sent, 7 skipped" in capsys.readouterr().out
+
     def test_no_active_session_prints_message(self, tmp_dir, capsys):
         colors = _mock_colors()
 
@@ -262,6 +334,166 @@ class TestCacheWarmOff:
         assert out == ""
 
 
+# ---------------------------------------------------------------------------
+# HeartbeatScheduler
+# ---------------------------------------------------------------------------
+
+
+class TestHeartbeatScheduler:
+    NOW = 1_760_000_000
+
+    def _register(self, session_id, expiry_in=1800, interval=240, pid=None):
+        _save_warm_state(
+            session_id,
+            {
+                "pid": os.getpid() if pid is None else pid,
+                "start_time": self.NOW,
+                "expiry_time": self.NOW + expiry_in,
+                "interval": interval,
+            },
+        )
+
+    def test_scan_registers_own_sessions_only(self, tmp_dir):
+        self._register("mine")
+        self._register("other", pid=1)
+        scheduler = HeartbeatScheduler(os.getpid())
+        scheduler.scan(self.NOW)
+        assert len(scheduler) == 1
+        assert scheduler.next_due() == self.NOW
+
+    def test_beats_in_due_order(self, tmp_dir):
+        self._register("slow", interval=240)
+        self._register("fast", interval=60)
+        scheduler = HeartbeatScheduler(os.getpid())
+        scheduler.scan(self.NOW)
+
+        scheduler.run_due(self.NOW)
+        assert (tmp_dir / "cache-warm.slow.heartbeat").read_text() == str(self.NOW)
+        assert scheduler.next_due() == self.NOW + 60
+
+        scheduler.run_due(self.NOW + 60)
+        assert (tmp_dir / "cache-warm.fast.heartbeat").read_text() == str(self.NOW + 60)
+        assert (tmp_dir / "cache-warm.slow.heartbeat").read_text() == str(self.NOW)
+        assert scheduler.next_due() == self.NOW + 120
+
+    def test_expiry_clears_session(self, tmp_dir):
+        self._register("sess", expiry_in=300, interval=240)
+        scheduler = HeartbeatScheduler(os.getpid())
+        scheduler.scan(self.NOW)
+        scheduler.run_due(self.NOW)
+        scheduler.run_due(self.NOW + 240)
+        # The last step is clamped to the expiry time
+        assert scheduler.next_due() == self.NOW + 300
+
+        scheduler.run_due(self.NOW + 300)
+        assert len(scheduler) == 0
+        assert scheduler.next_due() is None
+        assert load_warm_state("sess") is None
+        assert not (tmp_dir / "cache-warm.sess.heartbeat").exists()
+
+    def test_load_drops_stopped_session(self, tmp_dir):
+        self._register("sess")
+        scheduler = HeartbeatScheduler(os.getpid())
+        scheduler.scan(self.NOW)
+        _clear_warm_state("sess")
+        scheduler.load("sess", self.NOW + 10)
+        assert len(scheduler) == 0
+        assert scheduler.next_due() is None
+
+    def test_reload_does_not_beat_twice(self, tmp_dir):
+        self._register("sess")
+        scheduler = HeartbeatScheduler(os.getpid())
+        scheduler.scan(self.NOW)
+        scheduler.run_due(self.NOW)
+        scheduler.load("sess", self.NOW + 30)
+        scheduler.run_due(self.NOW + 30)
+        assert scheduler.next_due() == self.NOW + 240
+        assert (tmp_dir / "cache-warm.sess.heartbeat").read_text() == str(self.NOW)
+
+    def _activity(self, session_id, timestamp):
+        StateFile(session_id).append_entry(
+            StateEntry(
+                timestamp, 1000, 100, 500, 50, 0, 400, 0.01, 0, 0, session_id, "m", "/p", 200000
+            )
+        )
+
+    def test_skips_while_session_active(self, tmp_dir):
+        self._register("sess")
+        self._activity("sess", self.NOW - 10)
+        scheduler = HeartbeatScheduler(os.getpid())
+        scheduler.scan(self.NOW)
+
+        scheduler.run_due(self.NOW)
+        assert not (tmp_dir / "cache-warm.sess.heartbeat").exists()
+        assert scheduler.next_due() == self.NOW + 230
+
+        # More activity before the deadline pushes it out again
+        self._activity("sess", self.NOW + 200)
+        scheduler.run_due(self.NOW + 230)
+        assert scheduler.next_due() == self.NOW + 440
+
+        scheduler.run_due(self.NOW + 440)
+        assert (tmp_dir / "cache-warm.sess.heartbeat").read_text() == str(self.NOW + 440)
+        assert scheduler.next_due() == self.NOW + 680
+
+        state = load_warm_state("sess")
+        assert state["heartbeats_sent"] == 1
+        assert state["heartbeats_skipped"] == 2
+        assert state["pid"] == os.getpid()
+
+    def test_idle_session_beats_each_interval(self, tmp_dir):
+        self._register("sess", interval=240)
+        self._activity("sess", self.NOW - 600)
+        scheduler = HeartbeatScheduler(os.getpid())
+        scheduler.scan(self.NOW)
+        for step in range(3):
+            scheduler.run_due(self.NOW + 240 * step)
+        state = load_warm_state("sess")
+        assert state["heartbeats_sent"] == 3
+        assert state["heartbeats_skipped"] == 0
+
+    def test_counters_not_written_over_refresh(self, tmp_dir):
+        self._register("sess")
+        scheduler = HeartbeatScheduler(os.getpid())
+        scheduler.scan(self.NOW)
+        old = load_warm_state("sess")
+        _save_warm_state("sess", dict(old, start_time=self.NOW + 1))
+        scheduler._count("sess", old, "heartbeats_sent")
+        assert "heartbeats_sent" not in load_warm_state("sess")
+
+    @unix_only
+    def test_serve_registers_over_socket_and_exits_when_idle(self, tmp_dir):
+        (tmp_dir / _SCHEDULER_PID).write_text(str(os.getpid()))
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(tmp_dir / _SCHEDULER_SOCKET))
+        self._register("boot", expiry_in=10**9)
+        thread = threading.Thread(target=HeartbeatScheduler(os.getpid()).serve, args=(sock,))
+        thread.start()
+        try:
+            now = int(time.time())
+            _save_warm_state(
+                "late",
+                {"pid": os.getpid(), "start_time": now, "expiry_time": now + 1, "interval": 60},
+            )
+            _notify_scheduler("late")
+            deadline = time.time() + 5
+            while not (tmp_dir / "cache-warm.late.heartbeat").exists():
+                assert time.time() < deadline
+                time.sleep(0.01)
+            assert (tmp_dir / "cache-warm.boot.heartbeat").exists()
+
+            _clear_warm_state("boot")
+            _notify_scheduler("boot")
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+        finally:
+            sock.close()
+
+        assert load_warm_state("late") is None
+        assert not (tmp_dir / _SCHEDULER_PID).exists()
+        assert not (tmp_dir / _SCHEDULER_SOCKET).exists()
+
+
 # ---------------------------------------------------------------------------
 # run_cache_warm dispatcher
 # ---------------------------------------------------------------------------
@@ -291,8 +523,126 @@ class TestRunCacheWarm:
             run_cache_warm("sess", ["off"], colors)
             mock_off.assert_called_once_with("sess", colors)
 
+    def test_simulate_dispatches_without_session(self, tmp_dir):
+        colors = _mock_colors()
+
+        with patch("claude_statusline.cli.cache_warm.cmd_cache_warm_simulate") as mock_sim:
+            run_cache_warm(None, ["simulate", "--interval", "3m"], colors)
+            mock_sim.assert_called_once_with(["--interval", "3m"], colors)
+
     def test_unknown_subcmd_exits(self, tmp_dir):
         colors = _mock_colors()
 
         with pytest.raises(SystemExit):
             run_cache_warm("sess", ["status"], colors)
+
+
+# ---------------------------------------------------------------------------
+# cache-warm simulate
+# ---------------------------------------------------------------------------
+
+# Active for a few requests, idle 10 minutes, then 25k cached tokens re-written
+SIM_ROWS = [
+    (1000, 20_000, 0),
+    (1030, 2_000, 20_000),
+    (1060, 3_000, 22_000),
+    (1660, 26_000, 0),
+    (1690, 1_500, 26_000),
+]
+SONNET = "claude-sonnet-4-6"
+
+
+class TestSimulateSession:
+    def test_gap_kept_warm(self):
+        result = SimulationResult(interval=240, duration=1800)
+        simulate_session(SIM_ROWS, SONNET, result)
+
+        # Heartbeats at +4m and +8m; the request at +10m is 2m after the last
+        assert (result.sessions, result.requests, result.idle_gaps) == (1, 5, 1)
+        assert (result.misses, result.misses_avoided, result.heartbeats) == (1, 1, 2)
+        assert result.avoided_cost == pytest.approx(25_000 * 3.0 * 1.15 / 1_000_000)
+        assert result.heartbeat_cost == pytest.approx(2 * 25_000 * 3.0 * 0.1 / 1_000_000)
+        assert result.net_savings == pytest.approx(result.avoided_cost - result.heartbeat_cost)
+
+    def test_duration_too_short(self):
+        result = SimulationResult(interval=240, duration=240)
+        simulate_session(SIM_ROWS, SONNET, result)
+
+        # One heartbeat at +4m, then 6m of silence: the cache still expires
+        assert (result.misses, result.misses_avoided, result.heartbeats) == (1, 0, 1)
+        assert result.avoided_cost == 0.0
+        assert result.net_savings < 0
+
+    def test_heartbeats_capped_by_duration(self):
+        rows = [(0, 20_000, 0), (7200, 25_000, 0)]
+        result = SimulationResult(interval=240, duration=1800)
+        simulate_session(rows, SONNET, result)
+
+        assert (result.heartbeats, result.misses, result.misses_avoided) == (7, 1, 0)
+
+    def test_active_session_needs_no_heartbeats(self):
+        rows = [(t, 1_000, 20_000) for t in range(0, 3000, 60)]
+        result = SimulationResult(interval=240, duration=1800)
+        simulate_session(rows, SONNET, result)
+
+        assert (result.heartbeats, result.idle_gaps, result.misses) == (0, 0, 0)
+
+
+class TestSimulatePolicy:
+    def test_replays_all_sessions(self, tmp_dir):
+        write_history(HistorySpec(sessions=3, lines=300, seed=11, end=2_000_000_000), tmp_dir)
+        expected = sum(
+            len(detect_cache_misses(StateFile(f"synthetic-11-{n:06d}").read_history()))
+            for n in range(3)
+        )
+
+        result = simulate_policy(240, 24 * 3600)
+
+        assert (result.sessions, result.requests) == (3, 900)
+        assert result.misses == expected > 0
+        # A day-long policy bridges every synthetic idle gap
+        assert result.misses_avoided == result.misses
+        assert result.heartbeats > 0
+
+    def test_since_skips_old_requests(self, tmp_dir):
+        write_history(HistorySpec(sessions=2, lines=100, seed=4, end=2_000_000_000), tmp_dir)
+        assert simulate_policy(240, 1800, since=2_000_000_001).requests == 0
+
+    def test_empty_history(self, tmp_dir):
+        assert simulate_policy(240, 1800) == SimulationResult(interval=240, duration=1800)
+
+
+class TestCmdCacheWarmSimulate:
+    def test_table(self, tmp_dir, capsys):
+        write_history(HistorySpec(sessions=2, lines=200, seed=9, end=2_000_000_000), tmp_dir)
+
+        cmd_cache_warm_simulate(["--interval", "3m", "--duration", "1h"], _mock_colors())
+
+        out = capsys.readouterr().out
+        assert "heartbeat every 3m, up to 60m idle; 2 sessions, 400 requests" in out
+        assert "Avoided by policy" in out
+        assert "Net savings" in out
+
+    def test_json(self, tmp_dir, capsys):
+        import json
+
+        cmd_cache_warm_simulate(["--json"], _mock_colors())
+
+        data = json.loads(capsys.readouterr().out)
+        assert (data["interval"], data["duration"], data["requests"]) == (240, 1800, 0)
+        assert data["net_savings"] == 0.0
+
+    @pytest.mark.parametrize("interval", ["5m", "0", "abc"])
+    def test_rejects_bad_interval(self, tmp_dir, capsys, interval):
+        with pytest.raises(SystemExit) as exc:
+            cmd_cache_warm_simulate(["--interval", interval], _mock_colors())
+        assert exc.value.code == 1
+        assert "Error:" in capsys.readouterr().err
+
+    def test_main_skips_session_lookup(self, tmp_dir, monkeypatch, capsys):
+        from claude_statusline.cli import context_stats
+
+        monkeypatch.setattr(sys, "argv", ["context-stats", "cache-warm", "simulate", "--no-color"])
+        context_stats.main()
+
+        assert "No recorded sessions to replay." in capsys.readouterr().out